@@ -157,21 +157,26 @@ export function VideoRecorder({
 
     if (!ctx) return;
 
-    // Set canvas dimensions to match video
-    canvas.width = video.videoWidth;
-    canvas.height = video.videoHeight;
+    // Set canvas dimensions to match video, downscaled to the size the server asked for
+    const scale = Math.min(1, TranslateSocketAPI.getFrameMaxSide() / Math.max(video.videoWidth, video.videoHeight));
+    canvas.width = Math.round(video.videoWidth * scale);
+    canvas.height = Math.round(video.videoHeight * scale);
 
     // Draw the current video frame on the canvas
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
 
-    // Convert canvas to data URL (base64)
-    const frameData = canvas.toDataURL('image/jpeg', 0.8);
-    // Extract base64 data without prefix
-    const base64Data = frameData.replace(/^data:image\/jpeg;base64,/, '');
-
-    // Send frame to socket if connected
+    // Send frame to socket if connected, as a binary JPEG attachment
     if (connectionStatus === 'connected') {
-      TranslateSocketAPI.sendFrame(base64Data, Date.now(), analysisMode);
+      const timestamp = Date.now();
+      canvas.toBlob(
+        (blob) => {
+          blob?.arrayBuffer().then((buffer) => {
+            TranslateSocketAPI.sendBinaryFrame(buffer, timestamp, analysisMode);
+          });
+        },
+        'image/jpeg',
+        0.8
+      );
     }
   }, [connectionStatus, analysisMode]);
 
@@ -15,6 +15,11 @@ const apiClient = axios.create({
 // Socket.IO client
 let socket: Socket | null = null;
 let isConnected = false;
+// Cạnh dài tối đa của khung hình do server thông báo trong connection_success
+let frameMaxSide = 640;
+// Tốc độ gửi khung hình tối đa; server hạ xuống qua sự kiện throttle khi bị quá tải
+let targetFps = 15;
+let lastFrameSentAt = 0;
 
 // API Dictionary
 export const DictionaryAPI = {
@@ -75,6 +80,17 @@ export const TranslateAPI = {
     return response.data;
   },
 
+  // Landmark (T, 42, 3) do trình duyệt tự trích xuất bằng MediaPipe
+  translateLandmarks: async (landmarks: Float32Array, mode = 'word') => {
+    const response = await apiClient.post('/translate/landmarks', landmarks.buffer, {
+      params: { mode, dtype: 'float32' },
+      headers: {
+        'Content-Type': 'application/octet-stream',
+      },
+    });
+    return response.data;
+  },
+
   getTranslationModes: async () => {
     const response = await apiClient.get('/translate/modes');
     return response.data;
@@ -83,7 +99,8 @@ export const TranslateAPI = {
 
 // Socket.IO cho dịch real-time
 export const TranslateSocketAPI = {
-  connect: () => {
+  // window/stride: cấu hình cửa sổ nhận dạng; có stride thì server nhận dạng liên tục
+  connect: (sessionOptions: { window?: number; stride?: number } = {}) => {
     if (!socket) {
       try {
         socket = io(`${API_URL}`, {
@@ -100,7 +117,7 @@ export const TranslateSocketAPI = {
         socket.on('connect', () => {
           console.log('Connected to WebSocket server');
           isConnected = true;
-          socket?.emit('start_session', {});
+          socket?.emit('start_session', sessionOptions);
         });
 
         socket.on('connect_error', (error) => {
@@ -121,6 +138,19 @@ export const TranslateSocketAPI = {
 
         socket.on('connection_success', (data) => {
           console.log('Connection success:', data);
+          if (data?.frame_transport?.max_side) {
+            frameMaxSide = data.frame_transport.max_side;
+          }
+          if (data?.frame_transport?.target_fps) {
+            targetFps = data.frame_transport.target_fps;
+          }
+        });
+
+        socket.on('throttle', (data) => {
+          console.warn('Server requested throttling:', data);
+          if (data?.target_fps) {
+            targetFps = data.target_fps;
+          }
         });
       } catch (e) {
         console.error('Failed to initialize Socket.IO:', e);
@@ -149,6 +179,28 @@ export const TranslateSocketAPI = {
 
   isConnected: () => isConnected,
 
+  getFrameMaxSide: () => frameMaxSide,
+
+  // Gửi khung hình nhị phân (JPEG/WebP) qua socket, không qua base64
+  sendBinaryFrame: (frame: ArrayBuffer, timestamp: number, mode: string) => {
+    // Bỏ khung hình nếu gửi nhanh hơn tốc độ server đề xuất
+    const now = Date.now();
+    if (now - lastFrameSentAt < 1000 / targetFps) {
+      return;
+    }
+    if (socket && isConnected) {
+      lastFrameSentAt = now;
+      socket.emit('video_frame', { frame, timestamp, mode });
+    }
+  },
+
+  // Gửi landmark (T, 42, 3) thay cho khung hình khi client tự chạy MediaPipe
+  sendLandmarks: (landmarks: Float32Array, timestamp: number, mode: string) => {
+    if (socket && isConnected) {
+      socket.emit('video_landmarks', { landmarks: landmarks.buffer, dtype: 'float32', timestamp, mode });
+    }
+  },
+
   // Updated to support HTTP fallback
   sendFrame: async (frame: string, timestamp: number, mode: string) => {
     if (socket && isConnected) {
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+
+# torch chỉ được import trong load_backend/OnnxBackend để import module này vẫn nhẹ
+
+BACKENDS = ('eager', 'quantized', 'torchscript', 'torchscript-int8', 'onnx')
+
+# Backend nhận được tham số ``lengths`` (packed sequence + masked attention);
+# các bản export chỉ có đường pad cố định
+LENGTH_AWARE_BACKENDS = ('eager', 'quantized')
+
+
+class OnnxBackend:
+    """Chạy model ONNX qua ONNX Runtime, nhận và trả về tensor torch như model eager."""
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+        import torch
+        self._from_numpy = torch.from_numpy
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+    def __call__(self, landmarks):
+        logits = self.session.run(None, {'landmarks': landmarks.cpu().numpy().astype(np.float32)})[0]
+        return self._from_numpy(logits)
+
+
+def load_backend(name, model, model_name, export_dir='exported'):
+    """Trả về callable ``(batch, T, 42, 3) -> logits`` cho backend ``name``.
+
+    ``eager`` và ``quantized`` dùng trực tiếp ``model``; các backend còn lại đọc
+    tệp do ``python -m model.export`` tạo ra trong ``export_dir``.
+    """
+    import torch
+    from model.export import quantize
+
+    if name == 'eager':
+        return model
+    if name == 'quantized':
+        return quantize(model.cpu())
+    if name == 'torchscript':
+        return torch.jit.load(os.path.join(export_dir, f'{model_name}.ts'), map_location='cpu')
+    if name == 'torchscript-int8':
+        return torch.jit.load(os.path.join(export_dir, f'{model_name}.int8.ts'), map_location='cpu')
+    if name == 'onnx':
+        return OnnxBackend(os.path.join(export_dir, f'{model_name}.onnx'), torch.get_num_threads())
+    raise ValueError(f"Backend không hợp lệ: {name} (chọn một trong {', '.join(BACKENDS)})")
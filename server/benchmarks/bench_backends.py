@@ -0,0 +1,79 @@
+"""Kiểm tra độ khớp và đo độ trễ/thông lượng của các backend suy luận.
+
+Fixture là landmark đã ghi của các video từ điển (``dictionary_index/landmarks.npy``,
+tạo bằng ``python dictionary_index.py``); nếu chưa có thì dùng landmark ngẫu nhiên.
+Cần chạy ``python -m model.export`` trước để có các tệp TorchScript/ONNX.
+
+    cd server && python -m benchmarks.bench_backends [--backends eager,quantized,onnx]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import torch
+
+from backends import BACKENDS, load_backend
+from model.export import load_checkpoint
+
+
+def load_fixtures(index_dir, seq_len=150):
+    path = os.path.join(index_dir, 'landmarks.npy')
+    if os.path.exists(path):
+        return torch.from_numpy(np.load(path)[:, :seq_len].astype(np.float32)), 'dictionary'
+    generator = torch.Generator().manual_seed(0)
+    return torch.rand((16, seq_len, 42, 3), generator=generator), 'synthetic'
+
+
+def measure(backend, batch, repeat):
+    with torch.no_grad():
+        backend(batch)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            backend(batch)
+            timings.append(time.perf_counter() - start)
+    latency = float(np.median(timings))
+    return {'batch_size': len(batch), 'latency_ms': latency * 1e3, 'throughput_per_s': len(batch) / latency}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='word_model')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--export-dir', default='exported')
+    parser.add_argument('--index-dir', default='dictionary_index')
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    model = load_checkpoint(os.path.join('model', f'{args.model}.pth'))
+    fixtures, source = load_fixtures(args.index_dir)
+    with torch.no_grad():
+        reference = model(fixtures)
+
+    report = {'model': args.model, 'fixtures': source, 'n_fixtures': len(fixtures), 'backends': {}}
+    for name in args.backends.split(','):
+        try:
+            backend = load_backend(name, model, args.model, args.export_dir)
+        except Exception as e:
+            report['backends'][name] = {'error': str(e)}
+            continue
+        with torch.no_grad():
+            logits = backend(fixtures)
+        result = {
+            'max_abs_diff': float((logits - reference).abs().max()),
+            'top1_agreement': float((logits.argmax(1) == reference.argmax(1)).float().mean()),
+            'runs': [],
+        }
+        for batch_size in (int(b) for b in args.batch_sizes.split(',')):
+            batch = fixtures.repeat((batch_size + len(fixtures) - 1) // len(fixtures), 1, 1, 1)[:batch_size]
+            result['runs'].append(measure(backend, batch, args.repeat))
+        report['backends'][name] = result
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""So sánh dịch N clip bằng ``/translate/batch`` (một yêu cầu) với N yêu cầu ``/translate/upload``.
+
+Chạy qua client ASGI trong cùng tiến trình, cache kết quả bị tắt. Với upload, các
+yêu cầu được gửi song song tối đa ``--concurrency``; với batch, mọi clip nằm trong
+một yêu cầu multipart. Báo cáo thời gian tổng, thông lượng clip/giây và kích thước
+batch trung bình mà scheduler suy luận đã chạy.
+
+    cd server && python -m benchmarks.bench_batch [--clips 20] [--concurrency 4] [--mode word]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.common import dictionary_clips, environment, peak_rss
+
+
+def scheduler_stats(server, mode):
+    scheduler = server.runtime.schedulers[server.model_name(mode)]
+    stats = scheduler.stats()
+    scheduler.batches_run = scheduler.items_run = scheduler.max_batch_seen = 0
+    return {key: stats[key] for key in ('batches_run', 'items_run', 'avg_batch_size', 'max_batch_size_seen')}
+
+
+async def run(server, payloads, concurrency, mode):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upload(name, data):
+            async with semaphore:
+                response = await client.post('/translate/upload', files={'file': (name, data, 'video/mp4')},
+                                             data={'mode': mode})
+                return response.status_code == 200
+
+        async def batch(items):
+            response = await client.post('/translate/batch', data={'mode': mode},
+                                         files=[('files', (name, data, 'video/mp4')) for name, data in items])
+            lines = [json.loads(line) for line in response.text.splitlines() if line]
+            return lines[-1]['summary']['succeeded']
+
+        # Lượt khởi động: tạo các tiến trình worker, nạp MediaPipe và model
+        await asyncio.gather(*(upload(name, data) for name, data in payloads[:concurrency]))
+        scheduler_stats(server, mode)
+
+        start = time.perf_counter()
+        ok = sum(await asyncio.gather(*(upload(name, data) for name, data in payloads)))
+        uploads = {'elapsed_s': time.perf_counter() - start, 'succeeded': ok, **scheduler_stats(server, mode)}
+
+        start = time.perf_counter()
+        ok = await batch(payloads)
+        batched = {'elapsed_s': time.perf_counter() - start, 'succeeded': ok, **scheduler_stats(server, mode)}
+
+    for result in (uploads, batched):
+        result['throughput_per_s'] = len(payloads) / result['elapsed_s']
+    return uploads, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--mode', default='word')
+    args = parser.parse_args()
+
+    os.environ['RESULT_CACHE_MAX_ENTRIES'] = '0'
+    os.environ['LANDMARK_CACHE_MAX_ENTRIES'] = '0'
+    os.environ['RESULT_CACHE_DIR'] = ''
+    import main as server
+
+    clips = dictionary_clips()
+    payloads = []
+    for i in range(args.clips):
+        with open(clips[i % len(clips)], 'rb') as f:
+            payloads.append((f'{i}-{os.path.basename(clips[i % len(clips)])}', f.read()))
+
+    try:
+        uploads, batched = asyncio.run(run(server, payloads, args.concurrency, args.mode))
+    finally:
+        server.landmark_service.shutdown(wait=True)
+
+    print(json.dumps({
+        'benchmark': 'batch',
+        'environment': environment(),
+        'clips': args.clips,
+        'concurrency': args.concurrency,
+        'landmark_workers': server.LANDMARK_WORKERS,
+        'batch_concurrency': server.BATCH_CONCURRENCY,
+        'upload': uploads,
+        'batch': batched,
+        **peak_rss(),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Đo tìm kiếm từ điển: quét tuần tự (cách cũ của ``/dictionary/search``) so với ``DictionarySearchIndex``.
+
+Sinh từ điển tổng hợp gồm các từ tiếng Việt có dấu ghép từ âm tiết ngẫu nhiên
+(cố định seed), rồi đo độ trễ p50/p95/p99 cho từng loại truy vấn: tiền tố ngắn,
+cả từ có dấu, cả từ không dấu, không có kết quả, và truy vấn kèm danh mục.
+
+    cd server && python -m benchmarks.bench_dictionary_search [--sizes 10000,100000] [--queries 200]
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import environment, latency_summary
+from dictionary_search import DictionarySearchIndex, fold
+
+INITIALS = ['b', 'c', 'ch', 'd', 'đ', 'g', 'h', 'kh', 'l', 'm', 'n', 'ng', 'nh', 'ph', 'qu', 's', 't', 'th', 'tr', 'v', 'x']
+RHYMES = ['a', 'à', 'ả', 'ã', 'á', 'ạ', 'ăn', 'ân', 'em', 'ên', 'inh', 'ông', 'ơn', 'ước', 'uyên', 'ai', 'ao', 'ôi',
+          'ười', 'iệt', 'ỏe', 'ào', 'ình', 'ứng', 'ọc']
+CATEGORIES = ['Chào hỏi', 'Chữ cái', 'Gia đình', 'Số đếm', 'Màu sắc', 'Thời gian', 'Cảm xúc', 'Động vật']
+
+
+def synthetic_items(n, seed=0):
+    rng = random.Random(seed)
+
+    def word():
+        return ' '.join(rng.choice(INITIALS) + rng.choice(RHYMES) for _ in range(rng.randint(1, 3))).capitalize()
+
+    return [{
+        'id': i + 1,
+        'word': word(),
+        'category': rng.choice(CATEGORIES),
+        'description': '',
+        'videoUrl': '',
+        'thumbnail': '',
+        'variations': [word() for _ in range(rng.randint(0, 2))],
+        'examples': [],
+    } for i in range(n)]
+
+
+def linear_search(items, q=None, category=None):
+    """Bản sao của ``/dictionary/search`` trước khi có chỉ mục (phân biệt dấu, không xếp hạng)."""
+    if q:
+        q = q.lower()
+        items = [item for item in items if q in item['word'].lower() or
+                 any(q in variation.lower() for variation in item['variations'])]
+    if category and category.lower() != 'tất cả':
+        items = [item for item in items if item['category'].lower() == category.lower()]
+    return items
+
+
+def query_sets(items, count, seed=1):
+    rng = random.Random(seed)
+    words = [rng.choice(items)['word'] for _ in range(count)]
+    return {
+        'prefix_2': [w[:2] for w in words],
+        'word': words,
+        'word_unaccented': [fold(w) for w in words],
+        'miss': [f'zq{i}x' for i in range(count)],
+        'word_in_category': [(w, rng.choice(CATEGORIES)) for w in words],
+    }
+
+
+def measure(fn, queries):
+    latencies, results = [], 0
+    for query in queries:
+        q, category = query if isinstance(query, tuple) else (query, None)
+        start = time.perf_counter()
+        results += fn(q, category)
+        latencies.append(time.perf_counter() - start)
+    return dict(latency_summary(latencies), mean_results=results / len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=50, help='Kích thước trang cho chỉ mục')
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        items = synthetic_items(size)
+        start = time.perf_counter()
+        index = DictionarySearchIndex(items)
+        build_s = time.perf_counter() - start
+
+        row = {'items': size, 'build_s': build_s, 'linear': {}, 'indexed': {}}
+        for name, queries in query_sets(items, args.queries).items():
+            row['linear'][name] = measure(lambda q, c: len(linear_search(items, q, c)), queries)
+            row['indexed'][name] = measure(lambda q, c: index.search(q, c, args.limit)[1], queries)
+        results.append(row)
+
+    print(json.dumps({
+        'benchmark': 'dictionary_search',
+        'environment': environment(),
+        'queries': args.queries,
+        'limit': args.limit,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
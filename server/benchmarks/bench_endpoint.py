@@ -0,0 +1,94 @@
+"""Đo ``/translate/upload`` đầu-cuối qua client ASGI trong cùng tiến trình (không cần mở cổng).
+
+Mỗi clip trong ``dictionary/`` được tải lên ``--repeat`` lần với ``--concurrency``
+yêu cầu song song. Cache kết quả bị tắt để mọi yêu cầu đều chạy đủ pipeline.
+Báo cáo kèm độ bận trung bình của từng bước (``stage_occupancy``); ``--prefetch 0``
+tắt việc giải mã song song với MediaPipe để so sánh.
+
+    cd server && python -m benchmarks.bench_endpoint [--clips 5] [--concurrency 4] [--repeat 2] [--prefetch 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.common import dictionary_clips, environment, latency_summary, peak_rss
+
+
+async def run(app, payloads, concurrency, mode):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors, occupancy = [], 0, []
+
+    async def upload(client, name, data):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post('/translate/upload', params={'timings': 'true'},
+                                         files={'file': (name, data, 'video/mp4')}, data={'mode': mode})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+            else:
+                occupancy.append(response.json().get('stage_occupancy') or {})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        # Lượt khởi động: tạo các tiến trình worker và nạp MediaPipe
+        await asyncio.gather(*(upload(client, name, data) for name, data in payloads[:concurrency]))
+        latencies.clear()
+        occupancy.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(client, name, data) for name, data in payloads))
+        elapsed = time.perf_counter() - start
+    stages = sorted({stage for row in occupancy for stage in row})
+    mean_occupancy = {stage: sum(row.get(stage, 0.0) for row in occupancy) / len(occupancy) for stage in stages}
+    return latencies, elapsed, errors, mean_occupancy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=2)
+    parser.add_argument('--mode', default='word')
+    parser.add_argument('--prefetch', type=int, default=None, help='VIDEO_DECODE_PREFETCH (mặc định lấy từ .env)')
+    args = parser.parse_args()
+
+    os.environ['RESULT_CACHE_MAX_ENTRIES'] = '0'
+    os.environ['LANDMARK_CACHE_MAX_ENTRIES'] = '0'
+    os.environ['RESULT_CACHE_DIR'] = ''
+    if args.prefetch is not None:
+        os.environ['VIDEO_DECODE_PREFETCH'] = str(args.prefetch)
+    import main as server
+
+    payloads = []
+    for clip in dictionary_clips(limit=args.clips):
+        with open(clip, 'rb') as f:
+            payloads.append((os.path.basename(clip), f.read()))
+    payloads = payloads * args.repeat
+
+    try:
+        latencies, elapsed, errors, occupancy = asyncio.run(run(server.app, payloads, args.concurrency, args.mode))
+    finally:
+        server.landmark_service.shutdown(wait=True)
+
+    report = {
+        'benchmark': 'endpoint_upload',
+        'environment': environment(),
+        'concurrency': args.concurrency,
+        'landmark_workers': server.LANDMARK_WORKERS,
+        'inference_backend': server.INFERENCE_BACKEND,
+        'video_decode_prefetch': server.VIDEO_DECODE_PREFETCH,
+        'errors': errors,
+        **latency_summary(latencies, elapsed),
+        'stage_occupancy': occupancy,
+        **peak_rss(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
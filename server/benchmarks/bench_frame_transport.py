@@ -0,0 +1,64 @@
+"""So sánh khung hình base64 (data URL) với khung hình nhị phân cho sự kiện ``video_frame``.
+
+Đo số byte trên đường truyền và chi phí giải mã phía server (base64 + ``cv2.imdecode``
+so với chỉ ``cv2.imdecode``) cho JPEG và WebP ở vài độ phân giải.
+
+    cd server && python -m benchmarks.bench_frame_transport [--video ../dictionary/camon.mp4]
+"""
+import argparse
+import base64
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from model.preprocess import iter_frames
+
+
+def decode_base64(payload):
+    image_data = base64.b64decode(payload.split(',')[1] if ',' in payload else payload)
+    return cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def decode_binary(payload):
+    return cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+
+
+def per_frame(fn, payloads, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            fn(payload)
+    return (time.perf_counter() - start) / (repeat * len(payloads))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', default=os.path.join('..', 'dictionary', 'camon.mp4'))
+    parser.add_argument('--max-sides', default='1920,640,320')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for max_side in (int(m) for m in args.max_sides.split(',')):
+        frames = [cv2.cvtColor(f, cv2.COLOR_RGB2BGR) for f in iter_frames(args.video, max_side=max_side)]
+        for mime, ext, params in (('image/jpeg', '.jpg', [cv2.IMWRITE_JPEG_QUALITY, 80]),
+                                  ('image/webp', '.webp', [cv2.IMWRITE_WEBP_QUALITY, 80])):
+            binary = [cv2.imencode(ext, f, params)[1].tobytes() for f in frames]
+            data_urls = [f"data:{mime};base64,{base64.b64encode(b).decode()}" for b in binary]
+            results.append({
+                'max_side': max_side,
+                'format': mime,
+                'bytes_per_frame_base64': float(np.mean([len(p) for p in data_urls])),
+                'bytes_per_frame_binary': float(np.mean([len(p) for p in binary])),
+                'decode_ms_base64': per_frame(decode_base64, data_urls, args.repeat) * 1e3,
+                'decode_ms_binary': per_frame(decode_binary, binary, args.repeat) * 1e3,
+            })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Microbenchmark: chi phí trích xuất landmark trên mỗi khung hình.
+
+So sánh cách cũ (``get_hand_landmarks`` với chỉ số tạo mới mỗi khung hình) với
+``HandLandmarkExtractor.process_batch`` ghi vào bộ đệm ``(T, 42, 3)`` cấp phát sẵn.
+
+    cd server && python -m benchmarks.bench_landmarks [--video ../dictionary/camon.mp4] [--model hand_landmarker.task]
+"""
+import argparse
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from model.preprocess import HandLandmarkExtractor, extract_frames, get_hand_landmarks
+
+
+def bench_end_to_end(frames, model_path, repeat):
+    legacy = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        landmarks = []
+        for frame in frames:
+            landmarks.append(get_hand_landmarks(frame, np.array(list(range(21))), verbose=False))
+        np.array(landmarks)
+        legacy.append((time.perf_counter() - start) / len(frames))
+
+    batched = []
+    extractor = HandLandmarkExtractor(model_path)
+    out = np.zeros((len(frames), 42, 3), dtype=np.float32)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor.process_batch(frames, out)
+        batched.append((time.perf_counter() - start) / len(frames))
+    extractor.close()
+    return min(legacy), min(batched)
+
+
+def bench_postprocess(iterations):
+    """Chỉ đo phần hậu xử lý Python, thay MediaPipe bằng landmark giả."""
+    points = [SimpleNamespace(x=0.1 * i, y=0.2, z=0.3) for i in range(21)]
+
+    start = time.perf_counter()
+    out = np.zeros((42, 3), dtype=np.float32)
+    for _ in range(iterations):
+        out = np.zeros((42, 3), dtype=np.float32)
+        out[0:21] = np.array([(p.x, p.y, p.z) for p in points])[np.array(list(range(21)))]
+    legacy = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    buffer = np.zeros((iterations, 42, 3), dtype=np.float32)
+    for t in range(iterations):
+        buffer[t, 0:21] = [(p.x, p.y, p.z) for p in points]
+    batched = (time.perf_counter() - start) / iterations
+    return legacy, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', default=os.path.join('..', 'dictionary', 'camon.mp4'))
+    parser.add_argument('--model', default=os.getenv('HAND_LANDMARKER_MODEL'))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    frames = extract_frames(args.video)
+    legacy, batched = bench_end_to_end(frames, args.model, args.repeat)
+    backend = 'tasks' if args.model else 'solutions'
+    print(f"end-to-end ({len(frames)} frames, {backend}): "
+          f"legacy {legacy * 1e3:.2f} ms/frame, batched {batched * 1e3:.2f} ms/frame")
+
+    legacy, batched = bench_postprocess(20000)
+    print(f"post-processing only: legacy {legacy * 1e6:.1f} us/frame, batched {batched * 1e6:.1f} us/frame")
+
+
+if __name__ == '__main__':
+    main()
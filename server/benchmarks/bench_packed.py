@@ -0,0 +1,60 @@
+"""Đo tốc độ suy luận theo độ dài thực so với pad tới 150 khung hình.
+
+- Clip ngắn (batch 1): pad tới ``--seq-len`` so với ``model(x, lengths)`` (cắt bỏ padding).
+- Batch trộn độ dài: packed LSTM so với ``FusedBiLSTMAttention14`` (đảo chiều trong độ dài).
+
+Độ khớp giữa các cách chạy được kiểm tra trong ``tests/test_packed.py``.
+
+    cd server && python -m benchmarks.bench_packed
+"""
+import argparse
+import os
+import time
+
+import torch
+
+from model.bi_lstm_att_14 import FusedBiLSTMAttention14
+from model.export import load_checkpoint
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='word_model')
+    parser.add_argument('--seq-len', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    model = load_checkpoint(os.path.join('model', f'{args.model}.pth'))
+    fused = FusedBiLSTMAttention14([model]).eval()
+
+    with torch.no_grad():
+        short = 30
+        clip = torch.zeros((1, args.seq_len, 42, 3))
+        clip[:, :short] = torch.rand((1, short, 42, 3))
+        padded_time = timed(lambda: model(clip), args.repeat)
+        trimmed_time = timed(lambda: model(clip, torch.tensor([short])), args.repeat)
+        print(f"{short}-frame clip: padded to {args.seq_len} {padded_time * 1e3:.2f} ms, "
+              f"real length {trimmed_time * 1e3:.2f} ms")
+
+        lengths = torch.tensor([args.seq_len, 120, 90, 75, 60, 40, 30, 10])
+        batch = torch.zeros((len(lengths), args.seq_len, 42, 3))
+        for i, n in enumerate(lengths):
+            batch[i, :n] = torch.rand((int(n), 42, 3))
+        padded_time = timed(lambda: model(batch), args.repeat)
+        packed_time = timed(lambda: model(batch, lengths), args.repeat)
+        fused_time = timed(lambda: fused(batch, lengths), args.repeat)
+        print(f"mixed-length batch of {len(lengths)}: padded {padded_time * 1e3:.2f} ms, "
+              f"packed {packed_time * 1e3:.2f} ms, fused {fused_time * 1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Đo từng bước nóng của pipeline dịch trên các clip trong ``dictionary/``.
+
+- ``extract_frames``: giải mã video (ms mỗi clip và khung hình/giây)
+- ``get_hand_landmarks``: MediaPipe trên từng khung hình
+- ``BiLSTMAttention14.forward``: landmark tổng hợp ở nhiều kích thước batch/độ dài chuỗi
+  (``--model auto_model`` đo model gộp word + character của chế độ auto)
+
+Kết quả in ra dạng JSON (p50/p95/p99, thông lượng, RSS đỉnh) để so sánh giữa các lần chạy.
+
+    cd server && python -m benchmarks.bench_pipeline [--clips 5] [--batch-sizes 1,8,32] [--seq-lens 30,75,150]
+"""
+import argparse
+import json
+import time
+
+import torch
+
+from benchmarks.common import (dictionary_clips, environment, latency_summary, peak_rss,
+                               synthetic_landmarks, timed_calls)
+from model.bi_lstm_att_14 import FusedBiLSTMAttention14
+from model.export import load_checkpoint
+from model.preprocess import ALL_HAND_INDICES, extract_frames, get_hand_landmarks
+
+
+def bench_extract_frames(clips, repeat):
+    latencies, n_frames = [], 0
+    for clip in clips:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            frames = extract_frames(clip)
+            latencies.append(time.perf_counter() - start)
+            n_frames += len(frames)
+    result = latency_summary(latencies)
+    result['frames_per_s'] = n_frames / sum(latencies)
+    return result
+
+
+def bench_hand_landmarks(clips):
+    latencies = []
+    for clip in clips:
+        for frame in extract_frames(clip):
+            start = time.perf_counter()
+            get_hand_landmarks(frame, ALL_HAND_INDICES)
+            latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+
+def bench_forward(model, batch_sizes, seq_lens, repeat):
+    runs = []
+    with torch.no_grad():
+        for batch_size in batch_sizes:
+            for seq_len in seq_lens:
+                batch = synthetic_landmarks(batch_size, seq_len)
+                lengths = torch.full((batch_size,), seq_len, dtype=torch.int64)
+                latencies = timed_calls(lambda: model(batch, lengths), repeat)
+                runs.append({
+                    'batch_size': batch_size,
+                    'seq_len': seq_len,
+                    **latency_summary(latencies, items_per_call=batch_size),
+                })
+    return runs
+
+
+def load_model(name):
+    if name == 'auto_model':
+        return FusedBiLSTMAttention14([load_checkpoint('model/word_model.pth'),
+                                       load_checkpoint('model/char_model.pth')]).eval()
+    return load_checkpoint(f'model/{name}.pth')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=5)
+    parser.add_argument('--model', default='word_model', help='word_model, char_model hoặc auto_model')
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    parser.add_argument('--seq-lens', default='30,75,150')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    clips = dictionary_clips(limit=args.clips)
+    model = load_model(args.model)
+    report = {
+        'benchmark': 'pipeline',
+        'environment': environment(),
+        'clips': len(clips),
+        'extract_frames': bench_extract_frames(clips, repeat=2),
+        'get_hand_landmarks': bench_hand_landmarks(clips),
+        'forward': bench_forward(model, [int(b) for b in args.batch_sizes.split(',')],
+                                 [int(s) for s in args.seq_lens.split(',')], args.repeat),
+        **peak_rss(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
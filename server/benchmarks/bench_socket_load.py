@@ -0,0 +1,120 @@
+"""Mô phỏng N client Socket.IO cùng gửi khung hình ``video_frame`` vào server.
+
+Các client ảo gọi trực tiếp các handler Socket.IO trong cùng tiến trình (không qua
+mạng) với khung hình JPEG lấy từ một clip trong ``dictionary/``, ở ``--fps`` khung
+hình mỗi giây. Đo độ trễ từ lúc gửi tới lúc xử lý xong mỗi khung hình (gồm thời
+gian chờ trong hộp thư của phiên), số khung hình bị bỏ và số sự kiện throttle.
+
+    cd server && python -m benchmarks.bench_socket_load [--clients 8] [--fps 10] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import cv2
+
+from benchmarks.common import DICTIONARY_DIR, environment, latency_summary, peak_rss
+from model.preprocess import iter_frames
+
+
+def load_jpeg_frames(video_path, max_side):
+    frames = []
+    for frame in iter_frames(video_path, max_side=max_side):
+        ok, encoded = cv2.imencode('.jpg', cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if ok:
+            frames.append(encoded.tobytes())
+    return frames
+
+
+async def run(server, frames, n_clients, fps, duration, mode):
+    latencies = []
+    events = {'throttle': 0, 'error': 0}
+
+    async def emit(event, data=None, room=None, **kwargs):
+        if event in events:
+            events[event] += 1
+
+    # Ghi lại thời điểm xử lý xong mỗi khung hình; timestamp là thời điểm client gửi
+    process_frame = server.process_frame
+
+    async def timed_process_frame(sid, frame_data, timestamp, analysis_mode, received=None):
+        await process_frame(sid, frame_data, timestamp, analysis_mode, received)
+        latencies.append(time.perf_counter() - timestamp)
+
+    server.sio.emit = emit
+    server.process_frame = timed_process_frame
+
+    async def client(index):
+        sid = f'bench-{index}'
+        await server.connect(sid, {})
+        await server.start_session(sid, {'mode': mode})
+        interval = 1.0 / fps
+        next_send = time.perf_counter()
+        end = next_send + duration
+        sent = 0
+        while next_send < end:
+            await server.video_frame(sid, {'frame': frames[sent % len(frames)],
+                                           'timestamp': time.perf_counter(), 'mode': mode})
+            sent += 1
+            next_send += interval
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+        # Chờ hộp thư xử lý hết trước khi ngắt kết nối
+        inbox = server.connected_clients[sid]['inbox']
+        while len(inbox) or inbox.frames_processed + inbox.frames_dropped < inbox.frames_received:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.5)
+        stats = inbox.stats()
+        await server.disconnect(sid)
+        return sent, stats
+
+    # Khởi động trước các worker mà các phiên sẽ được gán vào (tạo tiến trình, nạp MediaPipe)
+    await asyncio.gather(*(server.landmark_service.landmark_image(frames[0], key=f'bench-{i}')
+                           for i in range(n_clients)))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(i) for i in range(n_clients)))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed, results, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--fps', type=float, default=10)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--mode', default='word')
+    parser.add_argument('--video', default=os.path.join(DICTIONARY_DIR, 'camon.mp4'))
+    args = parser.parse_args()
+
+    import main as server
+
+    frames = load_jpeg_frames(args.video, server.STREAM_FRAME_MAX_SIDE)
+    try:
+        latencies, elapsed, results, events = asyncio.run(
+            run(server, frames, args.clients, args.fps, args.duration, args.mode))
+    finally:
+        server.landmark_service.shutdown(wait=True)
+
+    sent = sum(r[0] for r in results)
+    dropped = sum(r[1]['frames_dropped'] for r in results)
+    report = {
+        'benchmark': 'socket_load',
+        'environment': environment(),
+        'clients': args.clients,
+        'target_fps': args.fps,
+        'landmark_workers': server.LANDMARK_WORKERS,
+        'frames_sent': sent,
+        'frames_dropped': dropped,
+        'drop_rate': dropped / sent if sent else 0.0,
+        'max_queue_latency_ms': max((r[1]['max_queue_latency_ms'] for r in results), default=0.0),
+        'events': events,
+        'frame_latency': latency_summary(latencies, elapsed),
+        **peak_rss(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
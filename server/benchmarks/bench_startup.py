@@ -0,0 +1,114 @@
+"""Đo thời gian khởi động và bộ nhớ của server chạy thật (``run.py``) với nhiều worker.
+
+Khởi chạy ``python run.py`` trên một cổng riêng, đo thời gian tới khi ``/health``
+trả lời (tiến trình sống) và tới khi ``/ready`` trả lời 200 (model đã nạp), rồi đọc RSS/PSS của từng tiến trình con từ ``/proc`` (PSS chia đều các
+trang dùng chung như trọng số mmap giữa các worker). Chỉ chạy trên Linux.
+
+    cd server && python -m benchmarks.bench_startup [--workers 2] [--dev]
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import environment
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def descendants(pid):
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return children + [d for child in children for d in descendants(child)]
+
+
+def memory(pid):
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Dirty'):
+                    values[key.lower() + '_mb'] = int(rest.split()[0]) / 1024
+        with open(f'/proc/{pid}/cmdline') as f:
+            values['cmdline'] = f.read().replace('\0', ' ').strip()[:120]
+    except OSError:
+        pass
+    return values
+
+
+def wait_for(url, timeout):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--dev', action='store_true', help='Chạy chế độ dev (1 worker, reload) thay vì --prod')
+    parser.add_argument('--timeout', type=float, default=180)
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1', WEB_WORKERS=str(args.workers), LOG_LEVEL='warning')
+    command = [sys.executable, 'run.py'] + ([] if args.dev else ['--prod'])
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              start_new_session=True)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        health = wait_for(f'{base_url}/health', args.timeout)
+        # /ready trả lời 200 khi model đã nạp và các worker landmark đã khởi động
+        ready = wait_for(f'{base_url}/ready', args.timeout)
+        # Hỏi nhiều lần để nhận báo cáo khởi động của các worker khác nhau
+        workers = {}
+        for _ in range(8 * args.workers):
+            try:
+                report = httpx.get(f'{base_url}/translate/stats', timeout=30).json().get('process', {})
+            except (httpx.HTTPError, ValueError):
+                continue
+            if report.get('pid'):
+                workers[report['pid']] = report
+        processes = {pid: memory(pid) for pid in [server.pid] + descendants(server.pid)}
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+    report = {
+        'benchmark': 'startup',
+        'environment': environment(),
+        'mode': 'dev' if args.dev else 'prod',
+        'workers': args.workers,
+        'time_to_health_s': health,
+        'time_to_ready_s': health + ready if health is not None and ready is not None else None,
+        'worker_reports': list(workers.values()),
+        'processes': processes,
+        'total_rss_mb': sum(p.get('rss_mb', 0) for p in processes.values()),
+        'total_pss_mb': sum(p.get('pss_mb', 0) for p in processes.values()),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Tiện ích dùng chung cho các benchmark: thống kê độ trễ, RSS đỉnh, fixture."""
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import torch
+
+from metrics import process_peak_rss_bytes
+
+DICTIONARY_DIR = os.path.join('..', 'dictionary')
+
+
+def latency_summary(latencies, elapsed=None, items_per_call=1):
+    """p50/p95/p99 (ms) và thông lượng của một dãy độ trễ (giây).
+
+    ``elapsed`` là thời gian tường của cả lượt chạy (khi các lần gọi chạy song
+    song); nếu không có thì coi như các lần gọi chạy tuần tự.
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    if not len(latencies):
+        return {'n': 0}
+    elapsed = float(latencies.sum()) if elapsed is None else elapsed
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return {
+        'n': int(len(latencies)),
+        'mean_ms': float(latencies.mean() * 1e3),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(latencies.max() * 1e3),
+        'throughput_per_s': len(latencies) * items_per_call / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def timed_calls(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def peak_rss():
+    """RSS đỉnh (MB) của tiến trình này và của các tiến trình con đã kết thúc."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    children = children if sys.platform == 'darwin' else children * 1024
+    return {
+        'peak_rss_mb': process_peak_rss_bytes() / 2 ** 20,
+        'peak_rss_children_mb': children / 2 ** 20,
+    }
+
+
+def environment():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'cpu_count': os.cpu_count(),
+        'torch_threads': torch.get_num_threads(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def dictionary_clips(video_dir=DICTIONARY_DIR, limit=None):
+    names = sorted(f for f in os.listdir(video_dir) if f.lower().endswith(('.mp4', '.webm', '.mov')))
+    return [os.path.join(video_dir, name) for name in names[:limit]]
+
+
+def synthetic_landmarks(batch_size, seq_len, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    return torch.rand((batch_size, seq_len, 42, 3), generator=generator)
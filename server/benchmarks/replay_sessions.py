@@ -0,0 +1,272 @@
+"""Phát lại các phiên streaming đã ghi (``SESSION_RECORD_DIR``) với N client ảo.
+
+Mỗi client ảo phát một tệp ghi (xoay vòng nếu ít tệp hơn số client) theo đúng
+nhịp thời gian đã ghi, chia cho ``--speed`` (0 = nhanh nhất có thể):
+
+- ``--target pipeline``: gọi thẳng ``process_frame``/``process_landmarks`` trong cùng
+  tiến trình, chờ từng khung hình xong. Đo độ trễ từ thời điểm khung hình lẽ ra tới
+  tới lúc xử lý xong. Với ``--source landmarks`` chuỗi kết quả của mỗi client là
+  tất định, nên ``digest`` dùng để so sánh hai lượt chạy (khi gửi ảnh, kết quả còn
+  phụ thuộc trạng thái bám tay của MediaPipe trong worker dùng chung).
+- ``--target socket``: kết nối tới server đang chạy ở ``--url`` qua Socket.IO (cần
+  ``aiohttp``), gửi ``video_frame``/``video_landmarks`` và thu tóm tắt ``session_ended``.
+
+Khung hình có ảnh JPEG được gửi dưới dạng ảnh (đi qua MediaPipe), còn lại gửi
+landmark; ``--source landmarks`` luôn gửi landmark. Không có tệp ghi nào thì một
+phiên được tạo từ ``--video`` (lặp ``--loops`` lần ở ``--fps``).
+
+    cd server && python -m benchmarks.replay_sessions [recordings/ ...] [--target pipeline] [--clients 8] [--speed 1]
+"""
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import DICTIONARY_DIR, environment, latency_summary, peak_rss
+from benchmarks.bench_socket_load import load_jpeg_frames
+from session_recorder import CLIENT_LANDMARKS, DROPPED, FILE_SUFFIX, SKIPPED, SessionRecorder, read_session
+
+LANDMARK_SHAPE = (42, 3)
+
+
+def recording_paths(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, f'*{FILE_SUFFIX}'))))
+        else:
+            found.append(path)
+    return found
+
+
+async def record_clip(server, video_path, path, fps, loops, mode, jpeg_side):
+    """Tạo một tệp ghi từ clip: landmark thật từ MediaPipe kèm ảnh JPEG của từng khung hình.
+
+    Sau mỗi lần lặp là một giây khung hình đen (không có tay) để phiên chuyển sang
+    nghỉ và ký hiệu được nhận dạng, như khi người dùng hạ tay giữa hai ký hiệu.
+    """
+    from model.preprocess import iter_frames
+    frames = list(iter_frames(video_path, max_side=server.STREAM_FRAME_MAX_SIDE))
+    landmarks = list(await server.landmark_service.landmark_frames(frames))
+    jpegs = load_jpeg_frames(video_path, server.STREAM_FRAME_MAX_SIDE)
+    ok, black = cv2.imencode('.jpg', np.zeros_like(frames[0]))
+    rest = int(fps)
+    landmarks += [np.zeros(LANDMARK_SHAPE, dtype=np.float32)] * rest
+    jpegs += [black.tobytes()] * rest
+
+    recorder = SessionRecorder(path, jpeg_side, meta={'sid': 'synthetic', 'video': video_path})
+    recorder.event('start_session', {'mode': mode}, received=recorder.started)
+    for i in range(loops * len(landmarks)):
+        recorder.frame(recorder.started + i / fps, mode, landmarks[i % len(landmarks)], jpegs[i % len(jpegs)])
+    recorder.close(wait=True)
+
+
+def replay_items(records, source):
+    """Chuyển bản ghi thành ``(t, loại, mode, dữ liệu)`` cần gửi.
+
+    Landmark do client gửi cùng một lần được gộp lại; khung hình bị bỏ mà không
+    có ảnh thì không thể phát lại và bị bỏ qua.
+    """
+    items = []
+    for record in records:
+        if 'event' in record:
+            items.append((record['t'], record['event'], None, record['data']))
+            continue
+        flags, landmarks, image = record['flags'], record['landmarks'], record['image']
+        if landmarks is None and flags & SKIPPED:
+            # Phiên đang nghỉ: khung hình không có tay
+            landmarks = np.zeros(LANDMARK_SHAPE, dtype=np.float32)
+        if flags & CLIENT_LANDMARKS:
+            last = items[-1] if items else None
+            if last and last[1] == 'video_landmarks' and last[0] == record['t'] and last[2] == record['mode']:
+                last[3].append(landmarks)
+            else:
+                items.append((record['t'], 'video_landmarks', record['mode'], [landmarks]))
+        elif image is not None and source == 'auto':
+            items.append((record['t'], 'video_frame', record['mode'], image))
+        elif landmarks is not None:
+            items.append((record['t'], 'video_landmarks', record['mode'], [landmarks]))
+    return items
+
+
+async def paced(items, speed):
+    """Trả về từng mục đúng thời điểm (đã chia cho ``speed``) kèm thời điểm dự kiến."""
+    start = time.perf_counter()
+    for item in items:
+        if speed <= 0:
+            yield item, time.perf_counter()
+            continue
+        due = start + item[0] / speed
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        yield item, due
+
+
+def digest(results):
+    return hashlib.sha1(json.dumps(results).encode('utf-8')).hexdigest()[:16]
+
+
+async def run_pipeline(server, recordings, n_clients, speed, source):
+    latencies = []
+    results = {}
+
+    async def emit(event, data=None, room=None, **kwargs):
+        if event == 'translation_result' and room in results:
+            results[room].append([data['text'], round(float(data['confidence']), 3)])
+
+    server.sio.emit = emit
+
+    async def client(index):
+        sid = f'replay-{index}'
+        path, items = recordings[index % len(recordings)]
+        results[sid] = []
+        await server.connect(sid, {})
+        # Kết quả giả lập định kỳ không thuộc pipeline và làm mất tính tất định
+        server.connected_clients[sid]['task'].cancel()
+        sent = 0
+        async for (_, kind, mode, data), due in paced(items, speed):
+            if kind == 'start_session':
+                await server.start_session(sid, data)
+            elif kind == 'video_frame':
+                await server.process_frame(sid, data, due, mode)
+                latencies.append(time.perf_counter() - due)
+                sent += 1
+            elif kind == 'video_landmarks':
+                for landmarks in data:
+                    await server.process_landmarks(sid, landmarks, mode)
+                    latencies.append(time.perf_counter() - due)
+                    sent += 1
+        await server.disconnect(sid)
+        return {'recording': os.path.basename(path), 'frames_sent': sent,
+                'results': len(results[sid]), 'digest': digest(results[sid])}
+
+    # Khởi động trước các worker MediaPipe mà các client sẽ được gán vào
+    image = next((item[3] for _, items in recordings for item in items if item[1] == 'video_frame'), None)
+    if image is not None:
+        await asyncio.gather(*(server.landmark_service.landmark_image(image, key=f'replay-{i}')
+                               for i in range(n_clients)))
+
+    start = time.perf_counter()
+    clients = await asyncio.gather(*(client(i) for i in range(n_clients)))
+    elapsed = time.perf_counter() - start
+    return {'frame_latency': latency_summary(latencies, elapsed), 'elapsed_s': elapsed, 'per_client': clients}
+
+
+async def run_socket(url, recordings, n_clients, speed):
+    import socketio
+    send_lags = []
+
+    async def client(index):
+        path, items = recordings[index % len(recordings)]
+        sio = socketio.AsyncClient(reconnection=False)
+        counts = {'translation_result': 0, 'throttle': 0, 'error': 0}
+        ended = asyncio.get_running_loop().create_future()
+        for event in counts:
+            sio.on(event, lambda data=None, event=event: counts.__setitem__(event, counts[event] + 1))
+        sio.on('session_ended', lambda data: ended.done() or ended.set_result(data))
+
+        await sio.connect(url, transports=['websocket'])
+        started, sent = False, 0
+        async for (_, kind, mode, data), due in paced(items, speed):
+            send_lags.append(time.perf_counter() - due)
+            if kind == 'start_session':
+                await sio.emit('start_session', data)
+                started = True
+            elif kind == 'end_session':
+                continue
+            elif kind == 'video_frame':
+                await sio.emit('video_frame', {'frame': data, 'timestamp': time.time() * 1000, 'mode': mode})
+                sent += 1
+            elif kind == 'video_landmarks':
+                payload = np.stack(data).astype('<f2').tobytes()
+                await sio.emit('video_landmarks', {'landmarks': payload, 'dtype': 'float16', 'mode': mode})
+                sent += len(data)
+
+        summary = None
+        if started:
+            await sio.emit('end_session', {})
+            try:
+                summary = await asyncio.wait_for(ended, 30)
+            except asyncio.TimeoutError:
+                pass
+        await sio.disconnect()
+        return {'recording': os.path.basename(path), 'frames_sent': sent, 'events': counts, 'session': summary}
+
+    start = time.perf_counter()
+    clients = await asyncio.gather(*(client(i) for i in range(n_clients)))
+    elapsed = time.perf_counter() - start
+    dropped = sum((c['session'] or {}).get('frames_dropped', 0) for c in clients)
+    sent = sum(c['frames_sent'] for c in clients)
+    return {
+        'send_lag': latency_summary(send_lags, elapsed),
+        'elapsed_s': elapsed,
+        'frames_dropped': dropped,
+        'drop_rate': dropped / sent if sent else 0.0,
+        'per_client': clients,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recordings', nargs='*', help=f'Tệp {FILE_SUFFIX} hoặc thư mục chứa chúng')
+    parser.add_argument('--target', choices=['pipeline', 'socket'], default='pipeline')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--speed', type=float, default=1.0, help='Hệ số tăng tốc so với nhịp đã ghi; 0 = không chờ')
+    parser.add_argument('--source', choices=['auto', 'landmarks'], default='auto')
+    parser.add_argument('--video', default=os.path.join(DICTIONARY_DIR, 'camon.mp4'))
+    parser.add_argument('--fps', type=float, default=15)
+    parser.add_argument('--loops', type=int, default=3)
+    parser.add_argument('--mode', default='word')
+    parser.add_argument('--jpeg-side', type=int, default=320, help='Cạnh dài ảnh JPEG trong phiên tạo từ --video')
+    args = parser.parse_args()
+
+    server = None
+    if args.target == 'pipeline' or not args.recordings:
+        import main as server
+
+    try:
+        paths = recording_paths(args.recordings)
+        if not paths:
+            paths = [os.path.join(tempfile.mkdtemp(prefix='replay-'), f'synthetic{FILE_SUFFIX}')]
+            asyncio.run(record_clip(server, args.video, paths[0], args.fps, args.loops, args.mode,
+                                    args.jpeg_side))
+
+        recordings, sizes, frames, dropped = [], 0, 0, 0
+        for path in paths:
+            _, records = read_session(path)
+            recordings.append((path, replay_items(records, args.source)))
+            sizes += os.path.getsize(path)
+            frames += sum('flags' in r for r in records)
+            dropped += sum('flags' in r and bool(r['flags'] & DROPPED) for r in records)
+
+        if args.target == 'pipeline':
+            result = asyncio.run(run_pipeline(server, recordings, args.clients, args.speed, args.source))
+        else:
+            result = asyncio.run(run_socket(args.url, recordings, args.clients, args.speed))
+    finally:
+        if server is not None:
+            server.landmark_service.shutdown(wait=True)
+
+    print(json.dumps({
+        'benchmark': 'replay_sessions',
+        'environment': environment(),
+        'target': args.target,
+        'speed': args.speed,
+        'source': args.source,
+        'clients': args.clients,
+        'recordings': {'files': len(paths), 'frames': frames, 'frames_dropped': dropped,
+                       'bytes_per_frame': sizes / frames if frames else 0.0},
+        **result,
+        **peak_rss(),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Chạy toàn bộ bộ benchmark, mỗi benchmark trong một tiến trình riêng (để RSS đỉnh tách biệt).
+
+Gộp báo cáo JSON của từng benchmark vào ``--out``. Với ``--baseline`` (tệp kết quả
+của một lần chạy trước), in thêm tỉ lệ thay đổi p50/p95/p99 và thông lượng.
+
+    cd server && python -m benchmarks.run_all [--out bench.json] [--baseline old.json] [--quick]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.common import environment
+
+BENCHMARKS = {
+    'pipeline': ['benchmarks.bench_pipeline'],
+    'endpoint_upload': ['benchmarks.bench_endpoint'],
+    'socket_load': ['benchmarks.bench_socket_load'],
+    'startup': ['benchmarks.bench_startup'],
+    'dictionary_search': ['benchmarks.bench_dictionary_search'],
+    'replay_sessions': ['benchmarks.replay_sessions'],
+    'batch': ['benchmarks.bench_batch'],
+}
+QUICK_ARGS = {
+    'pipeline': ['--clips', '2', '--repeat', '3', '--batch-sizes', '1,8', '--seq-lens', '75,150'],
+    'endpoint_upload': ['--clips', '2', '--repeat', '1'],
+    'socket_load': ['--clients', '2', '--duration', '3'],
+    'startup': ['--workers', '1'],
+    'dictionary_search': ['--sizes', '10000', '--queries', '50'],
+    'replay_sessions': ['--clients', '2', '--loops', '1'],
+    'batch': ['--clips', '6', '--concurrency', '2'],
+}
+COMPARED_KEYS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_per_s', 'peak_rss_mb', 'time_to_health_s', 'time_to_ready_s', 'total_pss_mb')
+
+
+def flatten(report, prefix=''):
+    """Trả về ``{đường_dẫn: giá_trị}`` cho các chỉ số cần so sánh trong một báo cáo lồng nhau."""
+    values = {}
+    if isinstance(report, dict):
+        for key, value in report.items():
+            if key == 'environment':
+                continue
+            if key in COMPARED_KEYS and isinstance(value, (int, float)):
+                values[prefix + key] = value
+            else:
+                values.update(flatten(value, f'{prefix}{key}.'))
+    elif isinstance(report, list):
+        for i, item in enumerate(report):
+            label = '/'.join(f'{k}={item[k]}' for k in ('batch_size', 'seq_len') if isinstance(item, dict) and k in item)
+            values.update(flatten(item, f'{prefix}{label or i}.'))
+    return values
+
+
+def compare(current, baseline):
+    current, baseline = flatten(current), flatten(baseline)
+    for key in sorted(current.keys() & baseline.keys()):
+        if baseline[key]:
+            change = (current[key] - baseline[key]) / baseline[key] * 100
+            print(f'{key:70s} {baseline[key]:12.2f} -> {current[key]:12.2f} ({change:+.1f}%)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='bench.json')
+    parser.add_argument('--baseline')
+    parser.add_argument('--only', help='Danh sách benchmark, cách nhau bởi dấu phẩy')
+    parser.add_argument('--quick', action='store_true', help='Ít lần lặp hơn, dùng để kiểm tra nhanh')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    results = {'environment': environment(), 'benchmarks': {}}
+    for name in names:
+        command = [sys.executable, '-m'] + BENCHMARKS[name] + (QUICK_ARGS[name] if args.quick else [])
+        print(f'running {name}...', file=sys.stderr)
+        completed = subprocess.run(command, capture_output=True, text=True)
+        try:
+            results['benchmarks'][name] = json.loads(completed.stdout[completed.stdout.index('{'):])
+        except ValueError:
+            results['benchmarks'][name] = {'error': completed.stderr[-2000:], 'returncode': completed.returncode}
+
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'wrote {args.out}', file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results['benchmarks'], json.load(f)['benchmarks'])
+
+
+if __name__ == '__main__':
+    main()
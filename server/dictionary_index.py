@@ -0,0 +1,118 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+LANDMARKS_FILE = 'landmarks.npy'
+EMBEDDINGS_FILE = 'embeddings.npy'
+
+
+def build_index(video_dir, out_dir, encoder, max_frames=150, model_version=None, model_path=None):
+    """Trích xuất landmark và embedding ngữ cảnh cho mọi video trong ``video_dir``.
+
+    ``encoder`` là ``BiLSTMAttention14(cls_head=False)``; embedding được chuẩn hóa
+    L2 để tìm kiếm cosine chỉ còn là một phép nhân ma trận.
+    """
+    import torch
+    from model.preprocess import HandLandmarkExtractor, iter_frames
+
+    names = sorted(f for f in os.listdir(video_dir) if f.lower().endswith(('.mp4', '.webm', '.mov')))
+    landmarks = np.zeros((len(names), max_frames, 42, 3), dtype=np.float32)
+    lengths = []
+    for i, name in enumerate(names):
+        # Mỗi video dùng một bộ trích xuất mới để trạng thái tracking không lẫn giữa các clip
+        extractor = HandLandmarkExtractor(model_path)
+        try:
+            frames = iter_frames(os.path.join(video_dir, name), max_frames=max_frames)
+            lengths.append(extractor.process_batch(frames, landmarks[i]))
+        finally:
+            extractor.close()
+        print(f"{name}: {lengths[-1]} frames")
+
+    with torch.no_grad():
+        lengths_tensor = torch.tensor([max(n, 1) for n in lengths])
+        embeddings = encoder(torch.from_numpy(landmarks), lengths_tensor).cpu().numpy().astype(np.float32)
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-8)
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, LANDMARKS_FILE), landmarks)
+    np.save(os.path.join(out_dir, EMBEDDINGS_FILE), embeddings)
+    with open(os.path.join(out_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'files': names,
+            'lengths': lengths,
+            'max_frames': max_frames,
+            'model_version': model_version,
+        }, f, ensure_ascii=False, indent=2)
+    return len(names)
+
+
+class DictionaryLandmarkIndex:
+    """Kho landmark/embedding của các video từ điển, được mmap thay vì giải mã lại video."""
+
+    def __init__(self, files, lengths, landmarks, embeddings, model_version=None):
+        self.files = files
+        self.names = [os.path.splitext(f)[0] for f in files]
+        self.lengths = lengths
+        self.landmarks = landmarks
+        self.embeddings = embeddings
+        self.model_version = model_version
+
+    def __len__(self):
+        return len(self.files)
+
+    @classmethod
+    def load(cls, index_dir):
+        with open(os.path.join(index_dir, INDEX_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(
+            meta['files'],
+            meta['lengths'],
+            np.load(os.path.join(index_dir, LANDMARKS_FILE), mmap_mode='r'),
+            np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode='r'),
+            meta.get('model_version'),
+        )
+
+    def search(self, embedding, k=5):
+        """Trả về ``[(index, score), ...]`` của ``k`` video gần nhất theo cosine."""
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-8)
+        scores = self.embeddings @ query
+        k = min(int(k), len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+def main():
+    import torch
+    from model.bi_lstm_att_14 import BiLSTMAttention14
+
+    parser = argparse.ArgumentParser(description="Xây dựng chỉ mục landmark cho các video từ điển")
+    parser.add_argument('--videos', default=os.path.join('..', 'dictionary'))
+    parser.add_argument('--out', default='dictionary_index')
+    parser.add_argument('--checkpoint', default=os.path.join('model', 'word_model.pth'))
+    parser.add_argument('--max-frames', type=int, default=150)
+    args = parser.parse_args()
+
+    checkpoint = torch.load(args.checkpoint, map_location='cpu')
+    encoder = BiLSTMAttention14(cls_head=False)
+    # Bỏ qua trọng số của classifier, chỉ giữ LSTM và attention
+    encoder.load_state_dict(checkpoint['model_state'], strict=False)
+    encoder.eval()
+
+    with open(args.checkpoint, 'rb') as f:
+        model_version = hashlib.sha256(f.read()).hexdigest()[:12]
+
+    count = build_index(args.videos, args.out, encoder, args.max_frames, model_version,
+                        os.getenv('HAND_LANDMARKER_MODEL') or None)
+    print(f"Đã lập chỉ mục {count} video vào {args.out}")
+
+
+if __name__ == '__main__':
+    main()
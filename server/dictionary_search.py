@@ -0,0 +1,182 @@
+import heapq
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+ALL_CATEGORIES = 'tat ca'  # "Tất cả" sau khi bỏ dấu
+SHORT_QUERY_LENGTH = 2
+EMPTY = np.zeros(0, dtype=np.int32)
+
+# Hạng kết quả, nhỏ hơn đứng trước
+EXACT_WORD, EXACT_VARIATION, WORD_PREFIX, TOKEN_PREFIX, VARIATION_PREFIX, SUBSTRING = range(6)
+
+
+def fold(text):
+    """Chữ thường, bỏ dấu tiếng Việt (kể cả đ → d) và gộp khoảng trắng: "Cảm  Ơn" → "cam on"."""
+    text = unicodedata.normalize('NFD', text.lower().replace('đ', 'd'))
+    return ' '.join(''.join(c for c in text if not unicodedata.combining(c)).split())
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def token_prefixes(text):
+    return {token[:n] for token in text.split() for n in range(1, SHORT_QUERY_LENGTH + 1)}
+
+
+def short_substrings(text):
+    """Mọi chuỗi con 1–2 ký tự nằm gọn trong một trường (không chứa '\\n')."""
+    return {text[i:i + n] for n in range(1, SHORT_QUERY_LENGTH + 1)
+            for i in range(len(text) - n + 1) if '\n' not in text[i:i + n]}
+
+
+def postings(index):
+    # Danh sách vị trí tăng dần, lưu thành mảng int32 để giao nhau nhanh và gọn bộ nhớ
+    return {key: np.array(positions, dtype=np.int32) for key, positions in index.items()}
+
+
+class DictionarySearchIndex:
+    """Chỉ mục trong bộ nhớ cho tìm kiếm từ điển, xây một lần khi khởi động.
+
+    Gồm bảng id → mục, chỉ mục theo danh mục, chỉ mục trigram trên từ và các
+    biến thể (đã bỏ dấu) cho truy vấn từ 3 ký tự, và chỉ mục mọi chuỗi con 1–2 ký
+    tự (kèm tiền tố của từng tiếng để xếp hạng) cho truy vấn ngắn. Truy vấn ở mọi
+    độ dài đều khớp chuỗi con như trước. Kết quả được xếp hạng: trùng khớp hoàn toàn,
+    rồi tiền tố của từ, tiền tố của một tiếng, cuối cùng là chuỗi con; trong
+    cùng hạng, mục khớp đúng cả dấu và từ ngắn hơn đứng trước.
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.by_id = {item['id']: item for item in self.items}
+        self._words = [fold(item['word']) for item in self.items]
+        self._variations = [[fold(v) for v in item.get('variations', ())] for item in self.items]
+        # Các trường nối bằng '\n' để một trigram không vắt qua hai trường
+        self._texts = ['\n'.join([word] + variations) for word, variations in zip(self._words, self._variations)]
+        # Bản giữ dấu, chỉ dùng để ưu tiên mục khớp đúng cả dấu khi xếp hạng
+        self._accented = ['\n'.join([item['word']] + list(item.get('variations', ()))).lower() for item in self.items]
+        self._word_lengths = np.array([len(word) for word in self._words], dtype=np.int32)
+
+        self.categories = []
+        categories = defaultdict(list)
+        grams = defaultdict(list)
+        exact_variations = defaultdict(list)
+        prefixes = defaultdict(list)
+        substrings = defaultdict(list)
+        accented_substrings = defaultdict(list)
+        word_starts = defaultdict(list)
+        word_token_starts = defaultdict(list)
+        for position, item in enumerate(self.items):
+            word, text = self._words[position], self._texts[position]
+            category = fold(item['category'])
+            if category not in categories:
+                self.categories.append(item['category'])
+            categories[category].append(position)
+            for gram in trigrams(text):
+                grams[gram].append(position)
+            for variation in set(self._variations[position]):
+                exact_variations[variation].append(position)
+            for prefix in token_prefixes(text):
+                prefixes[prefix].append(position)
+            for substring in short_substrings(text):
+                substrings[substring].append(position)
+            for substring in short_substrings(self._accented[position]):
+                accented_substrings[substring].append(position)
+            for prefix in {word[:n] for n in range(1, SHORT_QUERY_LENGTH + 1)}:
+                word_starts[prefix].append(position)
+            for prefix in token_prefixes(word):
+                word_token_starts[prefix].append(position)
+
+        self._categories = postings(categories)
+        self._grams = postings(grams)
+        self._exact_variations = postings(exact_variations)
+        # Truy vấn 1–2 ký tự khớp hàng nghìn mục nên được xếp hạng bằng numpy trên các chỉ mục này
+        self._prefixes = postings(prefixes)
+        self._substrings = postings(substrings)
+        self._accented_substrings = postings(accented_substrings)
+        self._word_starts = postings(word_starts)
+        self._word_token_starts = postings(word_token_starts)
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, item_id):
+        return self.by_id.get(item_id)
+
+    def search(self, query=None, category=None, limit=None, offset=0):
+        """Trả về ``(items, total)``: một trang kết quả đã xếp hạng và tổng số kết quả."""
+        positions = None
+        if category and fold(category) != ALL_CATEGORIES:
+            positions = self._categories.get(fold(category), EMPTY)
+
+        folded = fold(query or '')
+        end = None if limit is None else offset + max(0, limit)
+        if not folded:
+            ranked = range(len(self.items)) if positions is None else positions
+            return [self.items[p] for p in ranked[offset:end]], len(ranked)
+
+        raw = ' '.join((query or '').lower().split())
+        if len(folded) <= SHORT_QUERY_LENGTH:
+            ranked = self._rank_short(folded, raw, positions)
+            return [self.items[p] for p in ranked[offset:end].tolist()], len(ranked)
+
+        candidates = self._candidates(folded)
+        if positions is not None:
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        # Trigram chỉ lọc sơ bộ; kiểm tra lại chuỗi con thật sự
+        candidates = [p for p in candidates.tolist() if folded in self._texts[p]]
+        key = lambda p: self._rank(p, folded, raw)
+        # Chỉ cần sắp xếp đủ tới hết trang được yêu cầu
+        ranked = sorted(candidates, key=key) if end is None else heapq.nsmallest(end, candidates, key=key)
+        return [self.items[p] for p in ranked[offset:end]], len(candidates)
+
+    def _candidates(self, folded):
+        grams = []
+        for gram in trigrams(folded):
+            posting = self._grams.get(gram)
+            if posting is None:
+                return EMPTY
+            grams.append(posting)
+        grams.sort(key=len)
+        result = grams[0]
+        for posting in grams[1:]:
+            result = np.intersect1d(result, posting, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    def _rank(self, position, folded, raw):
+        word = self._words[position]
+        variations = self._variations[position]
+        if word == folded:
+            tier = EXACT_WORD
+        elif folded in variations:
+            tier = EXACT_VARIATION
+        elif word.startswith(folded):
+            tier = WORD_PREFIX
+        elif any(token.startswith(folded) for token in word.split()):
+            tier = TOKEN_PREFIX
+        elif any(v.startswith(folded) or any(t.startswith(folded) for t in v.split()) for v in variations):
+            tier = VARIATION_PREFIX
+        else:
+            tier = SUBSTRING
+        return tier, raw not in self._accented[position], len(word), position
+
+    def _rank_short(self, folded, raw, positions):
+        """Như ``_rank`` cho truy vấn 1–2 ký tự, tính trên cả mảng ứng viên."""
+        candidates = self._substrings.get(folded, EMPTY)
+        if positions is not None:
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        lengths = self._word_lengths[candidates]
+        word_start = np.isin(candidates, self._word_starts.get(folded, EMPTY), assume_unique=True)
+
+        tiers = np.full(len(candidates), SUBSTRING, dtype=np.int8)
+        tiers[np.isin(candidates, self._prefixes.get(folded, EMPTY), assume_unique=True)] = VARIATION_PREFIX
+        tiers[np.isin(candidates, self._word_token_starts.get(folded, EMPTY), assume_unique=True)] = TOKEN_PREFIX
+        tiers[word_start] = WORD_PREFIX
+        tiers[np.isin(candidates, self._exact_variations.get(folded, EMPTY), assume_unique=True)] = EXACT_VARIATION
+        tiers[word_start & (lengths == len(folded))] = EXACT_WORD
+        accent_mismatch = ~np.isin(candidates, self._accented_substrings.get(raw, EMPTY), assume_unique=True)
+        return candidates[np.lexsort((candidates, lengths, accent_mismatch, tiers))]
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceScheduler:
+    """Gom các chuỗi landmark từ mọi phiên/endpoint thành một batch cho model.
+
+    Một batch được chạy khi đủ ``max_batch_size`` yêu cầu hoặc khi yêu cầu
+    đầu tiên đã chờ quá ``max_wait_ms``. Mỗi caller nhận lại logits của riêng mình.
+
+    Các chuỗi có độ dài khác nhau được pad tới chuỗi dài nhất trong batch và
+    truyền kèm ``lengths`` cho model; batch có độ dài khác nhau chạy bằng
+    ``ragged_model`` nếu có (vd. ``FusedBiLSTMAttention14`` không cần packed LSTM).
+    Batch mà mọi chuỗi dài bằng nhau (kể cả batch 1) không có padding nên được gọi
+    không kèm ``lengths``. Backend không hỗ trợ ``lengths`` (``supports_lengths=False``)
+    nhận batch pad bằng 0 tới ít nhất ``pad_to`` bước.
+    """
+
+    def __init__(self, model, max_batch_size=16, max_wait_ms=5.0, device=None, name='model',
+                 supports_lengths=True, pad_to=None, ragged_model=None):
+        self.model = model
+        self.ragged_model = ragged_model or model
+        self.supports_lengths = supports_lengths
+        self.pad_to = pad_to
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.device = device
+        self.name = name
+
+        self._pending = deque()
+        self._wakeup = None
+        self._worker = None
+        # Model forward chạy trên một thread riêng để không chặn event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'infer-{name}')
+
+        self.batches_run = 0
+        self.items_run = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+        self.last_forward_time = 0.0
+
+    @property
+    def queue_depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'queue_depth': self.queue_depth,
+            'batches_run': self.batches_run,
+            'items_run': self.items_run,
+            'last_batch_size': self.last_batch_size,
+            'max_batch_size_seen': self.max_batch_seen,
+            'avg_batch_size': self.items_run / self.batches_run if self.batches_run else 0.0,
+            'last_forward_ms': self.last_forward_time * 1000.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+        }
+
+    async def submit(self, landmarks):
+        """Đưa một chuỗi ``(T, 42, 3)`` vào hàng đợi và chờ logits ``(n_classes,)``."""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        future = loop.create_future()
+        self._pending.append((landmarks, future, loop.time()))
+        self._wakeup.set()
+        row, build_time, forward_time = await future
+        observe_stage('tensor_build', build_time)
+        observe_stage('model_forward', forward_time)
+        return row
+
+    async def submit_many(self, sequences):
+        """Đưa nhiều chuỗi vào hàng đợi cùng lúc để chúng được chạy chung batch; trả về logits theo thứ tự."""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        futures = []
+        for landmarks in sequences:
+            futures.append(loop.create_future())
+            self._pending.append((landmarks, futures[-1], loop.time()))
+        self._wakeup.set()
+        rows = []
+        for row, build_time, forward_time in await asyncio.gather(*futures):
+            observe_stage('tensor_build', build_time)
+            observe_stage('model_forward', forward_time)
+            rows.append(row)
+        return rows
+
+    def _ensure_worker(self, loop):
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Chờ thêm yêu cầu cho tới khi đủ batch hoặc hết thời gian chờ
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                continue
+
+            try:
+                logits, build_time, forward_time = await loop.run_in_executor(
+                    self._executor, self._forward, [item[0] for item in batch])
+            except Exception as e:
+                logger.error(f"Lỗi suy luận batch ({self.name}): {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), row in zip(batch, logits):
+                if not future.done():
+                    future.set_result((row, build_time, forward_time))
+
+    def warm_up(self, lengths=(15, 150)):
+        """Chạy model một lần cho mỗi độ dài trong ``lengths`` (không tính vào thống kê)."""
+        for length in lengths:
+            self._run_model([torch.zeros((length, 42, 3))])
+        if self.supports_lengths and len(lengths) > 1:
+            self._run_model([torch.zeros((length, 42, 3)) for length in lengths])
+
+    def _forward(self, sequences):
+        logits, build_time, forward_time = self._run_model(sequences)
+        self.batches_run += 1
+        self.items_run += len(sequences)
+        self.last_batch_size = len(sequences)
+        self.max_batch_seen = max(self.max_batch_seen, len(sequences))
+        self.last_forward_time = build_time + forward_time
+        return logits, build_time, forward_time
+
+    def _run_model(self, sequences):
+        start = time.perf_counter()
+        sequences = [torch.as_tensor(s, dtype=torch.float32) for s in sequences]
+        lengths = torch.tensor([max(s.shape[0], 1) for s in sequences], dtype=torch.int64)
+        max_len = int(lengths.max())
+        if not self.supports_lengths and self.pad_to:
+            max_len = max(max_len, self.pad_to)
+        batch = torch.zeros((len(sequences), max_len) + tuple(sequences[0].shape[1:]), dtype=torch.float32)
+        for i, s in enumerate(sequences):
+            batch[i, :s.shape[0]] = s
+        if self.device is not None:
+            batch = batch.to(self.device)
+        built = time.perf_counter()
+
+        with torch.no_grad():
+            if self.supports_lengths and bool((lengths != max_len).any()):
+                logits = self.ragged_model(batch, lengths).cpu()
+            else:
+                logits = self.model(batch).cpu()
+
+        return logits, built - start, time.perf_counter() - built
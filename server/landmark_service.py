@@ -0,0 +1,377 @@
+import asyncio
+import contextlib
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metrics import observe_stage
+from segmentation import MotionSegmenter
+
+logger = logging.getLogger(__name__)
+
+HAND_INDICES = np.arange(21)
+
+# Landmark do client tự trích xuất gửi lên dưới dạng mảng nhị phân little-endian (T, 42, 3)
+LANDMARK_DTYPES = {'float32': np.dtype('<f4'), 'float16': np.dtype('<f2')}
+LANDMARK_FRAME_SHAPE = (2 * len(HAND_INDICES), 3)
+
+
+def decode_landmark_payload(payload, dtype='float32', max_frames=None):
+    """Kiểm tra và chuyển payload nhị phân thành mảng ``(T, 42, 3)`` float32.
+
+    Ném ``ValueError`` nếu dtype không hỗ trợ, kích thước không chia hết cho
+    một khung hình, vượt quá ``max_frames`` hoặc chứa giá trị không hữu hạn.
+    """
+    if dtype not in LANDMARK_DTYPES:
+        raise ValueError(f"dtype phải là một trong {', '.join(LANDMARK_DTYPES)}")
+    dtype = LANDMARK_DTYPES[dtype]
+    frame_bytes = dtype.itemsize * LANDMARK_FRAME_SHAPE[0] * LANDMARK_FRAME_SHAPE[1]
+    if not payload or len(payload) % frame_bytes:
+        raise ValueError(f"Kích thước payload phải là bội số dương của {frame_bytes} byte")
+    n_frames = len(payload) // frame_bytes
+    if max_frames is not None and n_frames > max_frames:
+        raise ValueError(f"Tối đa {max_frames} khung hình, nhận được {n_frames}")
+    landmarks = np.frombuffer(payload, dtype=dtype).reshape((n_frames,) + LANDMARK_FRAME_SHAPE)
+    if not np.isfinite(landmarks).all():
+        raise ValueError("Landmark chứa giá trị NaN hoặc vô hạn")
+    return landmarks.astype(np.float32)
+
+# Mỗi tiến trình worker giữ một bộ trích xuất MediaPipe cho mỗi key (sid của socket),
+# để trạng thái tracking của một luồng không lẫn sang luồng khác trên cùng worker
+_worker_model_path = None
+_worker_extractors = {}
+
+
+def _init_worker(model_path=None):
+    global _worker_model_path
+    _worker_model_path = model_path
+
+
+def _new_extractor():
+    from model.preprocess import HandLandmarkExtractor
+    return HandLandmarkExtractor(_worker_model_path, filtered_hand_indices=HAND_INDICES)
+
+
+@contextlib.contextmanager
+def _extractor(key=None):
+    """Bộ trích xuất của ``key``; yêu cầu không có key dùng một bộ mới, đóng ngay khi xong."""
+    if key is not None:
+        extractor = _worker_extractors.get(key)
+        if extractor is None:
+            extractor = _worker_extractors[key] = _new_extractor()
+        yield extractor
+        return
+    extractor = _new_extractor()
+    try:
+        yield extractor
+    finally:
+        extractor.close()
+
+
+def _release(key):
+    extractor = _worker_extractors.pop(key, None)
+    if extractor is not None:
+        extractor.close()
+    return None, {}
+
+
+# Các hàm worker trả về ``(kết quả, timings)`` với timings = ``{bước: (tổng giây, số lần)}``
+
+def _timed_frames(frames, timer):
+    """Bọc iterator khung hình, cộng dồn thời gian giải mã vào ``timer[0]``."""
+    frames = iter(frames)
+    while True:
+        start = time.perf_counter()
+        try:
+            frame = next(frames)
+        except StopIteration:
+            timer[0] += time.perf_counter() - start
+            return
+        timer[0] += time.perf_counter() - start
+        yield frame
+
+
+_END = object()
+
+
+def _prefetch_frames(frames, depth, timer):
+    """Giải mã khung hình trên một thread riêng, đi trước MediaPipe tối đa ``depth`` khung.
+
+    OpenCV nhả GIL khi giải mã và MediaPipe nhả GIL khi chạy graph, nên hai bước
+    chạy song song và thời gian trích xuất tiến về bước chậm hơn thay vì tổng của
+    hai bước. ``timer`` cộng dồn ``[giây giải mã, giây MediaPipe phải chờ khung hình]``.
+    Với ``depth <= 0`` khung hình được giải mã tuần tự ngay trên thread gọi.
+    """
+    if depth <= 0:
+        try:
+            yield from _timed_frames(frames, timer)
+        finally:
+            # Giải mã tuần tự: MediaPipe chờ trọn thời gian giải mã
+            timer[1] = timer[0]
+        return
+
+    buffer = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def decode():
+        try:
+            for frame in _timed_frames(frames, timer):
+                if not put(frame):
+                    return
+            put(_END)
+        except Exception as e:
+            put(e)
+
+    decoder = threading.Thread(target=decode, name='video-decode', daemon=True)
+    decoder.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            item = buffer.get()
+            timer[1] += time.perf_counter() - start
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Người dùng dừng sớm (đủ số đoạn): cho thread giải mã thoát rồi mới đóng video
+        stop.set()
+        while decoder.is_alive():
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                decoder.join(0.01)
+
+
+def _warm_up_worker():
+    # Chạy MediaPipe một lần để nạp graph/model trước yêu cầu thật đầu tiên
+    with _extractor() as extractor:
+        extractor.process(np.zeros((64, 64, 3), dtype=np.uint8))
+    return os.getpid()
+
+
+def _landmark_frames(frames, key=None):
+    landmarks = np.zeros((len(frames), 2 * len(HAND_INDICES), 3), dtype=np.float32)
+    start = time.perf_counter()
+    with _extractor(key) as extractor:
+        n_frames = extractor.process_batch(frames, landmarks)
+    return landmarks, {'mediapipe_frame': (time.perf_counter() - start, n_frames)}
+
+
+def _landmark_image(image_data, max_side=None, key=None):
+    import cv2
+    start = time.perf_counter()
+    frame = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Không giải mã được khung hình")
+    if max_side:
+        h, w = frame.shape[:2]
+        scale = max_side / max(h, w)
+        if scale < 1:
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    decoded = time.perf_counter()
+    with _extractor(key) as extractor:
+        landmarks = extractor.process(frame_rgb)
+    return landmarks, {
+        'image_decode': (decoded - start, 1),
+        'mediapipe_frame': (time.perf_counter() - decoded, 1),
+    }
+
+
+def _landmark_video(video_path, max_frames, stride=1, max_side=None, prefetch=0, key=None):
+    from model.preprocess import iter_frames, video_fps
+    fps = video_fps(video_path) / stride
+    # Bộ đệm đầu vào model đã pad sẵn bằng 0 tới max_frames
+    landmarks = np.zeros((max_frames, 2 * len(HAND_INDICES), 3), dtype=np.float32)
+    timer = [0.0, 0.0]
+    # Việc giải mã dừng ngay khi đủ max_frames, để suy luận bắt đầu sớm nhất có thể
+    frames = _prefetch_frames(iter_frames(video_path, max_frames=max_frames, stride=stride, max_side=max_side),
+                              prefetch, timer)
+    start = time.perf_counter()
+    with _extractor(key) as extractor:
+        n_frames = extractor.process_batch(frames, landmarks)
+    total = time.perf_counter() - start
+    return (landmarks, n_frames, fps), {
+        'video_decode': (timer[0], 1),
+        'decode_wait': (timer[1], 1),
+        'mediapipe_frame': (total - timer[1], n_frames),
+    }
+
+
+def _segment_video(video_path, max_frames, stride=1, max_side=None, chunk_frames=256, max_segments=None,
+                   options=None, prefetch=0, key=None):
+    from model.preprocess import iter_frames, video_fps
+    fps = video_fps(video_path) / stride
+    segmenter = MotionSegmenter(fps, max_frames, **(options or {}))
+    # Giải mã và trích xuất theo từng khối cố định; chỉ đoạn ký hiệu đang mở được giữ lại
+    chunk = np.zeros((chunk_frames, 2 * len(HAND_INDICES), 3), dtype=np.float32)
+    timer = [0.0, 0.0]
+    frames = _prefetch_frames(iter_frames(video_path, stride=stride, max_side=max_side), prefetch, timer)
+    segments, n_frames, truncated = [], 0, False
+    segment_time = 0.0
+    start = time.perf_counter()
+    try:
+        with _extractor(key) as extractor:
+            while True:
+                n = extractor.process_batch(itertools.islice(frames, chunk_frames), chunk)
+                if not n:
+                    break
+                n_frames += n
+                pushed = time.perf_counter()
+                segments.extend(segmenter.push(chunk[:n]))
+                segment_time += time.perf_counter() - pushed
+                if max_segments and len(segments) >= max_segments:
+                    truncated = True
+                    break
+    finally:
+        frames.close()
+    extract_time = time.perf_counter() - start - timer[1] - segment_time
+    flushed = time.perf_counter()
+    segments.extend(segmenter.flush())
+    segment_time += time.perf_counter() - flushed
+    if max_segments:
+        segments = segments[:max_segments]
+    return (segments, n_frames, fps, truncated), {
+        'video_decode': (timer[0], 1),
+        'decode_wait': (timer[1], 1),
+        'mediapipe_frame': (extract_time, n_frames),
+        'segmentation': (segment_time, 1),
+    }
+
+
+class LandmarkService:
+    """Trích xuất landmark bàn tay trên một pool tiến trình, không chặn event loop.
+
+    Mỗi worker là một tiến trình riêng. Các yêu cầu có ``key`` (ví dụ sid của
+    socket) luôn đi tới cùng một worker và dùng bộ trích xuất MediaPipe riêng của
+    key đó để giữ trạng thái tracking, cho tới khi ``release(key)``; các yêu cầu
+    khác đi tới worker đang rảnh nhất với một bộ trích xuất mới cho mỗi yêu cầu.
+    ``queue_limit`` giới hạn số yêu cầu đang chờ trên mỗi worker. ``model_path``
+    (tệp ``hand_landmarker.task``) bật MediaPipe Tasks API ở chế độ VIDEO.
+    Với video, ``decode_prefetch`` > 0 giải mã trên một thread riêng, đi trước
+    MediaPipe tối đa chừng ấy khung hình.
+    """
+
+    def __init__(self, n_workers=None, queue_limit=4, model_path=None, decode_prefetch=0):
+        self.model_path = model_path
+        self.decode_prefetch = max(0, int(decode_prefetch))
+        self.n_workers = max(1, int(n_workers or os.cpu_count() or 1))
+        self.queue_limit = max(1, int(queue_limit))
+        self._executors = [None] * self.n_workers
+        self._slots = [None] * self.n_workers
+        self._inflight = [0] * self.n_workers
+        self._keys = set()
+        self._context = multiprocessing.get_context('spawn')
+
+    def stats(self):
+        return {
+            'workers': self.n_workers,
+            'queue_limit': self.queue_limit,
+            'decode_prefetch': self.decode_prefetch,
+            'inflight': list(self._inflight),
+        }
+
+    async def landmark_frames(self, frames, key=None):
+        """Trả về mảng ``(T, 42, 3)`` float32 cho một dãy khung hình RGB."""
+        return await self._submit(_landmark_frames, frames, key=key)
+
+    async def landmark_image(self, image_data, max_side=None, key=None):
+        """Giải mã ảnh JPEG/WebP/PNG trong worker và trả về landmark ``(42, 3)`` của nó.
+
+        Ảnh có cạnh dài hơn ``max_side`` được thu nhỏ trước khi chạy MediaPipe.
+        """
+        return await self._submit(_landmark_image, image_data, max_side, key=key)
+
+    async def landmark_video(self, video_path, max_frames, stride=1, max_side=None, key=None):
+        """Giải mã video trong worker, trả về ``(landmarks, n_frames, fps)``.
+
+        ``landmarks`` có shape ``(max_frames, 42, 3)`` và được pad bằng 0 sau
+        ``n_frames`` khung hình thực; ``fps`` là tốc độ khung sau khi lấy mẫu.
+        """
+        return await self._submit(_landmark_video, video_path, max_frames, stride, max_side, self.decode_prefetch,
+                                  key=key)
+
+    async def segment_video(self, video_path, max_frames, stride=1, max_side=None, chunk_frames=256,
+                            max_segments=None, options=None, key=None):
+        """Giải mã toàn bộ video trong worker và chia thành các đoạn ký hiệu theo chuyển động.
+
+        Trả về ``(segments, n_frames, fps, truncated)``: ``segments`` là danh sách
+        ``(start, end, landmarks)`` theo khung hình đã lấy mẫu, mỗi đoạn tối đa
+        ``max_frames`` khung; ``fps`` là tốc độ khung sau khi lấy mẫu. Dừng giải
+        mã (``truncated=True``) khi đã đủ ``max_segments`` đoạn. ``options`` được
+        truyền cho ``MotionSegmenter``.
+        """
+        return await self._submit(_segment_video, video_path, max_frames, stride, max_side, chunk_frames,
+                                  max_segments, options, self.decode_prefetch, key=key)
+
+    async def warm_up(self):
+        """Khởi tạo trước mọi tiến trình worker (spawn, import, nạp MediaPipe)."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(self._executor(i), _warm_up_worker)
+                                      for i in range(self.n_workers)))
+
+    async def release(self, key):
+        """Đóng bộ trích xuất của ``key`` (ví dụ khi socket ngắt kết nối)."""
+        if key in self._keys:
+            await self._submit(_release, key=key)
+            self._keys.discard(key)
+
+    async def _submit(self, fn, *args, key=None):
+        index = self._pick(key)
+        if key is not None:
+            self._keys.add(key)
+        if self._slots[index] is None:
+            self._slots[index] = asyncio.Semaphore(self.queue_limit)
+        async with self._slots[index]:
+            self._inflight[index] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                result, timings = await loop.run_in_executor(self._executor(index),
+                                                             functools.partial(fn, *args, key=key))
+            finally:
+                self._inflight[index] -= 1
+        for stage, (seconds, count) in timings.items():
+            if count:
+                observe_stage(stage, seconds / count, count)
+        return result
+
+    def _pick(self, key):
+        if key is not None:
+            return hash(key) % self.n_workers
+        return min(range(self.n_workers), key=lambda i: self._inflight[i])
+
+    def _executor(self, index):
+        if self._executors[index] is None:
+            self._executors[index] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self.model_path,),
+            )
+        return self._executors[index]
+
+    def shutdown(self, wait=False):
+        for executor in self._executors:
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+        self._executors = [None] * self.n_workers
+        self._keys.clear()
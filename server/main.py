@@ -1,21 +1,21 @@
 import os
 import time
+import hashlib
 import random
 import asyncio
 import logging
 import base64
+import json
+import zipfile
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Union
 from io import BytesIO
 import numpy as np
-import cv2
-import torch
-import mediapipe as mp
 
 # FastAPI và các thư viện liên quan
-from fastapi import FastAPI, APIRouter, Request, Body, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, APIRouter, Request, Body, File, UploadFile, Form, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse as HTTPStreamingResponse
 import uvicorn
 
 # Socket.IO
@@ -28,9 +28,17 @@ from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 load_dotenv()
 
-# Import model
-from model.bi_lstm_att_14 import BiLSTMAttention14
-from model.preprocess import extract_frames, get_hand_landmarks
+# Model được nạp ở nền khi server khởi động (torch, MediaPipe không được import ở đây)
+from model_runtime import ModelRuntime
+from landmark_service import LANDMARK_DTYPES, LandmarkService, decode_landmark_payload
+from segmentation import find_segments
+from session_recorder import CLIENT_LANDMARKS, DROPPED, FILE_SUFFIX, SKIPPED, SessionRecorder
+from streaming import FrameInbox, HandPresenceGate, LandmarkRingBuffer, ResultDebouncer
+from video_io import VideoBuffer
+from result_cache import ResultCache
+from dictionary_index import DictionaryLandmarkIndex
+from dictionary_search import DictionarySearchIndex
+import metrics
 
 # Import data
 from data import TRANSLATION_RESPONSES, DICTIONARY_ITEMS
@@ -40,35 +48,264 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Model constants
-DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 CHARACTERS = ['a', 'ă', 'â', 'b', 'c', 'd', 'đ', 'e', 'ê', 'g', 'h', 'i', 'k', 'l', 'm', 'n', 'o', 'ô', 'ơ', 'p', 'q', 'r', 's', 't', 'u', 'ư', 'v', 'x', 'y', '/', '\\', '?', '~', '.']
 WORDS = ['xin chào', 'tạm biệt', 'cảm ơn', 'xin lỗi', 'ở đâu', 'ai', 'khi nào', 'tại sao', 'làm ơn', 'giúp đỡ', 'ghét', 'hạnh phúc', 'biết ơn', 'buồn', 'mệt', 'khát']
 GLOBS = CHARACTERS + WORDS
 INDEX_TO_GLOB = {index: glob for index, glob in enumerate(GLOBS)}
 
-# Initialize model
-word_model = BiLSTMAttention14(n_classes=len(GLOBS)).to(DEVICE)
-checkpoint = torch.load('model/word_model.pth', map_location=DEVICE)
-word_model.load_state_dict(checkpoint['model_state'])
-word_model.eval()
+# Phiên bản model: mặc định lấy từ nội dung checkpoint để cache tự vô hiệu khi model đổi
+def checkpoint_version(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+MODEL_VERSION = os.getenv("MODEL_VERSION") or checkpoint_version('model/word_model.pth', 'model/char_model.pth')
+
+# Số thread của torch trong mỗi tiến trình; khi chạy nhiều worker nên đặt = số lõi / số worker
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", 0))
+
+# Trọng số được mmap từ tệp checkpoint (CPU): các worker dùng chung page cache thay vì mỗi worker một bản sao
+MODEL_MMAP = os.getenv("MODEL_MMAP", "1") == "1"
+
+# Backend suy luận: eager, quantized, torchscript, torchscript-int8 hoặc onnx
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "eager")
+MODEL_EXPORT_DIR = os.getenv("MODEL_EXPORT_DIR", "exported")
+
+# Gom batch suy luận giữa các phiên và endpoint
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 16))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 5))
+
+# Model, backend và scheduler được nạp ở nền; WARM_UP_ON_STARTUP=0 thì nạp khi có yêu cầu đầu tiên
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+runtime = ModelRuntime(INFERENCE_BACKEND, MODEL_EXPORT_DIR, INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS,
+                       mmap=MODEL_MMAP, num_threads=TORCH_NUM_THREADS)
+BACKEND_SUPPORTS_LENGTHS = runtime.supports_lengths
+logger.info(f"Backend suy luận: {INFERENCE_BACKEND}")
+
+# Chế độ auto chạy cả hai model trong một lần gọi và trả về top-k của từng bộ từ vựng
+AUTO_TOP_K = int(os.getenv("AUTO_TOP_K", 3))
+
+def top_globs(logits, k=1):
+    """Top-k glob ``[{"text", "confidence"}]`` từ logits của một model"""
+    probs = np.exp(logits - logits.max())
+    probs /= probs.sum()
+    return [{"text": INDEX_TO_GLOB[int(i)], "confidence": float(probs[i])} for i in np.argsort(-probs)[:k]]
+
+def split_logits(logits, mode):
+    """Tách logits theo bộ từ vựng: ``{"word": ..., "character": ...}`` (auto có cả hai, nối theo thứ tự đó)"""
+    if mode == 'auto':
+        return {"word": logits[:len(GLOBS)], "character": logits[len(GLOBS):]}
+    return {model_name(mode): logits}
+
+def best_candidate(candidates):
+    """Kết quả cuối cùng từ top-k của các bộ từ vựng.
+
+    word_model phân loại trên cả chữ cái lẫn từ (GLOBS) nên nó quyết định đây là
+    một từ hay một chữ cái; chữ cái thì lấy theo char_model chuyên biệt. Không
+    so độ tin cậy giữa hai model vì char_model luôn tự tin vào một chữ cái.
+    """
+    if "character" not in candidates:
+        return candidates["word"][0]
+    word = candidates.get("word", [None])[0]
+    return word if word is not None and word["text"] in WORDS else candidates["character"][0]
+
+ANALYSIS_MODES = ('character', 'word', 'sentence', 'auto')
+
+def mode_label(mode):
+    """Nhãn chế độ cho metrics: giá trị lạ từ client được gộp thành 'other' để số chuỗi metric có giới hạn"""
+    return mode if mode in ANALYSIS_MODES else 'other'
+
+def model_name(mode):
+    if mode == 'auto':
+        return 'auto'
+    # Chế độ câu ghép các từ nên dùng word_model, cả khi phát trực tiếp lẫn khi tải video lên
+    return 'word' if mode in ('word', 'sentence') else 'character'
+
+async def predict_candidates(video_landmarks, mode, k=1):
+    """Top-k glob của từng bộ từ vựng cho một chuỗi landmark (T, 42, 3)"""
+    logits = (await runtime.submit(model_name(mode), video_landmarks)).numpy()
+    return {name: top_globs(part, k) for name, part in split_logits(logits, mode).items()}
+
+async def predict(video_landmarks, mode):
+    """Dự đoán glob cho một chuỗi landmark (T, 42, 3) qua scheduler tương ứng"""
+    best = best_candidate(await predict_candidates(video_landmarks, mode))
+    return best["text"], best["confidence"]
+
+def logits_response(logits, mode):
+    """Phần ``results`` (và ``candidates`` với chế độ auto) của TranslationResponse từ logits"""
+    k = AUTO_TOP_K if mode == 'auto' else 1
+    candidates = {name: top_globs(part, k) for name, part in split_logits(logits, mode).items()}
+    response = {"results": [best_candidate(candidates)]}
+    if mode == 'auto':
+        response["candidates"] = candidates
+    return response
+
+async def predict_response(video_landmarks, mode):
+    return logits_response((await runtime.submit(model_name(mode), video_landmarks)).numpy(), mode)
 
-char_model = BiLSTMAttention14(n_classes=len(CHARACTERS)).to(DEVICE)
-checkpoint = torch.load('model/char_model.pth', map_location=DEVICE)
-char_model.load_state_dict(checkpoint['model_state'])
-char_model.eval()
+async def predict_responses(sequences, mode):
+    """Như ``predict_response`` cho nhiều chuỗi landmark, được đưa vào scheduler cùng lúc để chạy chung batch"""
+    outputs = await runtime.submit_many(model_name(mode), sequences)
+    return [logits_response(output.numpy(), mode) for output in outputs]
 
+async def predict_segments(segments, mode, fps):
+    """Dự đoán glob cho mọi đoạn ``(start, end, landmarks)`` trong cùng batch, kèm mốc thời gian (giây)"""
+    if not segments:
+        return []
+    outputs = await runtime.submit_many(model_name(mode), [landmarks for _, _, landmarks in segments])
+    return [
+        {**best_candidate({key: top_globs(part) for key, part in split_logits(output.numpy(), mode).items()}),
+         "start": start / fps, "end": end / fps}
+        for output, (start, end, _) in zip(outputs, segments)
+    ]
 
-# Initialize MediaPipe hands
-hands = mp.solutions.hands.Hands(
-    static_image_mode=False,
-    max_num_hands=2,
+# Pool tiến trình trích xuất landmark (0 = số lõi CPU; ``run.py --prod`` chia lõi cho các worker web)
+LANDMARK_WORKERS = int(os.getenv("LANDMARK_WORKERS", 0)) or (os.cpu_count() or 1)
+LANDMARK_QUEUE_LIMIT = int(os.getenv("LANDMARK_QUEUE_LIMIT", 4))
+HAND_LANDMARKER_MODEL = os.getenv("HAND_LANDMARKER_MODEL") or None
+# Số khung hình video được giải mã trước trên thread riêng, song song với MediaPipe (0 = tuần tự)
+VIDEO_DECODE_PREFETCH = int(os.getenv("VIDEO_DECODE_PREFETCH", 8))
+landmark_service = LandmarkService(LANDMARK_WORKERS, LANDMARK_QUEUE_LIMIT, HAND_LANDMARKER_MODEL,
+                                   VIDEO_DECODE_PREFETCH)
+
+# Giải mã video tải lên: lấy mẫu 1/VIDEO_FRAME_STRIDE khung hình, thu nhỏ về VIDEO_MAX_SIDE pixel
+VIDEO_FRAME_STRIDE = max(1, int(os.getenv("VIDEO_FRAME_STRIDE", 1)))
+VIDEO_MAX_SIDE = int(os.getenv("VIDEO_MAX_SIDE", 0)) or None
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mov')
+
+# Dịch hàng loạt (/translate/batch): số clip tối đa, tổng dung lượng video (kể cả sau khi
+# giải nén zip) và số clip được giải mã/trích xuất landmark cùng lúc (0 = 2 × LANDMARK_WORKERS)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 500))
+BATCH_MAX_MB = int(os.getenv("BATCH_MAX_MB", 512))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 0)) or 2 * LANDMARK_WORKERS
+
+# Chia video dài thành nhiều ký hiệu theo chuyển động của tay (chế độ "sentence" hoặc segment=true)
+SEGMENT_OPTIONS = {
+    'threshold': float(os.getenv("SEGMENT_MOTION_THRESHOLD", 0.08)),
+    'min_rest_s': float(os.getenv("SEGMENT_MIN_REST_S", 0.3)),
+}
+SEGMENT_MAX_SEGMENTS = int(os.getenv("SEGMENT_MAX_SEGMENTS", 64))
+
+def wants_segments(mode, segment):
+    return mode == 'sentence' or segment
+
+def model_frames(mode):
+    """Số khung hình tối đa của một ký hiệu cho model tương ứng với chế độ"""
+    return 75 if mode == 'character' else 150
+
+# Cache kết quả dịch theo hash nội dung video
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR") or None
+RESULT_CACHE_MAX_DISK_BYTES = int(os.getenv("RESULT_CACHE_MAX_DISK_MB", 512)) * 1024 * 1024
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 256)),
+    disk_dir=RESULT_CACHE_DIR,
+    max_disk_bytes=RESULT_CACHE_MAX_DISK_BYTES,
+)
+# Landmark đã trích xuất theo hash nội dung video: dùng lại cho chế độ khác hoặc model mới
+# mà không chạy lại MediaPipe
+landmark_cache = ResultCache(
+    max_entries=int(os.getenv("LANDMARK_CACHE_MAX_ENTRIES", 256)),
+    disk_dir=os.path.join(RESULT_CACHE_DIR, "landmarks") if RESULT_CACHE_DIR else None,
+    max_disk_bytes=RESULT_CACHE_MAX_DISK_BYTES,
 )
 
-# Frame buffer for batch processing
+# Chỉ mục tìm kiếm văn bản của từ điển (id, danh mục, trigram không dấu)
+dictionary_search = DictionarySearchIndex(DICTIONARY_ITEMS)
+
+# Chỉ mục landmark của các video từ điển (tạo bằng `python dictionary_index.py`)
+DICTIONARY_INDEX_DIR = os.getenv("DICTIONARY_INDEX_DIR", "dictionary_index")
+dictionary_index = None
+if os.path.exists(os.path.join(DICTIONARY_INDEX_DIR, "index.json")):
+    dictionary_index = DictionaryLandmarkIndex.load(DICTIONARY_INDEX_DIR)
+    logger.info(f"Đã nạp chỉ mục từ điển với {len(dictionary_index)} video")
+    if dictionary_index.model_version != checkpoint_version('model/word_model.pth'):
+        logger.warning("Chỉ mục từ điển được tạo từ checkpoint khác, hãy chạy lại dictionary_index.py")
+
+def video_cache_key(digest, mode, segment=False):
+    """Khóa kết quả: mọi tham số làm thay đổi response của một video"""
+    parts = [mode, MODEL_VERSION, INFERENCE_BACKEND, BACKEND_SUPPORTS_LENGTHS,
+             HAND_LANDMARKER_MODEL or 'solutions', VIDEO_FRAME_STRIDE, VIDEO_MAX_SIDE]
+    if wants_segments(mode, segment):
+        parts += ['segments', *(SEGMENT_OPTIONS[name] for name in sorted(SEGMENT_OPTIONS)), SEGMENT_MAX_SEGMENTS]
+    if mode == 'auto':
+        parts.append(AUTO_TOP_K)
+    return ResultCache.make_key(digest, *parts)
+
+def landmark_cache_key(digest, *parts):
+    """Khóa landmark: nội dung video và tham số trích xuất, không phụ thuộc chế độ hay model"""
+    return ResultCache.make_key(digest, 'landmarks', HAND_LANDMARKER_MODEL or 'solutions',
+                                VIDEO_FRAME_STRIDE, VIDEO_MAX_SIDE, *parts)
+
+async def extract_landmarks(video_path, mode, digest=None):
+    """``(landmarks, n_frames, fps)`` của tối đa ``model_frames(mode)`` khung hình đầu của video.
+
+    Với ``digest``, landmark đã trích xuất trước đó cho cùng nội dung (ở chế độ
+    bất kỳ, model bất kỳ) được dùng lại nếu phủ đủ ngân sách khung hình.
+    """
+    max_frames = model_frames(mode)
+    key = landmark_cache_key(digest) if digest else None
+    cached = await landmark_cache.get(key) if key else None
+    if cached is not None:
+        landmarks, info = cached
+        # Đủ khung hình, hoặc lần trước đã đọc hết video
+        if len(landmarks) >= max_frames or info['complete']:
+            landmarks = landmarks[:max_frames]
+            return landmarks, len(landmarks), info['fps']
+    landmarks, n_frames, fps = await landmark_service.landmark_video(
+        video_path, max_frames, VIDEO_FRAME_STRIDE, VIDEO_MAX_SIDE)
+    landmarks = landmarks[:n_frames]
+    if key and (cached is None or n_frames > len(cached[0])):
+        await landmark_cache.put(key, landmarks, {'fps': fps, 'complete': n_frames < max_frames})
+    return landmarks, n_frames, fps
+
+async def extract_segments(video_path, mode, digest=None):
+    """``(segments, n_frames, fps, truncated)`` của cả video, chia theo chuyển động của tay.
+
+    Với ``digest``, các đoạn đã tách trước đó cho cùng nội dung và cùng cấu hình
+    chia đoạn được dùng lại, kể cả khi chế độ hay model khác.
+    """
+    max_frames = model_frames(mode)
+    key = None
+    if digest:
+        key = landmark_cache_key(digest, 'segments', max_frames, SEGMENT_MAX_SEGMENTS,
+                                 *(SEGMENT_OPTIONS[name] for name in sorted(SEGMENT_OPTIONS)))
+        cached = await landmark_cache.get(key)
+        if cached is not None:
+            landmarks, info = cached
+            offsets = np.cumsum([0] + [end - start for start, end in info['bounds']])
+            segments = [(start, end, landmarks[offsets[i]:offsets[i + 1]])
+                        for i, (start, end) in enumerate(info['bounds'])]
+            return segments, info['n_frames'], info['fps'], info['truncated']
+
+    segments, n_frames, fps, truncated = await landmark_service.segment_video(
+        video_path, max_frames, VIDEO_FRAME_STRIDE, VIDEO_MAX_SIDE,
+        max_segments=SEGMENT_MAX_SEGMENTS, options=SEGMENT_OPTIONS)
+    if key:
+        landmarks = (np.concatenate([s[2] for s in segments]) if segments
+                     else np.zeros((0, 42, 3), dtype=np.float32))
+        await landmark_cache.put(key, landmarks, {
+            'bounds': [[int(start), int(end)] for start, end, _ in segments],
+            'n_frames': n_frames, 'fps': fps, 'truncated': truncated})
+    return segments, n_frames, fps, truncated
+
+# Landmark buffer for batch processing
 FRAME_BUFFER_SIZE = 150
-frame_buffer = {}
 landmark_buffer = {}
 
+# Giới hạn cho chế độ nhận dạng liên tục (cửa sổ trượt)
+MIN_STREAM_WINDOW = 15
+MAX_STREAM_WINDOW = 300
+STREAM_MIN_CONFIDENCE = float(os.getenv("STREAM_MIN_CONFIDENCE", 0.5))
+
+# Ngắt xử lý khi không có tay: nghỉ sau N khung hình trống, khi nghỉ chỉ xử lý 1/K khung hình
+STREAM_IDLE_AFTER = int(os.getenv("STREAM_IDLE_AFTER", 15))
+STREAM_IDLE_SAMPLE_EVERY = int(os.getenv("STREAM_IDLE_SAMPLE_EVERY", 5))
+
+# Giới hạn kích thước body của /translate/landmarks (mặc định đủ cho 300 khung float32)
+LANDMARK_UPLOAD_MAX_BYTES = int(os.getenv("LANDMARK_UPLOAD_MAX_BYTES", 1024 * 1024))
+
 # =========================================================
 # Pydantic Models
 # =========================================================
@@ -95,6 +332,15 @@ class DictionarySearchResponse(BaseModel):
 class DictionaryDetailResponse(BaseModel):
     item: DictionaryItem
 
+class DictionarySimilarItem(BaseModel):
+    name: str
+    file: str
+    score: float
+
+class DictionarySimilarResponse(BaseModel):
+    items: List[DictionarySimilarItem]
+    processing_time: float
+
 # Learn models
 class LessonContent(BaseModel):
     type: str
@@ -126,21 +372,29 @@ class LessonDetailResponse(BaseModel):
 class TranslationResult(BaseModel):
     text: str
     confidence: float
+    start: Optional[float] = None  # Mốc thời gian của ký hiệu trong video (giây), khi chia đoạn
+    end: Optional[float] = None
 
 class TranslationRequest(BaseModel):
     video_data: Optional[str] = None  # Dữ liệu video mã hóa Base64
     video_url: Optional[str] = None   # URL cho video đã tải lên
-    mode: str = "word"  # "character", "word", hoặc "sentence"
+    mode: str = "word"  # "character", "word", "sentence" hoặc "auto"
+    segment: bool = False  # Chia video thành nhiều ký hiệu (luôn bật với "sentence")
 
 class TranslationResponse(BaseModel):
     results: List[TranslationResult]
     analysis_mode: str
     processing_time: float
     video_duration: Optional[float] = None
+    cached: bool = False
+    truncated: bool = False  # Đã dừng sau SEGMENT_MAX_SEGMENTS ký hiệu
+    candidates: Optional[Dict[str, List[TranslationResult]]] = None  # Top-k theo bộ từ vựng (chế độ auto)
+    stage_timings: Optional[Dict[str, float]] = None  # Thời gian từng bước (giây), khi gọi với ?timings=true
+    stage_occupancy: Optional[Dict[str, float]] = None  # Tỉ lệ thời gian từng bước bận trên processing_time
     
 # Socket.io models
 class StreamingMessage(BaseModel):
-    frame: str  # Khung hình mã hóa Base64
+    frame: Union[bytes, str]  # Khung hình JPEG/WebP nhị phân hoặc mã hóa Base64
     timestamp: float
 
 class StreamingResponse(BaseModel):
@@ -224,15 +478,73 @@ class StreamingResponse(BaseModel):
 # Thiết lập Socket.IO
 # =========================================================
 
+# Khung hình gửi qua socket: nhị phân (JPEG/WebP) hoặc base64; cạnh dài tối đa được thỏa thuận với client
+STREAM_FRAME_MAX_SIDE = int(os.getenv("STREAM_FRAME_MAX_SIDE", 640))
+SOCKET_MAX_BUFFER_SIZE = int(os.getenv("SOCKET_MAX_BUFFER_SIZE", 10 * 1024 * 1024))
+
+# Backpressure: tốc độ khung hình đề xuất cho client, kích thước hộp thư mỗi phiên
+# (khung hình cũ nhất bị bỏ khi đầy), ngưỡng gửi sự kiện throttle và số phiên tối đa
+STREAM_TARGET_FPS = int(os.getenv("STREAM_TARGET_FPS", 15))
+STREAM_INBOX_SIZE = int(os.getenv("STREAM_INBOX_SIZE", 4))
+STREAM_THROTTLE_AT = int(os.getenv("STREAM_THROTTLE_AT", 3))
+MAX_STREAM_SESSIONS = int(os.getenv("MAX_STREAM_SESSIONS", 100))
+
+# Chạy nhiều worker: mỗi phiên phải nằm trọn trong một tiến trình, nên chỉ dùng websocket
+# (long-polling gửi các request của cùng phiên tới worker bất kỳ). Hàng đợi thông điệp
+# (redis://... hoặc amqp://...) cho phép emit tới phiên thuộc worker khác.
+SOCKET_TRANSPORTS = [t.strip() for t in os.getenv("SOCKET_TRANSPORTS", "polling,websocket").split(',') if t.strip()]
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE") or None
+
+# Ghi lại mỗi phiên streaming (landmark float16, kèm ảnh JPEG thu nhỏ nếu JPEG_SIDE > 0)
+# vào SESSION_RECORD_DIR để phát lại bằng benchmarks.replay_sessions; để trống là tắt
+SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR", "")
+SESSION_RECORD_JPEG_SIDE = int(os.getenv("SESSION_RECORD_JPEG_SIDE", 0))
+# Số lệnh ghi đang chờ tối đa của một phiên trước khi bỏ ảnh (gấp đôi thì bỏ cả khung hình)
+SESSION_RECORD_MAX_PENDING = int(os.getenv("SESSION_RECORD_MAX_PENDING", 256))
+
+def open_recorder(sid):
+    if not SESSION_RECORD_DIR:
+        return None
+    os.makedirs(SESSION_RECORD_DIR, exist_ok=True)
+    path = os.path.join(SESSION_RECORD_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{sid}{FILE_SUFFIX}")
+    logger.info(f"Ghi phiên {sid} vào {path}")
+    return SessionRecorder(path, SESSION_RECORD_JPEG_SIDE, meta={'sid': sid, 'frame_max_side': STREAM_FRAME_MAX_SIDE},
+                           max_pending=SESSION_RECORD_MAX_PENDING)
+
+def record_dropped(recorder):
+    """Ghi lại khung hình (hoặc lô landmark) bị bỏ khỏi hộp thư để lượt phát lại có cùng tải đầu vào"""
+    if recorder is None:
+        return None
+
+    def on_drop(item):
+        frame_data, _, analysis_mode, received = item
+        if isinstance(frame_data, np.ndarray):
+            for frame in frame_data:
+                recorder.frame(received, analysis_mode, frame, flags=CLIENT_LANDMARKS | DROPPED)
+        else:
+            recorder.frame(received, analysis_mode, image=frame_data, flags=DROPPED)
+    return on_drop
+
+def socketio_client_manager(url):
+    if not url:
+        return None
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return socketio.AsyncRedisManager(url)
+    if url.startswith('amqp://'):
+        return socketio.AsyncAioPikaManager(url)
+    raise ValueError(f"SOCKETIO_MESSAGE_QUEUE không được hỗ trợ: {url}")
+
 # Khởi tạo Socket.IO server
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=socketio_client_manager(SOCKETIO_MESSAGE_QUEUE),
+    transports=SOCKET_TRANSPORTS,
     cors_allowed_origins=['http://localhost:3000', '*'], 
     logger=True,
     engineio_logger=True,
     ping_timeout=60,
     ping_interval=25,
-    max_http_buffer_size=1e8,
+    max_http_buffer_size=SOCKET_MAX_BUFFER_SIZE,
     always_connect=True,
 )
 socket_app = socketio.ASGIApp(sio, socketio_path='socket.io')
@@ -287,8 +599,14 @@ async def connect(sid, environ):
     logger.info(f"Client kết nối: {sid}")
     logger.info(f"Nguồn gốc kết nối: {environ.get('HTTP_ORIGIN', 'Nguồn không xác định')}")
     
+    if MAX_STREAM_SESSIONS and len(connected_clients) >= MAX_STREAM_SESSIONS:
+        logger.warning(f"Từ chối kết nối {sid}: đã đạt {MAX_STREAM_SESSIONS} phiên")
+        raise socketio.exceptions.ConnectionRefusedError('Máy chủ đang quá tải, vui lòng thử lại sau')
+    
     # Bắt đầu nhiệm vụ nền cho client này
     task = sio.start_background_task(send_periodic_results, sid)
+    recorder = open_recorder(sid)
+    inbox = FrameInbox(STREAM_INBOX_SIZE, STREAM_THROTTLE_AT, on_drop=record_dropped(recorder))
 
     # Lưu thông tin client
     connected_clients[sid] = {
@@ -299,11 +617,30 @@ async def connect(sid, environ):
             'origin': environ.get('HTTP_ORIGIN', 'Unknown'),
             'user_agent': environ.get('HTTP_USER_AGENT', 'Unknown'),
         },
-        'task': task  # Lưu handle của task để dọn dẹp sau
+        'gate': HandPresenceGate(STREAM_IDLE_AFTER, STREAM_IDLE_SAMPLE_EVERY),
+        'inbox': inbox,
+        'frame_ms': 0.0,
+        'recorder': recorder,
+        'task': task,  # Lưu handle của task để dọn dẹp sau
+        'consumer': sio.start_background_task(consume_frames, sid, inbox),
     }
     
     try:
-        await sio.emit('connection_success', {'message': 'Kết nối thành công, cập nhật định kỳ đã bắt đầu'}, room=sid)
+        await sio.emit('connection_success', {
+            'message': 'Kết nối thành công, cập nhật định kỳ đã bắt đầu',
+            'frame_transport': {
+                'binary': True,
+                'formats': ['image/jpeg', 'image/webp'],
+                'max_side': STREAM_FRAME_MAX_SIDE,
+                'target_fps': STREAM_TARGET_FPS,
+            },
+            'landmark_transport': {
+                'event': 'video_landmarks',
+                'dtypes': list(LANDMARK_DTYPES),
+                'frame_shape': [42, 3],
+                'max_frames': MAX_STREAM_WINDOW,
+            },
+        }, room=sid)
         logger.info(f"Đã gửi kết nối thành công cho {sid}")
     except Exception as e:
         logger.error(f"Lỗi khi gửi thông báo kết nối thành công: {e}")
@@ -318,7 +655,8 @@ async def disconnect(sid):
     """Xử lý khi client ngắt kết nối"""
     logger.info(f"Client ngắt kết nối: {sid}")
     if sid in connected_clients:
-        # Hủy nhiệm vụ nền
+        # Hủy nhiệm vụ xử lý khung hình và nhiệm vụ nền
+        connected_clients[sid]['consumer'].cancel()
         task = connected_clients[sid].get('task')
         if task:
             try:
@@ -328,8 +666,15 @@ async def disconnect(sid):
                 logger.info(f"Nhiệm vụ cho {sid} đã được hủy.")
             except Exception as e:
                 logger.error(f"Lỗi khi hủy nhiệm vụ cho {sid}: {e}")
+        if connected_clients[sid]['recorder']:
+            connected_clients[sid]['recorder'].close()
         # Xóa dữ liệu client
         del connected_clients[sid]
+        landmark_buffer.pop(sid, None)
+        try:
+            await landmark_service.release(sid)
+        except Exception as e:
+            logger.error(f"Lỗi khi giải phóng bộ trích xuất của {sid}: {e}")
     else:
         logger.warning(f"Sự kiện ngắt kết nối cho sid không xác định: {sid}")
 
@@ -342,6 +687,7 @@ async def video_frame(sid, data):
     
     client = connected_clients[sid]
     client['frames_processed'] += 1
+    metrics.REQUESTS.inc('socket_frame', mode_label(data.get('mode', client['last_analysis_mode'])))
     logger.debug(f"Đã nhận khung hình {client['frames_processed']} từ {sid}")
     
     # Kiểm tra định dạng dữ liệu
@@ -354,74 +700,182 @@ async def video_frame(sid, data):
         logger.warning(f"Nhận được dữ liệu khung hình trống từ {sid}")
         return
     
-    # Xử lý khung hình
-    await process_frame(sid, frame_data, timestamp, analysis_mode)
+    await enqueue(sid, client, (frame_data, timestamp, analysis_mode, time.monotonic()))
+
+async def enqueue(sid, client, item):
+    """Không chờ xử lý: đưa vào hộp thư của phiên, mục cũ nhất bị bỏ nếu đầy"""
+    inbox = client['inbox']
+    if inbox.put(item):
+        await sio.emit('throttle', {
+            'queue_depth': len(inbox),
+            'frames_dropped': inbox.frames_dropped,
+            'target_fps': suggested_fps(client),
+        }, room=sid)
+
+def suggested_fps(client):
+    """Tốc độ khung hình phiên này theo kịp, ước lượng từ thời gian xử lý mỗi khung hình"""
+    if client['frame_ms'] <= 0:
+        return STREAM_TARGET_FPS
+    return max(1, min(STREAM_TARGET_FPS, int(1000.0 / client['frame_ms'])))
+
+async def consume_frames(sid, inbox):
+    """Xử lý tuần tự các khung hình (ảnh hoặc lô landmark từ client) trong hộp thư của một phiên"""
+    while True:
+        frame_data, timestamp, analysis_mode, received = await inbox.get()
+        client = connected_clients.get(sid)
+        if client is None:
+            return
+        start = time.perf_counter()
+        if isinstance(frame_data, np.ndarray):
+            await process_landmark_batch(sid, frame_data, analysis_mode, received)
+        else:
+            await process_frame(sid, frame_data, timestamp, analysis_mode, received)
+        # Trung bình trượt thời gian xử lý, dùng để đề xuất FPS khi throttle
+        elapsed = (time.perf_counter() - start) * 1000.0
+        client['frame_ms'] = elapsed if client['frame_ms'] <= 0 else 0.8 * client['frame_ms'] + 0.2 * elapsed
 
-async def process_frame(sid, frame_data, timestamp, analysis_mode):
+@sio.event
+async def video_landmarks(sid, data):
+    """Nhận landmark đã được client tự trích xuất (mảng nhị phân (T, 42, 3))"""
+    if sid not in connected_clients:
+        logger.warning(f"Nhận được landmark từ sid không xác định: {sid}")
+        return
+    
+    client = connected_clients[sid]
+    analysis_mode = data.get('mode', client['last_analysis_mode'])
+    client['last_analysis_mode'] = analysis_mode
+    
+    try:
+        landmarks = decode_landmark_payload(data.get('landmarks'), data.get('dtype', 'float32'), MAX_STREAM_WINDOW)
+    except ValueError as e:
+        await sio.emit('error', {'message': f'Landmark không hợp lệ: {str(e)}'}, room=sid)
+        return
+    
+    client['frames_processed'] += len(landmarks)
+    metrics.REQUESTS.inc('socket_landmarks', mode_label(analysis_mode))
+    # Cả lô đi qua hộp thư như một khung hình: các lô của một phiên được xử lý lần lượt
+    # theo thứ tự nhận, và lô cũ bị bỏ khi client gửi nhanh hơn tốc độ xử lý
+    await enqueue(sid, client, (landmarks, None, analysis_mode, time.monotonic()))
+
+async def process_landmark_batch(sid, landmarks, analysis_mode, received=None):
+    """Đưa lần lượt các khung hình của một lô landmark ``(T, 42, 3)`` từ client vào pipeline"""
+    try:
+        recorder = connected_clients.get(sid, {}).get('recorder')
+        if recorder:
+            received = time.monotonic() if received is None else received
+            for frame in landmarks:
+                recorder.frame(received, analysis_mode, frame, flags=CLIENT_LANDMARKS)
+        # Bỏ qua bước giải mã ảnh và MediaPipe, đưa thẳng từng khung hình vào pipeline
+        for frame in landmarks:
+            await process_landmarks(sid, frame, analysis_mode)
+    except Exception as e:
+        logger.error(f"Lỗi xử lý landmark: {str(e)}")
+        await sio.emit('error', {'message': f'Lỗi xử lý: {str(e)}'}, room=sid)
+
+async def emit_prediction(sid, client, video_landmarks, analysis_mode):
+    """Dự đoán một cửa sổ landmark và gửi kết quả (qua bộ gộp nếu ở chế độ liên tục)"""
+    predicted_text, confidence = await predict(video_landmarks, analysis_mode)
+    
+    # # If confidence is below threshold, use unknown text
+    # if confidence < MIN_CONFIDENCE_THRESHOLD:
+    #     predicted_text = UNKNOWN_TEXT
+    
+    if client.get('stride') and not client['debouncer'].update(predicted_text, confidence):
+        return
+    
+    # Send result
+    response = {
+        'text': predicted_text,
+        'confidence': confidence,
+        'timestamp': time.time(),
+    }
+    
+    with metrics.stage('emit'):
+        await sio.emit('translation_result', response, room=sid)
+
+async def process_frame(sid, frame_data, timestamp, analysis_mode, received=None):
     """Xử lý khung hình và gửi kết quả"""
     try:
-        # Chuyển đổi base64 frame thành numpy array
-        image_data = base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
-        nparr = np.frombuffer(image_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        client = connected_clients.get(sid, {})
+        gate = client.get('gate')
+        recorder = client.get('recorder')
+        received = time.monotonic() if received is None else received
         
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Khi phiên đang nghỉ chỉ lấy mẫu thưa, bỏ qua cả bước giải mã
+        if gate and not gate.should_process():
+            if recorder:
+                recorder.frame(received, analysis_mode, image=frame_data, flags=SKIPPED)
+            return
         
-        # Initialize buffers for this session if not exists
-        if sid not in frame_buffer:
-            frame_buffer[sid] = []
-            landmark_buffer[sid] = []
-        
-        # Add frame to buffer
-        frame_buffer[sid].append(frame_rgb)
-        
-        # Keep only last FRAME_BUFFER_SIZE frames
-        if len(frame_buffer[sid]) > FRAME_BUFFER_SIZE:
-            frame_buffer[sid] = frame_buffer[sid][-FRAME_BUFFER_SIZE:]
+        # Khung hình nhị phân dùng trực tiếp; chuỗi base64/data URL vẫn được hỗ trợ
+        if isinstance(frame_data, (bytes, bytearray, memoryview)):
+            image_data = bytes(frame_data)
+        else:
+            with metrics.stage('base64_decode'):
+                image_data = base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
         
-        # Process frames in batches
-        if len(frame_buffer[sid]) >= FRAME_BUFFER_SIZE:
-            # Get hand landmarks for all frames
-            landmarks = []
-            for f in frame_buffer[sid]:
-                landmark = get_hand_landmarks(f, np.array(list(range(21))), verbose=False)
-                landmarks.append(landmark)
-            
-            # Convert to tensor
-            video_landmarks = np.array(landmarks)
-            video_landmarks = torch.from_numpy(video_landmarks).to(torch.float32)
-            
-            # Get prediction
-            with torch.no_grad():
-                outputs = model(video_landmarks.unsqueeze(0))
-                _, pred = torch.max(outputs, 1)
-                confidence = torch.softmax(outputs, dim=1)[0][pred[0]].item()
-            
-            # Get predicted text
-            predicted_text = INDEX_TO_GLOB[int(pred[0])]
-            
-            # # If confidence is below threshold, use unknown text
-            # if confidence < MIN_CONFIDENCE_THRESHOLD:
-            #     predicted_text = UNKNOWN_TEXT
-            
-            # Clear buffers after processing
-            frame_buffer[sid] = []
-            landmark_buffer[sid] = []
-            
-            # Send result
-            response = {
-                'text': predicted_text,
-                'confidence': confidence,
-                'timestamp': time.time(),
-            }
-            
-            await sio.emit('translation_result', response, room=sid)
+        # Trích xuất landmark ngay cho từng khung hình, không giữ lại ảnh gốc
+        landmarks = await landmark_service.landmark_image(image_data, STREAM_FRAME_MAX_SIDE, key=sid)
+        if recorder:
+            recorder.frame(received, analysis_mode, landmarks, image_data)
+        await process_landmarks(sid, landmarks, analysis_mode)
     
     except Exception as e:
         logger.error(f"Lỗi xử lý khung hình: {str(e)}")
         await sio.emit('error', {'message': f'Lỗi xử lý: {str(e)}'}, room=sid)
 
+async def process_landmarks(sid, landmarks, analysis_mode):
+    """Đưa landmark (42, 3) của một khung hình vào pipeline nhận dạng của phiên"""
+    client = connected_clients.get(sid, {})
+    gate = client.get('gate')
+    window = client.get('window', FRAME_BUFFER_SIZE)
+    stride = client.get('stride')
+    
+    # Initialize buffer for this session if not exists
+    if sid not in landmark_buffer:
+        landmark_buffer[sid] = LandmarkRingBuffer(window)
+    buffer = landmark_buffer[sid]
+    
+    if gate:
+        state = gate.update(bool(landmarks.any()))
+        if state == HandPresenceGate.IDLE:
+            # Ký hiệu vừa kết thúc: nhận dạng phần đã có (bỏ các khung hình trống ở cuối)
+            n_signed = len(buffer) - (gate.idle_after - 1)
+            if n_signed >= MIN_STREAM_WINDOW:
+                video_landmarks = buffer.window()[:n_signed]
+                await emit_prediction(sid, client, video_landmarks, analysis_mode)
+            buffer.clear()
+            await sio.emit('stream_state', {'idle': True}, room=sid)
+            return
+        if gate.idle:
+            return
+        if state == HandPresenceGate.RESUMED:
+            # Tay xuất hiện lại: bắt đầu một cửa sổ nhận dạng mới
+            buffer.clear()
+            client['frames_since_inference'] = 0
+            if client.get('debouncer'):
+                client['debouncer'].reset()
+            await sio.emit('stream_state', {'idle': False}, room=sid)
+    
+    buffer.append(landmarks)
+    
+    if stride:
+        # Chế độ liên tục: đánh giá cửa sổ chồng lấp sau mỗi `stride` khung hình
+        client['frames_since_inference'] = client.get('frames_since_inference', 0) + 1
+        if not buffer.full or client['frames_since_inference'] < stride:
+            return
+        client['frames_since_inference'] = 0
+        await emit_prediction(sid, client, buffer.window(), analysis_mode)
+    
+    # Process landmarks once the window is full
+    elif buffer.full:
+        video_landmarks = buffer.window()
+        
+        # Clear buffer after taking the window
+        buffer.clear()
+        
+        await emit_prediction(sid, client, video_landmarks, analysis_mode)
+
 @sio.event
 async def start_session(sid, data):
     """Bắt đầu một phiên mới"""
@@ -431,9 +885,33 @@ async def start_session(sid, data):
         client['session_started'] = True
         client['session_id'] = f"session_{int(time.time())}"
         
+        # Cấu hình cửa sổ nhận dạng; có `stride` thì bật chế độ liên tục
+        data = data or {}
+        try:
+            window = int(data.get('window') or FRAME_BUFFER_SIZE)
+            stride = int(data['stride']) if data.get('stride') else None
+        except (TypeError, ValueError):
+            await sio.emit('error', {'message': 'window và stride phải là số nguyên'}, room=sid)
+            return
+        window = min(max(window, MIN_STREAM_WINDOW), MAX_STREAM_WINDOW)
+        if stride is not None:
+            stride = min(max(stride, 1), window)
+        
+        client['window'] = window
+        client['stride'] = stride
+        client['frames_since_inference'] = 0
+        client['debouncer'] = ResultDebouncer(STREAM_MIN_CONFIDENCE)
+        client['gate'] = HandPresenceGate(STREAM_IDLE_AFTER, STREAM_IDLE_SAMPLE_EVERY)
+        landmark_buffer[sid] = LandmarkRingBuffer(window)
+        if client['recorder']:
+            client['recorder'].event('start_session', data)
+        
         await sio.emit('session_started', {
             'session_id': client['session_id'],
-            'started_at': datetime.now().isoformat()
+            'started_at': datetime.now().isoformat(),
+            'window': window,
+            'stride': stride,
+            'continuous': stride is not None,
         }, room=sid)
 
 @sio.event
@@ -446,11 +924,16 @@ async def end_session(sid, data):
             summary = {
                 'session_id': client.get('session_id', 'unknown'),
                 'frames_processed': client['frames_processed'],
+                'frames_skipped_idle': client['gate'].frames_skipped,
+                'frames_dropped': client['inbox'].frames_dropped,
+                'avg_queue_latency_ms': client['inbox'].stats()['avg_queue_latency_ms'],
                 'duration': (datetime.now() - client['connected_at']).total_seconds(),
                 'mode': client['last_analysis_mode']
             }
             
             client['session_started'] = False
+            if client['recorder']:
+                client['recorder'].event('end_session')
             await sio.emit('session_ended', summary, room=sid)
 
 # =========================================================
@@ -464,24 +947,18 @@ translate_router = APIRouter(prefix="/translate", tags=["translate"])
 
 # Dictionary routes
 @dictionary_router.get("/search", response_model=DictionarySearchResponse)
-async def search_dictionary(q: Optional[str] = None, category: Optional[str] = None):
-    """
-    Tìm kiếm trong từ điển ngôn ngữ ký hiệu
+async def search_dictionary(q: Optional[str] = None, category: Optional[str] = None,
+                            limit: int = 100, offset: int = 0, query: Optional[str] = None):
     """
-    items = DICTIONARY_ITEMS
-    
-    # Áp dụng bộ lọc
-    if q:
-        q = q.lower()
-        items = [item for item in items if q in item["word"].lower() or 
-                any(q in variation.lower() for variation in item["variations"])]
-    
-    if category and category.lower() != "tất cả":
-        items = [item for item in items if item["category"].lower() == category.lower()]
+    Tìm kiếm trong từ điển ngôn ngữ ký hiệu (không phân biệt dấu: "cam on" khớp "Cảm ơn")
     
+    Kết quả được xếp hạng (khớp hoàn toàn, tiền tố, rồi chuỗi con) và phân trang
+    bằng limit/offset; total là tổng số kết quả trước khi phân trang.
+    """
+    items, total = dictionary_search.search(q or query, category, max(0, limit), max(0, offset))
     return {
         "items": items,
-        "total": len(items)
+        "total": total
     }
 
 @dictionary_router.get("/items", response_model=DictionarySearchResponse)
@@ -502,9 +979,9 @@ async def get_dictionary_item(item_id: int):
     """
     Lấy thông tin chi tiết cho một mục từ điển
     """
-    for item in DICTIONARY_ITEMS:
-        if item["id"] == item_id:
-            return {"item": item}
+    item = dictionary_search.get(item_id)
+    if item is not None:
+        return {"item": item}
     
     raise HTTPException(status_code=404, detail=f"Mục từ điển {item_id} không tìm thấy")
 
@@ -513,16 +990,58 @@ async def get_dictionary_categories():
     """
     Lấy danh sách các danh mục từ điển
     """
-    return ["Tất cả"]
+    return ["Tất cả"] + dictionary_search.categories
+
+@dictionary_router.post("/similar", response_model=DictionarySimilarResponse)
+async def find_similar_signs(file: UploadFile = File(...), k: int = Form(5)):
+    """
+    Tìm các video từ điển gần nhất với video ký hiệu của người dùng
+    """
+    start_time = time.time()
+    if dictionary_index is None:
+        raise HTTPException(status_code=503, detail="Chỉ mục từ điển chưa được tạo")
+    
+    with await VideoBuffer.from_upload(file) as video:
+        landmarks, _, _ = await extract_landmarks(video.path, 'word', video.digest)
+    
+    embedding = await runtime.submit('embedding', landmarks)
+    matches = dictionary_index.search(embedding.numpy(), k)
+    return {
+        "items": [
+            {"name": dictionary_index.names[i], "file": dictionary_index.files[i], "score": score}
+            for i, score in matches
+        ],
+        "processing_time": time.time() - start_time,
+    }
 
 # Translation routes
+def with_timings(response, timings):
+    """Thêm thời gian và độ bận của từng bước của yêu cầu hiện tại vào response khi client yêu cầu.
+
+    Các bước chạy song song (giải mã và MediaPipe) có tổng độ bận lớn hơn 1.
+    """
+    if timings:
+        stage_timings = metrics.current_timings() or {}
+        wall = response.get("processing_time") or 0.0
+        occupancy = {stage: seconds / wall for stage, seconds in stage_timings.items()} if wall > 0 else None
+        return {**response, "stage_timings": stage_timings, "stage_occupancy": occupancy}
+    return response
+
+async def segment_and_predict(video_path, mode, digest=None):
+    """Chia cả video thành các ký hiệu theo chuyển động của tay rồi dịch tất cả trong một batch"""
+    segments, n_frames, fps, truncated = await extract_segments(video_path, mode, digest)
+    results = await predict_segments(segments, mode, fps)
+    return {
+        "results": results,
+        "analysis_mode": mode,
+        "video_duration": n_frames / fps,
+        "truncated": truncated,
+    }
+
 @translate_router.post("/video", response_model=TranslationResponse)
-async def translate_video(request: TranslationRequest = Body(...)):
-    if mode == 'word':
-        FRAME_BUFFER_SIZE = 150
-    else:
-        FRAME_BUFFER_SIZE = 75
-    print(FRAME_BUFFER_SIZE)
+async def translate_video(request: TranslationRequest = Body(...), timings: bool = False):
+    metrics.REQUESTS.inc('video', mode_label(request.mode))
+    segment = wants_segments(request.mode, request.segment)
     start_time = time.time()
     
     # Kiểm tra dữ liệu đầu vào
@@ -533,70 +1052,52 @@ async def translate_video(request: TranslationRequest = Body(...)):
         # Process video data
         if request.video_data:
             # Decode base64 video data
-            video_data = base64.b64decode(request.video_data.split(',')[1] if ',' in request.video_data else request.video_data)
+            with metrics.stage('base64_decode'):
+                video_data = base64.b64decode(request.video_data.split(',')[1] if ',' in request.video_data else request.video_data)
             
-            # Save to temporary file
-            temp_path = f"temp_{int(time.time())}.mp4"
-            with open(temp_path, 'wb') as f:
-                f.write(video_data)
-            
-            # Extract frames
-            frames = extract_frames(temp_path)
-            
-            # Clean up temp file
-            os.remove(temp_path)
+            # Giải mã trực tiếp từ bộ nhớ, không ghi tệp tạm
+            with VideoBuffer.from_bytes(video_data) as video:
+                cache_key = video_cache_key(video.digest, request.mode, request.segment)
+                cached = await result_cache.get(cache_key)
+                if cached is not None:
+                    return with_timings({**cached[1], "processing_time": time.time() - start_time, "cached": True}, timings)
+                if segment:
+                    response = await segment_and_predict(video.path, request.mode, video.digest)
+                else:
+                    landmarks, n_frames, video_fps = await extract_landmarks(video.path, request.mode, video.digest)
         else:
             # Process video URL
-            frames = extract_frames(request.video_url)
-        
-        # Limit frames
-        if frames.shape[0] > FRAME_BUFFER_SIZE:
-            frames = frames[:FRAME_BUFFER_SIZE]
-        
-        # Get hand landmarks
-        landmarks = []
-        for frame in frames:
-            landmark = get_hand_landmarks(frame, np.array(list(range(21))), verbose=False)
-            landmarks.append(landmark)
-        
-        # Pad if needed
-        while len(landmarks) < FRAME_BUFFER_SIZE:
-            landmarks.append(np.zeros((42, 3)))
-        
-        # Convert to tensor
-        video_landmarks = np.array(landmarks)
-        video_landmarks = torch.from_numpy(video_landmarks).to(torch.float32)
-        
-        # Get prediction
-        with torch.no_grad():
-            if request.mode == 'word':
-                outputs = word_model(video_landmarks.unsqueeze(0))
+            cache_key = None
+            if segment:
+                response = await segment_and_predict(request.video_url, request.mode)
             else:
-                outputs = char_model(video_landmarks.unsqueeze(0))
-            probs = torch.softmax(outputs, dim=1)
-            confidence, pred = torch.max(probs, dim=1)
-            confidence = confidence.item()
+                landmarks, n_frames, video_fps = await extract_landmarks(request.video_url, request.mode)
         
-        predicted_text = INDEX_TO_GLOB[int(pred[0])]
-        processing_time = time.time() - start_time
-        return {
-            "results": [{"text": predicted_text, "confidence": confidence}],
-            "analysis_mode": request.mode,
-            "processing_time": processing_time,
-            "video_duration": len(frames) / 60.0
-        }
+        if segment:
+            response["processing_time"] = time.time() - start_time
+        else:
+            # Get prediction
+            prediction = await predict_response(landmarks, request.mode)
+
+            processing_time = time.time() - start_time
+            response = {
+                **prediction,
+                "analysis_mode": request.mode,
+                "processing_time": processing_time,
+                "video_duration": n_frames / video_fps
+            }
+        if cache_key:
+            await result_cache.put(cache_key, None, response)
+        return with_timings(response, timings)
         
     except Exception as e:
         logger.error(f"Lỗi xử lý video: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error while processing video: {str(e)}")
 
 @translate_router.post("/upload", response_model=TranslationResponse)
-async def upload_and_translate(file: UploadFile = File(...), mode: str = Form("word")):
-    if mode == 'word':
-        FRAME_BUFFER_SIZE = 150
-    else:
-        FRAME_BUFFER_SIZE = 75
-    print(FRAME_BUFFER_SIZE)
+async def upload_and_translate(file: UploadFile = File(...), mode: str = Form("word"), segment: bool = Form(False),
+                               timings: bool = False):
+    metrics.REQUESTS.inc('upload', mode_label(mode))
     start_time = time.time()
     
     # Kiểm tra tệp
@@ -604,57 +1105,272 @@ async def upload_and_translate(file: UploadFile = File(...), mode: str = Form("w
         raise HTTPException(status_code=400, detail="Only MP4, WebM, or MOV")
     
     try:
-        # Save uploaded file
-        temp_path = f"temp_{int(time.time())}.mp4"
-        with open(temp_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Extract frames
-        frames = extract_frames(temp_path)
-        
-        # Clean up temp file
-        os.remove(temp_path)
-        
-        # Limit frames to 150
-        if frames.shape[0] > FRAME_BUFFER_SIZE:
-            frames = frames[:FRAME_BUFFER_SIZE]
-        
-        # Get hand landmarks
-        landmarks = []
-        for frame in frames:
-            landmark = get_hand_landmarks(frame, np.array(list(range(21))), verbose=False)
-            landmarks.append(landmark)
-        
-        # Pad if needed
-        while len(landmarks) < FRAME_BUFFER_SIZE:
-            landmarks.append(np.zeros((42, 3)))
-        
-        # Convert to tensor
-        video_landmarks = np.array(landmarks)
-        video_landmarks = torch.from_numpy(video_landmarks).to(torch.float32)
+        # Đọc tệp tải lên theo từng khối vào bộ đệm trong RAM
+        with await VideoBuffer.from_upload(file) as video:
+            cache_key = video_cache_key(video.digest, mode, segment)
+            cached = await result_cache.get(cache_key)
+            if cached is not None:
+                return with_timings({**cached[1], "processing_time": time.time() - start_time, "cached": True}, timings)
+            
+            if wants_segments(mode, segment):
+                # Toàn bộ video, chia thành các ký hiệu
+                response = await segment_and_predict(video.path, mode, video.digest)
+                response["processing_time"] = time.time() - start_time
+                await result_cache.put(cache_key, None, response)
+                return with_timings(response, timings)
+            
+            # Extract frames (limited to model_frames(mode)) and hand landmarks
+            landmarks, n_frames, video_fps = await extract_landmarks(video.path, mode, video.digest)
         
         # Get prediction
-        with torch.no_grad():
-            if mode == 'word':
-                outputs = word_model(video_landmarks.unsqueeze(0))
-            else:
-                outputs = char_model(video_landmarks.unsqueeze(0))
-            probs = torch.softmax(outputs, dim=1)
-            confidence, pred = torch.max(probs, dim=1)
-            confidence = confidence.item()
-        predicted_text = INDEX_TO_GLOB[int(pred[0])]
+        prediction = await predict_response(landmarks, mode)
         processing_time = time.time() - start_time
-        return {
-            "results": [{"text": predicted_text, "confidence": confidence}],
+        response = {
+            **prediction,
             "analysis_mode": mode,
             "processing_time": processing_time,
-            "video_duration": len(frames) / 60.0
+            "video_duration": n_frames / video_fps
         }
+        await result_cache.put(cache_key, None, response)
+        return with_timings(response, timings)
     except Exception as e:
         logger.error(f"Lỗi xử lý video: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Lỗi xử lý video: {str(e)}")
 
+def upload_stream(file):
+    """Tệp tạm (SpooledTemporaryFile) của ``UploadFile``, đã tua về đầu, và kích thước của nó."""
+    stream = file.file
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return stream, size
+
+def batch_sources(files):
+    """Các clip của một yêu cầu hàng loạt theo thứ tự gửi: ``[(tên, hàm mở luồng đọc hoặc lỗi)]``.
+
+    Không clip nào được đọc ở đây: mỗi mục chỉ giữ tệp tạm của upload (hoặc tên
+    thành viên trong zip) và được đọc theo từng khối khi tới lượt xử lý. Tệp zip
+    được mở rộng thành các video bên trong (theo thứ tự trong tệp); tệp không phải
+    video hoặc zip hỏng trở thành một mục lỗi thay vì làm hỏng cả yêu cầu.
+    Ném HTTPException 413 nếu vượt BATCH_MAX_FILES hoặc BATCH_MAX_MB.
+    """
+    sources, total = [], 0
+
+    def check(size):
+        nonlocal total
+        total += size
+        if total > BATCH_MAX_MB * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"Tổng dung lượng video vượt quá {BATCH_MAX_MB} MB")
+
+    for file in files:
+        name = file.filename or f"file-{len(sources)}"
+        if name.lower().endswith('.zip'):
+            stream, size = upload_stream(file)
+            check(size)
+            try:
+                # Chỉ đọc mục lục ở cuối tệp; ZipFile khóa tệp dùng chung khi nhiều thành viên được đọc cùng lúc
+                archive = zipfile.ZipFile(stream)
+                members = [info for info in archive.infolist() if not info.is_dir()
+                           and info.filename.lower().endswith(VIDEO_EXTENSIONS)
+                           and not os.path.basename(info.filename).startswith('.')]
+            except zipfile.BadZipFile as e:
+                sources.append((name, ValueError(f"Tệp zip không hợp lệ: {e}")))
+                continue
+            for info in members:
+                # Kích thước khai báo trong zip; zipfile kiểm tra lại khi giải nén
+                check(info.file_size)
+                sources.append((f"{name}/{info.filename}", lambda archive=archive, info=info: archive.open(info)))
+        elif name.lower().endswith(VIDEO_EXTENSIONS):
+            stream, size = upload_stream(file)
+            check(size)
+            sources.append((name, lambda stream=stream: stream))
+        else:
+            sources.append((name, ValueError("Chỉ hỗ trợ MP4, WebM, MOV hoặc zip chứa các tệp này")))
+        if len(sources) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"Tối đa {BATCH_MAX_FILES} clip mỗi yêu cầu")
+    return sources
+
+async def translate_batch_lines(sources, mode, segment, start_time):
+    """Dịch các clip và sinh từng dòng NDJSON ngay khi mỗi clip xong, cuối cùng là dòng tổng kết.
+
+    Các clip được giải mã và trích xuất landmark song song trên pool worker (tối đa
+    BATCH_CONCURRENCY clip cùng lúc). Clip nào xong landmark thì vào hàng đợi suy
+    luận; mỗi lượt suy luận lấy mọi chuỗi đang chờ để chạy chung batch. Mỗi dòng có
+    ``index`` là vị trí của clip trong yêu cầu, vì thứ tự hoàn thành có thể khác.
+    """
+    segmented = wants_segments(mode, segment)
+    finished = asyncio.Queue()
+    ready = asyncio.Queue()
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    def succeed(index, name, response):
+        finished.put_nowait({"index": index, "filename": name, "ok": True,
+                             **response, "processing_time": time.time() - start_time})
+
+    def fail(index, name, error):
+        finished.put_nowait({"index": index, "filename": name, "ok": False, "error": str(error)})
+
+    async def prepare(index, name, open_stream):
+        if isinstance(open_stream, Exception):
+            fail(index, name, open_stream)
+            return
+        async with limit:
+            try:
+                # Clip chỉ được đọc (theo từng khối, ngoài event loop) khi tới lượt xử lý
+                buffer = await asyncio.to_thread(VideoBuffer.from_stream, open_stream(),
+                                                 os.path.splitext(name)[1] or '.mp4')
+                with buffer as video:
+                    cache_key = video_cache_key(video.digest, mode, segment)
+                    cached = await result_cache.get(cache_key)
+                    if cached is not None:
+                        succeed(index, name, {**cached[1], "cached": True})
+                        return
+                    if segmented:
+                        response = await segment_and_predict(video.path, mode, video.digest)
+                        await result_cache.put(cache_key, None, response)
+                        succeed(index, name, response)
+                        return
+                    landmarks, n_frames, video_fps = await extract_landmarks(video.path, mode, video.digest)
+                if not n_frames:
+                    raise ValueError("Không đọc được khung hình nào từ video")
+                ready.put_nowait((index, name, landmarks, n_frames / video_fps, cache_key))
+            except Exception as e:
+                logger.error(f"Lỗi xử lý clip {name}: {str(e)}")
+                fail(index, name, e)
+
+    async def infer():
+        done = False
+        while not done:
+            batch = [await ready.get()]
+            while not ready.empty():
+                batch.append(ready.get_nowait())
+            done = batch[-1] is None
+            batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+            try:
+                responses = await predict_responses([landmarks for _, _, landmarks, _, _ in batch], mode)
+            except Exception as e:
+                logger.error(f"Lỗi suy luận hàng loạt: {str(e)}")
+                for index, name, _, _, _ in batch:
+                    fail(index, name, e)
+                continue
+            for (index, name, landmarks, duration, cache_key), prediction in zip(batch, responses):
+                response = {
+                    **prediction,
+                    "analysis_mode": mode,
+                    "video_duration": duration,
+                }
+                await result_cache.put(cache_key, None, {**response, "processing_time": 0.0})
+                succeed(index, name, response)
+
+    async def produce():
+        await asyncio.gather(*(prepare(index, name, open_stream) for index, (name, open_stream) in enumerate(sources)))
+        # Mọi clip đã qua bước landmark: báo cho vòng suy luận chạy nốt rồi dừng
+        ready.put_nowait(None)
+
+    tasks = [asyncio.create_task(produce()), asyncio.create_task(infer())]
+    succeeded = 0
+    try:
+        for _ in sources:
+            line = await finished.get()
+            succeeded += line["ok"]
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        yield json.dumps({"summary": {
+            "total": len(sources),
+            "succeeded": succeeded,
+            "failed": len(sources) - succeeded,
+            "analysis_mode": mode,
+            "processing_time": time.time() - start_time,
+        }}, ensure_ascii=False) + "\n"
+    finally:
+        # Client ngắt kết nối giữa chừng: dừng các clip còn lại
+        for task in tasks:
+            task.cancel()
+
+@translate_router.post("/batch")
+async def translate_batch(files: List[UploadFile] = File(...), mode: str = Form("word"), segment: bool = Form(False)):
+    """Dịch nhiều clip (hoặc tệp zip chứa các clip) trong một yêu cầu.
+
+    Trả về NDJSON: mỗi clip một dòng ngay khi clip đó xong, gồm ``index`` (vị trí
+    trong yêu cầu), ``filename``, ``ok`` và các trường của TranslationResponse hoặc
+    ``error``; dòng cuối là ``{"summary": {...}}``. Clip lỗi không làm hỏng các clip khác.
+    """
+    start_time = time.time()
+    sources = batch_sources(files)
+    metrics.REQUESTS.inc('batch', mode_label(mode), amount=len(sources))
+    return HTTPStreamingResponse(translate_batch_lines(sources, mode, segment, start_time),
+                                 media_type="application/x-ndjson")
+
+@translate_router.post("/landmarks", response_model=TranslationResponse)
+async def translate_landmarks(request: Request, mode: str = "word", dtype: str = "float32", segment: bool = False,
+                              fps: float = Query(60.0, gt=0, le=240), timings: bool = False):
+    """Dịch từ landmark (T, 42, 3) do client tự trích xuất, gửi dưới dạng body nhị phân"""
+    metrics.REQUESTS.inc('landmarks', mode_label(mode))
+    start_time = time.time()
+    
+    content_length = request.headers.get('content-length')
+    if content_length:
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Content-Length không hợp lệ")
+        if content_length > LANDMARK_UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Payload landmark quá lớn")
+    # Body chunked không có Content-Length: đọc từng phần và dừng ngay khi vượt giới hạn
+    payload = bytearray()
+    async for chunk in request.stream():
+        payload += chunk
+        if len(payload) > LANDMARK_UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Payload landmark quá lớn")
+    
+    try:
+        landmarks = decode_landmark_payload(payload, dtype)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if wants_segments(mode, segment):
+        # Chuỗi landmark đã nằm trong bộ nhớ (giới hạn bởi LANDMARK_UPLOAD_MAX_BYTES), chia đoạn trực tiếp
+        with metrics.stage('segmentation'):
+            segments = [(start, end, landmarks[start:end])
+                        for start, end in find_segments(landmarks, fps, model_frames(mode), **SEGMENT_OPTIONS)]
+        truncated = len(segments) > SEGMENT_MAX_SEGMENTS
+        return with_timings({
+            "results": await predict_segments(segments[:SEGMENT_MAX_SEGMENTS], mode, fps),
+            "analysis_mode": mode,
+            "processing_time": time.time() - start_time,
+            "video_duration": len(landmarks) / fps,
+            "truncated": truncated,
+        }, timings)
+    
+    # Giữ cùng ngân sách khung hình như khi tải video lên
+    landmarks = landmarks[:model_frames(mode)]
+    
+    return with_timings({
+        **await predict_response(landmarks, mode),
+        "analysis_mode": mode,
+        "processing_time": time.time() - start_time,
+        "video_duration": len(landmarks) / fps
+    }, timings)
+
+@translate_router.get("/stats")
+async def get_translation_stats():
+    """
+    Thống kê hàng đợi và kích thước batch của scheduler suy luận
+    """
+    stats = {mode: scheduler.stats() for mode, scheduler in runtime.schedulers.items()}
+    stats['landmarks'] = landmark_service.stats()
+    stats['cache'] = result_cache.stats()
+    stats['landmark_cache'] = landmark_cache.stats()
+    stats['process'] = {**startup_report, 'rss_mb': metrics.process_rss_bytes() / 2 ** 20}
+    stats['model'] = runtime.status()
+    stats['sessions'] = {
+        'active': len(connected_clients),
+        'max': MAX_STREAM_SESSIONS,
+        'per_session': {sid: client['inbox'].stats() for sid, client in connected_clients.items()},
+    }
+    return stats
+
 @translate_router.get("/modes", response_model=list)
 async def get_translation_modes():
     """
@@ -663,6 +1379,8 @@ async def get_translation_modes():
     return [
         {"id": "character", "name": "Character Analysis", "description": "Detect individual characters"},
         {"id": "word", "name": "Word Analysis", "description": "Detect complete words"},
+        {"id": "sentence", "name": "Sentence Analysis", "description": "Split a recording into signs and detect each word"},
+        {"id": "auto", "name": "Automatic", "description": "Detect words and characters in one pass"},
     ]
 
 # =========================================================
@@ -690,9 +1408,13 @@ app.add_middleware(
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
-    response = await call_next(request)
+    # Các bước (giải mã, MediaPipe, forward...) của yêu cầu này ghi thời gian vào đây
+    with metrics.collect_timings():
+        response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    route = request.scope.get('route')
+    metrics.HTTP_SECONDS.observe(process_time, request.method, route.path if route else 'unmatched')
     return response
 
 # Bao gồm các routers
@@ -703,6 +1425,38 @@ app.include_router(translate_router)
 # Gắn Socket.IO tại đường dẫn được chỉ định
 app.mount("/socket.io", socket_app)
 
+# Thời gian khởi động và bộ nhớ của worker này (mỗi worker uvicorn là một tiến trình riêng)
+startup_report = {}
+warm_up_task = None
+
+async def warm_up():
+    """Nạp model, chạy suy luận khởi động và khởi tạo các worker landmark"""
+    await asyncio.gather(runtime.wait_ready(), landmark_service.warm_up())
+    startup_report['ready_seconds'] = time.time() - metrics.process_start_time()
+    startup_report['ready_rss_mb'] = metrics.process_rss_bytes() / 2 ** 20
+    logger.info(f"Worker {startup_report['pid']} sẵn sàng dịch sau {startup_report['ready_seconds']:.2f}s, "
+                f"RSS {startup_report['ready_rss_mb']:.0f} MB")
+
+@app.on_event("startup")
+async def report_startup():
+    global warm_up_task
+    startup_report.update({
+        'pid': os.getpid(),
+        'startup_seconds': time.time() - metrics.process_start_time(),
+        'rss_mb': metrics.process_rss_bytes() / 2 ** 20,
+        'model_mmap': MODEL_MMAP,
+        'socket_transports': SOCKET_TRANSPORTS,
+    })
+    logger.info(f"Worker {startup_report['pid']} nhận kết nối sau {startup_report['startup_seconds']:.2f}s, "
+                f"RSS {startup_report['rss_mb']:.0f} MB")
+    if WARM_UP_ON_STARTUP:
+        warm_up_task = asyncio.create_task(warm_up())
+
+# Dừng pool landmark khi tắt ứng dụng
+@app.on_event("shutdown")
+async def shutdown_landmark_service():
+    landmark_service.shutdown()
+
 # Endpoint gốc
 @app.get("/")
 async def root():
@@ -723,6 +1477,49 @@ async def root():
 async def health():
     return {"status": "ok", "timestamp": time.time()}
 
+@app.get("/ready")
+async def ready():
+    """Sẵn sàng dịch: model đã nạp và các worker landmark đã khởi động (/health chỉ báo server còn sống)"""
+    if not WARM_UP_ON_STARTUP:
+        # Nạp lười: lần kiểm tra đầu tiên bắt đầu nạp model ở nền; chưa sẵn sàng tới khi nạp xong
+        runtime.start()
+        is_ready = runtime.ready
+    else:
+        is_ready = warm_up_task is not None and warm_up_task.done() and not warm_up_task.cancelled() \
+            and warm_up_task.exception() is None
+    body = {"ready": is_ready, "model": runtime.status(), "timestamp": time.time()}
+    return JSONResponse(body, status_code=200 if is_ready else 503)
+
+# Các chỉ số đọc từ trạng thái hiện tại của server lúc /metrics được gọi
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'socket_sessions_active', 'Số phiên Socket.IO đang kết nối', lambda: {(): len(connected_clients)}))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'stream_frames_dropped', 'Số khung hình bị bỏ do hộp thư đầy (các phiên đang kết nối)',
+    lambda: {(): sum(client['inbox'].frames_dropped for client in connected_clients.values())}))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'inference_queue_depth', 'Số yêu cầu đang chờ trong scheduler suy luận',
+    lambda: {(name,): scheduler.queue_depth for name, scheduler in runtime.schedulers.items()}, ('model',)))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'inference_batches_run', 'Số batch đã chạy', lambda: {(name,): scheduler.batches_run for name, scheduler in runtime.schedulers.items()}, ('model',)))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'inference_items_run', 'Số chuỗi đã suy luận', lambda: {(name,): scheduler.items_run for name, scheduler in runtime.schedulers.items()}, ('model',)))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'landmark_worker_inflight', 'Số yêu cầu đang xử lý trên mỗi worker landmark',
+    lambda: {(str(i),): n for i, n in enumerate(landmark_service.stats()['inflight'])}, ('worker',)))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'result_cache_events', 'Số lần tra cache kết quả theo loại',
+    lambda: {(kind,): result_cache.stats()[kind] for kind in ('hits', 'disk_hits', 'misses')}, ('kind',)))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'result_cache_entries', 'Số mục trong cache kết quả (RAM)', lambda: {(): result_cache.stats()['entries']}))
+metrics.REGISTRY.register(metrics.GaugeCallback(
+    'landmark_cache_events', 'Số lần tra cache landmark theo loại',
+    lambda: {(kind,): landmark_cache.stats()[kind] for kind in ('hits', 'disk_hits', 'misses')}, ('kind',)))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Chỉ số theo định dạng văn bản của Prometheus"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Xử lý ngoại lệ toàn cục
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
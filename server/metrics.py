@@ -0,0 +1,188 @@
+import bisect
+import contextvars
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_IMPORTED_AT = time.time()
+
+# Bucket (giây) cho thời gian từng bước, từ dưới 1ms tới vài giây
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels, count=1):
+        """Ghi ``count`` quan sát cùng giá trị ``value`` (ví dụ thời gian trung bình mỗi khung hình)."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += count
+            series[1] += value * count
+            series[2] += count
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, total, n) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, c in zip(self.buckets, counts):
+                    cumulative += c
+                    lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", "+Inf")])} {n}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total}')
+                lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {n}')
+        return lines
+
+
+class GaugeCallback:
+    """Gauge đọc giá trị lúc render từ ``callback`` trả về ``{labels_tuple: value}``."""
+
+    def __init__(self, name, documentation, callback, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        for labels, value in sorted(self.callback().items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def process_rss_bytes():
+    """RSS hiện tại của tiến trình (Linux), nếu không đọc được thì trả về RSS đỉnh."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def process_start_time():
+    """Thời điểm (epoch) tiến trình được tạo, trên Linux đọc từ /proc; nơi khác là lúc import module này."""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+        return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return _IMPORTED_AT
+
+
+def process_peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'translation_stage_seconds', 'Thời gian của từng bước trong pipeline dịch', ('stage',)))
+REQUESTS = REGISTRY.register(Counter(
+    'translation_requests_total', 'Số yêu cầu dịch theo nguồn và chế độ', ('source', 'mode')))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'Thời gian xử lý yêu cầu HTTP theo route', ('method', 'route')))
+REGISTRY.register(GaugeCallback(
+    'process_resident_memory_bytes', 'RSS của tiến trình server', lambda: {(): process_rss_bytes()}))
+REGISTRY.register(GaugeCallback(
+    'process_start_time_seconds', 'Thời điểm tiến trình bắt đầu (epoch)', lambda: {(): process_start_time()}))
+REGISTRY.register(GaugeCallback(
+    'process_peak_resident_memory_bytes', 'RSS đỉnh của tiến trình server', lambda: {(): process_peak_rss_bytes()}))
+
+# Thời gian các bước của yêu cầu hiện tại (nếu caller muốn trả về trong response)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def observe_stage(stage, seconds, count=1):
+    """Ghi thời gian một bước vào histogram và vào bảng thời gian của yêu cầu hiện tại.
+
+    ``count`` > 1 nghĩa là ``seconds`` là thời gian trung bình của ``count`` lần
+    (ví dụ MediaPipe cho mỗi khung hình); bảng thời gian cộng dồn tổng.
+    """
+    STAGE_SECONDS.observe(seconds, stage, count=count)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds * count
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+def current_timings():
+    return _request_timings.get()
+
+
+@contextmanager
+def collect_timings():
+    """Thu thập thời gian các bước (giây) của đoạn code bên trong vào một dict."""
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
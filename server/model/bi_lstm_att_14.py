@@ -1,14 +1,17 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
 
 class Attention14(nn.Module):
     def __init__(self, hidden_dim):
         super(Attention14, self).__init__()
         self.attn = nn.Linear(hidden_dim, 1)
 
-    def forward(self, lstm_outputs):
+    def forward(self, lstm_outputs, mask=None):
         attn_scores = self.attn(lstm_outputs)  # (batch, seq_len, 1)
+        if mask is not None:
+            attn_scores = attn_scores.masked_fill(~mask.unsqueeze(-1), float('-inf'))  # ignore padding steps
         attn_weights = F.softmax(attn_scores, dim=1)  # (batch, seq_len, 1)
         context = torch.sum(lstm_outputs * attn_weights, dim=1)  # (batch, hidden_dim)
         return context, attn_weights
@@ -39,15 +42,101 @@ class BiLSTMAttention14(nn.Module):
                 nn.Linear(hidden_size, n_classes)
             )
 
-    def forward(self, x):
+    def forward(self, x, lengths=None):
         batch_size, seq_len, n_landmarks, coords = x.size()
         x = x.view(batch_size, seq_len, n_landmarks * coords)  # (batch, seq_len, 126)
-        lstm_out, _ = self.lstm(x)  # (batch, seq_len, hidden_size*2)
+        if lengths is not None and bool((lengths == lengths[0]).all()):
+            # Equal lengths (including a single clip) need no packing: drop the padding instead
+            seq_len = int(lengths[0])
+            x = x[:, :seq_len]
+            lengths = None
+        if lengths is None:
+            lstm_out, _ = self.lstm(x)  # (batch, seq_len, hidden_size*2)
+            mask = None
+        else:
+            # Only the first lengths[i] steps of each sequence are real frames. Packing is
+            # several times slower on CPU; FusedBiLSTMAttention14 handles mixed lengths without it
+            packed = pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            packed_out, _ = self.lstm(packed)
+            lstm_out, _ = pad_packed_sequence(packed_out, batch_first=True, total_length=seq_len)
+            mask = torch.arange(seq_len, device=x.device).unsqueeze(0) < lengths.to(x.device).unsqueeze(1)
         lstm_out = self.relu(lstm_out)
-        context, _ = self.attention(lstm_out) # (batch, hidden_size*2)
+        context, _ = self.attention(lstm_out, mask) # (batch, hidden_size*2)
         if not self.cls_head:
             return context
         context_bn = self.bn_context(context)  # (batch, hidden_size*2)
         context_drop = self.dropout_context(context_bn)  # (batch, hidden_size*2)
         logits = self.classifier(context_drop)
-        return logits
\ No newline at end of file
+        return logits
+
+
+def _reverse_within(x, index):
+    """Reorders ``(batch, seq_len, features)`` along time with a per-sequence ``index``."""
+    return torch.gather(x, 1, index.unsqueeze(-1).expand_as(x))
+
+
+class FusedBiLSTMAttention14(nn.Module):
+    """Runs several ``BiLSTMAttention14`` models over the same input in one call.
+
+    Each direction of each LSTM layer becomes a unidirectional ``nn.LSTM`` that
+    shares the original weights. The backward direction runs over each sequence
+    reversed within its own length, so padding only ever trails the real frames
+    and no ``pack_padded_sequence`` is needed. The result matches the separate
+    models exactly, but it avoids the packed-sequence path, which is several
+    times slower on CPU. Every model keeps its own attention and classifier.
+    The output is their logits concatenated along the class dimension, in
+    order (see ``n_classes``).
+    """
+
+    def __init__(self, models):
+        super(FusedBiLSTMAttention14, self).__init__()
+        self.n_classes = [model.classifier[-1].out_features for model in models]
+        self.encoders = nn.ModuleList()
+        for model in models:
+            lstm = model.lstm
+            if not (lstm.bidirectional and lstm.batch_first):
+                raise ValueError("Fused models need bidirectional batch-first LSTMs")
+            layers = nn.ModuleList()
+            for layer in range(lstm.num_layers):
+                input_size = lstm.input_size if layer == 0 else 2 * lstm.hidden_size
+                directions = nn.ModuleList()
+                for suffix in ('', '_reverse'):
+                    with torch.device('meta'):
+                        direction = nn.LSTM(input_size, lstm.hidden_size, batch_first=True)
+                    # assign=True shares the original (possibly mmap'd) tensors instead of copying them
+                    direction.load_state_dict({f'{name}_l0': getattr(lstm, f'{name}_l{layer}{suffix}')
+                                               for name in ('weight_ih', 'weight_hh', 'bias_ih', 'bias_hh')},
+                                              assign=True)
+                    directions.append(direction)
+                layers.append(directions)
+            self.encoders.append(layers)
+        self.relu = nn.ReLU()
+        self.attentions = nn.ModuleList(model.attention for model in models)
+        self.heads = nn.ModuleList(nn.Sequential(model.bn_context, model.dropout_context, model.classifier)
+                                   for model in models)
+
+    def forward(self, x, lengths=None):
+        batch_size, seq_len, n_landmarks, coords = x.size()
+        x = x.view(batch_size, seq_len, n_landmarks * coords)
+        steps = torch.arange(seq_len, device=x.device).unsqueeze(0)
+        if lengths is None:
+            lengths = torch.full((batch_size,), seq_len, dtype=torch.int64, device=x.device)
+            mask = None
+        else:
+            lengths = lengths.to(x.device)
+            mask = steps < lengths.unsqueeze(1)
+        # Position of each step in its sequence reversed within length; padding stays in place
+        reverse = torch.where(steps < lengths.unsqueeze(1), lengths.unsqueeze(1) - 1 - steps, steps)
+        x_reversed = _reverse_within(x, reverse)
+
+        logits = []
+        for layers, attention, head in zip(self.encoders, self.attentions, self.heads):
+            inputs, inputs_reversed = x, x_reversed
+            for forward, backward in layers:
+                forward_out, _ = forward(inputs)
+                backward_out, _ = backward(inputs_reversed)
+                inputs = torch.cat((forward_out, _reverse_within(backward_out, reverse)), dim=-1)
+                inputs_reversed = _reverse_within(inputs, reverse)
+            context, _ = attention(self.relu(inputs), mask)
+            logits.append(head(context))
+        return torch.cat(logits, dim=-1)
@@ -0,0 +1,80 @@
+import argparse
+import os
+
+import torch
+import torch.nn as nn
+
+from model.bi_lstm_att_14 import BiLSTMAttention14, FusedBiLSTMAttention14
+
+SEQ_LEN = 150
+
+
+def load_checkpoint(path, device='cpu', mmap=False):
+    """Load a BiLSTMAttention14 checkpoint.
+
+    With ``mmap=True`` (CPU only) the weights stay backed by the checkpoint file's
+    page cache instead of being copied, so worker processes loading the same file
+    share the memory.
+    """
+    checkpoint = torch.load(path, map_location=device, mmap=mmap)
+    # The number of classes is the output size of the last classifier layer
+    n_classes = checkpoint['model_state']['classifier.4.weight'].shape[0]
+    if mmap:
+        # Build on the meta device and adopt the mmap'd tensors without allocating
+        with torch.device('meta'):
+            model = BiLSTMAttention14(n_classes=n_classes)
+        model.load_state_dict(checkpoint['model_state'], assign=True)
+    else:
+        model = BiLSTMAttention14(n_classes=n_classes).to(device)
+        model.load_state_dict(checkpoint['model_state'])
+    model.eval()
+    return model
+
+
+def quantize(model):
+    """Dynamic int8 quantization of the LSTM and Linear layers (CPU only)."""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def export_torchscript(model, path, seq_len=SEQ_LEN):
+    example = torch.zeros((1, seq_len, 42, 3), dtype=torch.float32)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example, check_trace=False)
+    traced = torch.jit.freeze(traced)
+    traced.save(path)
+    return path
+
+
+def export_onnx(model, path, seq_len=SEQ_LEN, opset=17):
+    example = torch.zeros((1, seq_len, 42, 3), dtype=torch.float32)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            example,
+            path,
+            input_names=['landmarks'],
+            output_names=['logits'],
+            dynamic_axes={'landmarks': {0: 'batch', 1: 'seq_len'}, 'logits': {0: 'batch'}},
+            opset_version=opset,
+        )
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export BiLSTMAttention14 checkpoints to TorchScript and ONNX")
+    parser.add_argument('--out', default='exported')
+    parser.add_argument('--model-dir', default='model')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    models = {name: load_checkpoint(os.path.join(args.model_dir, f'{name}.pth')) for name in ('word_model', 'char_model')}
+    # The "auto" mode runs both models in one call
+    models['auto_model'] = FusedBiLSTMAttention14([models['word_model'], models['char_model']]).eval()
+    for name, model in models.items():
+        print(export_torchscript(model, os.path.join(args.out, f'{name}.ts')))
+        print(export_torchscript(quantize(model), os.path.join(args.out, f'{name}.int8.ts')))
+        print(export_onnx(model, os.path.join(args.out, f'{name}.onnx')))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,79 @@
+import itertools
+import operator
+
 import numpy as np
 import cv2
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
-def extract_frames(video_path):
+def iter_frames(video_path, max_frames=None, stride=1, max_side=None):
+    """Lazily decode RGB frames, stopping after ``max_frames`` sampled frames.
+
+    Only every ``stride``-th frame is decoded; frames whose longer side exceeds
+    ``max_side`` are downscaled before being yielded.
+    """
     cap = cv2.VideoCapture(video_path)
-    frames = []
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        # Convert BGR (OpenCV default) to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frames.append(frame_rgb)
-    cap.release()
-    return np.array(frames)
-
-
-hands = mp.solutions.hands.Hands(
-    static_image_mode=False,
-    max_num_hands=2,
-    # min_tracking_confidence=0.5,
-    # min_detection_confidence=0.5,
-)
-
-
-def get_hand_landmarks(frame, filtered_hand_indices, verbose=False):
+    try:
+        index = 0
+        yielded = 0
+        while cap.isOpened() and (max_frames is None or yielded < max_frames):
+            if stride > 1 and index % stride:
+                # grab() advances without decoding the skipped frame
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            index += 1
+            if max_side:
+                h, w = frame.shape[:2]
+                scale = max_side / max(h, w)
+                if scale < 1:
+                    frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            # Convert BGR (OpenCV default) to RGB
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            yielded += 1
+    finally:
+        cap.release()
+
+
+def video_fps(video_path, default=60.0):
+    """Native frame rate reported by the container, or ``default`` when unknown."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    return fps if fps and fps > 0 else default
+
+
+def extract_frames(video_path, max_frames=None, stride=1, max_side=None):
+    return np.array(list(iter_frames(video_path, max_frames, stride, max_side)))
+
+
+_default_hands = None
+
+
+def default_hands():
+    """Shared ``Hands`` detector, created on first use rather than at import."""
+    global _default_hands
+    if _default_hands is None:
+        _default_hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=2,
+            # min_tracking_confidence=0.5,
+            # min_detection_confidence=0.5,
+        )
+    return _default_hands
+
+
+def get_hand_landmarks(frame, filtered_hand_indices, verbose=False, detector=None):
     n = len(filtered_hand_indices)
     all_landmarks = np.zeros((2 * n, 3), dtype=np.float32)
-    results = hands.process(frame)
+    results = (detector or default_hands()).process(frame)
     if results.multi_hand_landmarks:
         for lm_set, handness in zip(results.multi_hand_landmarks,
                                     results.multi_handedness):
@@ -47,3 +91,93 @@ def get_hand_landmarks(frame, filtered_hand_indices, verbose=False):
                 if verbose:
                     print(f"Found {n} right-hand landmarks.")
     return all_landmarks
+
+
+
+ALL_HAND_INDICES = np.arange(21)
+_XYZ = operator.attrgetter('x', 'y', 'z')
+
+
+def landmark_array(points):
+    """``(len(points), 3)`` float32 array of MediaPipe landmarks, filled in one ``np.fromiter`` pass."""
+    count = len(points)
+    flat = np.fromiter(itertools.chain.from_iterable(map(_XYZ, points)), dtype=np.float32, count=3 * count)
+    return flat.reshape(count, 3)
+
+
+class HandLandmarkExtractor:
+    """Fills ``(T, 42, 3)`` float32 landmark buffers for a stream of RGB frames.
+
+    With ``model_path`` (a ``hand_landmarker.task`` bundle) this uses the
+    MediaPipe Tasks ``HandLandmarker`` in VIDEO running mode; otherwise it falls
+    back to ``mp.solutions.hands.Hands``. One instance keeps tracking state, so
+    it must not be shared between threads.
+    """
+
+    def __init__(self, model_path=None, num_hands=2, filtered_hand_indices=ALL_HAND_INDICES, frame_interval_ms=33):
+        self.indices = np.asarray(filtered_hand_indices)
+        self.n = len(self.indices)
+        self.frame_interval_ms = frame_interval_ms
+        self._all_points = len(self.indices) == 21 and np.array_equal(self.indices, ALL_HAND_INDICES)
+        self._timestamp_ms = 0
+        if model_path:
+            options = vision.HandLandmarkerOptions(
+                base_options=python.BaseOptions(model_asset_path=model_path),
+                running_mode=vision.RunningMode.VIDEO,
+                num_hands=num_hands,
+            )
+            self._landmarker = vision.HandLandmarker.create_from_options(options)
+            self._hands = None
+        else:
+            self._landmarker = None
+            self._hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=num_hands)
+
+    def process(self, frame, out=None):
+        """Landmarks for a single frame as a ``(42, 3)`` array (written into ``out`` if given)."""
+        if out is None:
+            out = np.zeros((2 * self.n, 3), dtype=np.float32)
+        else:
+            out[:] = 0
+        if self._landmarker is not None:
+            # VIDEO mode requires strictly increasing timestamps across calls
+            self._timestamp_ms += self.frame_interval_ms
+            result = self._landmarker.detect_for_video(
+                mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(frame)),
+                self._timestamp_ms,
+            )
+            # The Tasks API reports handedness the other way round from
+            # mp.solutions, which is what the models were trained on
+            detected = zip(result.hand_landmarks,
+                           ('Right' if h[0].category_name == 'Left' else 'Left' for h in result.handedness))
+        else:
+            results = self._hands.process(frame)
+            if not results.multi_hand_landmarks:
+                return out
+            detected = zip((lm.landmark for lm in results.multi_hand_landmarks),
+                           (h.classification[0].label for h in results.multi_handedness))
+
+        for points, label in detected:
+            base = 0 if label == 'Left' else self.n
+            hand = landmark_array(points)
+            out[base:base + self.n] = hand if self._all_points else hand[self.indices]
+        return out
+
+    def process_batch(self, frames, out):
+        """Write landmarks for ``frames`` (any iterable) into ``out``; returns the frame count.
+
+        Rows after the last frame are left untouched, so a zero-initialised
+        ``out`` doubles as the padded model input.
+        """
+        n = 0
+        for frame in frames:
+            if n >= len(out):
+                break
+            self.process(frame, out[n])
+            n += 1
+        return n
+
+    def close(self):
+        if self._landmarker is not None:
+            self._landmarker.close()
+        if self._hands is not None:
+            self._hands.close()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+
+from backends import LENGTH_AWARE_BACKENDS
+
+logger = logging.getLogger(__name__)
+
+# Độ dài chuỗi của lượt suy luận khởi động: cửa sổ ngắn nhất của stream và độ dài tối đa của model
+WARM_UP_LENGTHS = (15, 150)
+
+
+class ModelRuntime:
+    """Nạp checkpoint, backend suy luận và scheduler ở nền thay vì lúc import ``main``.
+
+    ``start()`` nạp model trong một thread và chạy một lượt suy luận khởi động
+    cho mỗi model để yêu cầu thật đầu tiên không phải trả chi phí cấp phát/JIT.
+    ``submit()`` chờ tới khi nạp xong nên yêu cầu đến sớm chỉ bị chậm chứ không lỗi.
+    torch chỉ được import trong thread nạp model.
+    """
+
+    def __init__(self, backend='eager', export_dir='exported', max_batch_size=16, max_wait_ms=5.0,
+                 mmap=True, num_threads=0, model_dir='model'):
+        self.backend = backend
+        self.export_dir = export_dir
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.mmap = mmap
+        self.num_threads = num_threads
+        self.model_dir = model_dir
+        self.supports_lengths = backend in LENGTH_AWARE_BACKENDS
+        self.schedulers = {}
+        self.device = None
+        self.load_seconds = None
+        self.warm_up_seconds = None
+        self.torch_threads = None
+        self._task = None
+
+    @property
+    def ready(self):
+        return self._task is not None and self._task.done() and not self._task.cancelled() \
+            and self._task.exception() is None
+
+    def start(self):
+        """Bắt đầu nạp model ở nền (nếu chưa); trả về task nạp."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._load))
+        return self._task
+
+    async def wait_ready(self):
+        if not self.ready:
+            await asyncio.shield(self.start())
+
+    async def submit(self, name, landmarks):
+        """Đưa chuỗi ``(T, 42, 3)`` vào scheduler ``name`` ('word', 'character', 'auto', 'embedding')."""
+        await self.wait_ready()
+        return await self.schedulers[name].submit(landmarks)
+
+    async def submit_many(self, name, sequences):
+        """Như ``submit`` cho nhiều chuỗi, được gom vào cùng batch; trả về danh sách logits."""
+        await self.wait_ready()
+        return await self.schedulers[name].submit_many(sequences)
+
+    def status(self):
+        error = None
+        if self._task is not None and self._task.done() and not self._task.cancelled():
+            error = self._task.exception()
+        return {
+            'ready': self.ready,
+            'loading': self._task is not None and not self._task.done(),
+            'error': str(error) if error else None,
+            'backend': self.backend,
+            'device': str(self.device) if self.device else None,
+            'load_seconds': self.load_seconds,
+            'warm_up_seconds': self.warm_up_seconds,
+            'torch_threads': self.torch_threads,
+        }
+
+    def _load(self):
+        start = time.perf_counter()
+        import torch
+        from backends import load_backend
+        from inference import InferenceScheduler
+        from model.bi_lstm_att_14 import BiLSTMAttention14, FusedBiLSTMAttention14
+        from model.export import load_checkpoint
+
+        if self.num_threads > 0:
+            torch.set_num_threads(self.num_threads)
+        self.torch_threads = torch.get_num_threads()
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # mmap chỉ áp dụng cho trọng số trên CPU
+        mmap = self.mmap and device.type == 'cpu'
+
+        word_model = load_checkpoint(f'{self.model_dir}/word_model.pth', device, mmap=mmap)
+        char_model = load_checkpoint(f'{self.model_dir}/char_model.pth', device, mmap=mmap)
+
+        # Bộ mã hóa ngữ cảnh (không có classifier) dùng chung trọng số với word_model
+        word_encoder = BiLSTMAttention14(cls_head=False).to(device)
+        word_encoder.load_state_dict(word_model.state_dict(), strict=False, assign=True)
+        word_encoder.eval()
+
+        # Chế độ auto: cả hai model trong một lần gọi, logits nối theo thứ tự [word, character]
+        auto_model = FusedBiLSTMAttention14([word_model, char_model]).eval()
+
+        backend_device = device if self.backend == 'eager' else torch.device('cpu')
+        word_backend = load_backend(self.backend, word_model, 'word_model', self.export_dir)
+        char_backend = load_backend(self.backend, char_model, 'char_model', self.export_dir)
+        auto_backend = load_backend(self.backend, auto_model, 'auto_model', self.export_dir)
+        # Batch trộn độ dài: chạy qua bản fused (không packed LSTM) dùng chung trọng số
+        word_ragged = char_ragged = None
+        if self.supports_lengths:
+            word_ragged = load_backend(self.backend, FusedBiLSTMAttention14([word_model]).eval(), 'word_model')
+            char_ragged = load_backend(self.backend, FusedBiLSTMAttention14([char_model]).eval(), 'char_model')
+        self.load_seconds = time.perf_counter() - start
+
+        schedulers = {
+            'word': InferenceScheduler(word_backend, self.max_batch_size, self.max_wait_ms, device=backend_device,
+                                       name='word', supports_lengths=self.supports_lengths, pad_to=150,
+                                       ragged_model=word_ragged),
+            'character': InferenceScheduler(char_backend, self.max_batch_size, self.max_wait_ms, device=backend_device,
+                                            name='character', supports_lengths=self.supports_lengths, pad_to=75,
+                                            ragged_model=char_ragged),
+            'auto': InferenceScheduler(auto_backend, self.max_batch_size, self.max_wait_ms, device=backend_device,
+                                       name='auto', supports_lengths=self.supports_lengths, pad_to=150),
+            'embedding': InferenceScheduler(word_encoder, self.max_batch_size, self.max_wait_ms, device=device,
+                                            name='embedding'),
+        }
+
+        start = time.perf_counter()
+        for scheduler in schedulers.values():
+            scheduler.warm_up(WARM_UP_LENGTHS)
+        self.warm_up_seconds = time.perf_counter() - start
+
+        self.device = device
+        self.schedulers = schedulers
+        logger.info(f"Đã nạp model ({self.backend}, {device}) sau {self.load_seconds:.2f}s, "
+                    f"khởi động {self.warm_up_seconds:.2f}s")
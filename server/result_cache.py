@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Cache theo nội dung video (LRU trong RAM, tùy chọn thêm tầng đĩa).
+
+    Mỗi mục là ``(mảng, dữ liệu JSON)``: response ``TranslationResponse`` (mảng là
+    None) hoặc landmark đã trích xuất kèm thông tin về chúng. Tầng đĩa (``disk_dir``)
+    lưu mỗi mục thành một tệp ``.npz`` và xóa các tệp ít được dùng nhất khi tổng
+    dung lượng vượt ``max_disk_bytes``. Đọc/ghi đĩa chạy trong thread, không chặn
+    event loop.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, max_disk_bytes=512 * 1024 * 1024):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = int(max_disk_bytes)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(digest, *parts):
+        return ':'.join([digest] + [str(part) for part in parts])
+
+    async def get(self, key):
+        """Trả về ``(mảng, dữ liệu)`` hoặc None nếu chưa có trong cache."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = await asyncio.to_thread(self._read_disk, key) if self.disk_dir else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    async def put(self, key, array, data):
+        entry = (array, data)
+        with self._lock:
+            self._remember(key, entry)
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, entry)
+            except OSError as e:
+                logger.warning(f"Không ghi được cache ra đĩa: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._memory),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'disk_enabled': bool(self.disk_dir),
+        }
+
+    def _remember(self, key, entry):
+        if not self.max_entries:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key.replace(':', '_').replace(os.sep, '_') + '.npz')
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                array = data['array'] if 'array' in data.files else None
+                entry = (array, json.loads(str(data['data'])))
+            # Cập nhật mtime để việc dọn dẹp theo LRU
+            os.utime(path)
+            return entry
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _write_disk(self, key, entry):
+        array, data = entry
+        arrays = {'data': np.array(json.dumps(data))}
+        if array is not None:
+            arrays['array'] = array
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith('.npz'):
+                stat = os.stat(os.path.join(self.disk_dir, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+                total -= size
+            except OSError:
+                pass
@@ -1,4 +1,5 @@
 import os
+import sys
 import uvicorn
 from dotenv import load_dotenv
 
@@ -15,12 +16,39 @@ if __name__ == "__main__":
     # Configure logging
     log_level = os.getenv("LOG_LEVEL", "info")
     
-    # Start the server
-    uvicorn.run(
-        "main:app",
-        host=host,
-        port=port,
-        reload=True,  # Enable auto-reload during development
-        log_level=log_level,
-        workers=1  # Use single worker for development
-    ) 
\ No newline at end of file
+    # Chế độ production: `python run.py --prod` hoặc SERVER_MODE=prod
+    if "--prod" in sys.argv or os.getenv("SERVER_MODE", "dev") == "prod":
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, int(os.getenv("WEB_WORKERS", 0)) or cpu_count)
+
+        # Chia lõi CPU cho các worker để torch và pool MediaPipe không tranh nhau
+        if int(os.getenv("TORCH_NUM_THREADS", 0)) <= 0:
+            os.environ["TORCH_NUM_THREADS"] = str(max(1, cpu_count // workers))
+        if int(os.getenv("LANDMARK_WORKERS", 0)) <= 0:
+            os.environ["LANDMARK_WORKERS"] = str(max(1, cpu_count // workers))
+
+        # Không có sticky session: mỗi phiên Socket.IO phải là một kết nối websocket duy nhất
+        if workers > 1 and "polling" in os.getenv("SOCKET_TRANSPORTS", "polling"):
+            print("SOCKET_TRANSPORTS: dùng websocket vì long-polling cần sticky session khi chạy nhiều worker")
+            os.environ["SOCKET_TRANSPORTS"] = "websocket"
+
+        print(f"Production: {workers} worker, TORCH_NUM_THREADS={os.environ['TORCH_NUM_THREADS']}, "
+              f"LANDMARK_WORKERS={os.environ['LANDMARK_WORKERS']}")
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            reload=False,
+            log_level=log_level,
+            workers=workers,
+        )
+    else:
+        # Start the server
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            reload=True,  # Enable auto-reload during development
+            log_level=log_level,
+            workers=1  # Use single worker for development
+        )
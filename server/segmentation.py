@@ -0,0 +1,124 @@
+import numpy as np
+
+HAND_POINTS = 21
+
+# Tốc độ (bề rộng khung hình/giây) dưới ngưỡng này coi như tay đang nghỉ
+MOTION_THRESHOLD = 0.08
+MOTION_LAG_S = 0.1
+MIN_REST_S = 0.3
+MIN_SEGMENT_S = 0.2
+CONTEXT_S = 0.15
+
+
+def motion_energy(landmarks, fps, lag_s=MOTION_LAG_S):
+    """Tốc độ chuyển động của bàn tay cho từng khung hình của ``(T, 42, 3)``.
+
+    Với mỗi tay, lấy trung bình độ dời (x, y) của 21 điểm giữa khung ``t`` và
+    ``t - lag`` (chỉ khi tay có mặt ở cả hai khung), đổi ra bề rộng khung
+    hình/giây rồi cộng hai tay. So sánh cách ``lag`` khung thay vì khung liền
+    kề để nhiễu rung của MediaPipe không lấn át chuyển động thật.
+    Trả về ``(energy, hands)`` với ``hands[t]`` cho biết khung ``t`` có tay.
+    """
+    n = len(landmarks)
+    hands = landmarks.reshape(n, 2, HAND_POINTS, 3)[..., :2]
+    present = hands.any(axis=(2, 3))
+    lag = max(1, int(round(lag_s * fps)))
+    energy = np.zeros(n, dtype=np.float32)
+    if n > lag:
+        step = np.linalg.norm(hands[lag:] - hands[:-lag], axis=-1).mean(axis=-1)
+        energy[lag:] = (step * (present[lag:] & present[:-lag])).sum(axis=1) * (fps / lag)
+    return energy, present.any(axis=1)
+
+
+def _runs(mask):
+    """Chỉ số ``(starts, ends)`` của các đoạn True liên tiếp trong ``mask``."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def find_segments(landmarks, fps, max_frames, threshold=MOTION_THRESHOLD, min_rest_s=MIN_REST_S,
+                  min_segment_s=MIN_SEGMENT_S, context_s=CONTEXT_S):
+    """Chia ``(T, 42, 3)`` thành các đoạn ký hiệu ``[(start, end), ...]`` tại các khoảng nghỉ.
+
+    Khung hình "hoạt động" khi có tay và tốc độ vượt ``threshold``. Các khoảng
+    nghỉ ngắn hơn ``min_rest_s`` được gộp vào ký hiệu, đoạn ngắn hơn
+    ``min_segment_s`` bị bỏ, mỗi đoạn được nới thêm ``context_s`` ở hai đầu và
+    đoạn dài hơn ``max_frames`` được cắt tại khung chuyển động chậm nhất.
+    """
+    energy, hands = motion_energy(landmarks, fps)
+    starts, ends = _runs(hands & (energy > threshold))
+    if not len(starts):
+        return []
+
+    min_rest = max(1, int(round(min_rest_s * fps)))
+    keep = starts[1:] - ends[:-1] >= min_rest
+    starts = np.concatenate((starts[:1], starts[1:][keep]))
+    ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+
+    long_enough = ends - starts >= max(1, int(round(min_segment_s * fps)))
+    starts, ends = starts[long_enough], ends[long_enough]
+    # Nới tối đa nửa khoảng nghỉ để hai đoạn liền nhau không chồng lên nhau
+    context = min(int(round(context_s * fps)), min_rest // 2)
+    starts = np.maximum(starts - context, 0)
+    ends = np.minimum(ends + context, len(landmarks))
+
+    segments = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        while end - start > max_frames:
+            # Cắt ở nửa sau của cửa sổ để mỗi phần vẫn đủ dài cho model
+            window = energy[start + max_frames // 2:start + max_frames]
+            cut = start + max_frames // 2 + int(window.argmin())
+            segments.append((start, cut))
+            start = cut
+        segments.append((start, end))
+    return segments
+
+
+class MotionSegmenter:
+    """Chia một luồng landmark dài tùy ý thành các đoạn ký hiệu với bộ nhớ giới hạn.
+
+    ``push()`` nhận từng khối ``(n, 42, 3)`` và trả về các đoạn đã kết thúc
+    dưới dạng ``(start, end, landmarks)`` (chỉ số khung tuyệt đối). Chỉ phần
+    chưa chốt của luồng được giữ lại, nên bộ đệm không vượt quá khoảng
+    ``2 * max_frames`` cộng một khối. ``flush()`` trả về các đoạn còn lại.
+    """
+
+    def __init__(self, fps, max_frames, **options):
+        self.fps = fps
+        self.max_frames = max_frames
+        self.options = options
+        self._min_rest = max(1, int(round(options.get('min_rest_s', MIN_REST_S) * fps)))
+        # Số khung trước đoạn đang mở cần giữ để tính lại tốc độ và phần nới ở đầu đoạn
+        self._margin = (max(1, int(round(MOTION_LAG_S * fps)))
+                        + int(round(options.get('context_s', CONTEXT_S) * fps)))
+        self._buffer = np.zeros((0, 2 * HAND_POINTS, 3), dtype=np.float32)
+        self._offset = 0
+
+    def push(self, landmarks):
+        self._buffer = np.concatenate((self._buffer, landmarks))
+        return self._take(final=False)
+
+    def flush(self):
+        return self._take(final=True)
+
+    def _take(self, final):
+        buffer = self._buffer
+        done, open_start = [], None
+        for start, end in find_segments(buffer, self.fps, self.max_frames, **self.options):
+            # Đoạn đã chốt khi sau nó có đủ một khoảng nghỉ (hoặc nó bị cắt vì quá dài)
+            if final or end + self._min_rest <= len(buffer):
+                done.append((self._offset + start, self._offset + end, buffer[start:end].copy()))
+            else:
+                open_start = start
+                break
+
+        if final:
+            keep_from = len(buffer)
+        else:
+            # Giữ đoạn đang mở, hoặc phần cuối có thể còn trở thành một đoạn
+            keep_from = open_start if open_start is not None else len(buffer) - self._min_rest
+            emitted = done[-1][1] - self._offset if done else 0
+            keep_from = max(keep_from - self._margin, emitted, 0)
+        self._buffer = buffer[keep_from:].copy()
+        self._offset += keep_from
+        return done
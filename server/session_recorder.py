@@ -0,0 +1,227 @@
+import base64
+import json
+import logging
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tệp ghi phiên: HEADER + metadata JSON, sau đó là chuỗi bản ghi RECORD + dữ liệu.
+# Bản ghi khung hình: landmark (42, 3) float16 (nếu có cờ HAS_LANDMARKS) rồi ảnh JPEG
+# dài ``length`` byte; bản ghi sự kiện: JSON dài ``length`` byte.
+MAGIC = b'SLRS'
+VERSION = 1
+FILE_SUFFIX = '.slrs'
+HEADER = struct.Struct('<4sHI')   # magic, phiên bản, độ dài metadata
+RECORD = struct.Struct('<BBdI')   # loại, cờ, thời điểm nhận (giây từ lúc mở), độ dài phần sau
+LANDMARK_SHAPE = (42, 3)
+LANDMARK_DTYPE = np.dtype('<f2')
+LANDMARK_BYTES = LANDMARK_DTYPE.itemsize * LANDMARK_SHAPE[0] * LANDMARK_SHAPE[1]
+
+FRAME, EVENT = 0, 1
+# Cờ của bản ghi khung hình
+HAS_LANDMARKS = 1
+DROPPED = 2            # bị bỏ khỏi hộp thư của phiên, chưa qua MediaPipe
+SKIPPED = 4            # bỏ qua khi phiên đang nghỉ (không có tay)
+CLIENT_LANDMARKS = 8   # landmark do client gửi qua ``video_landmarks``
+
+# Mọi phiên ghi chung một thread: ghi tệp và thu nhỏ ảnh không chạy trên event loop
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='session-recorder')
+
+
+def frame_bytes(frame_data):
+    """Bytes của một khung hình nhị phân hoặc chuỗi base64/data URL."""
+    if isinstance(frame_data, (bytes, bytearray, memoryview)):
+        return bytes(frame_data)
+    return base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
+
+
+def downscale_jpeg(image_data, max_side, quality=70):
+    """Giải mã ảnh (JPEG/WebP), thu nhỏ về cạnh dài ``max_side`` và mã hóa lại JPEG; None nếu lỗi."""
+    import cv2
+    frame = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    h, w = frame.shape[:2]
+    scale = max_side / max(h, w)
+    if scale < 1:
+        frame = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes() if ok else None
+
+
+class SessionRecorder:
+    """Ghi một phiên streaming vào tệp nhị phân gọn để phát lại khi kiểm thử tải.
+
+    Mỗi khung hình là một bản ghi 14 byte + 252 byte landmark float16, cộng ảnh
+    JPEG đã thu nhỏ về cạnh dài ``jpeg_side`` nếu ``jpeg_side > 0``. Thời điểm
+    là lúc khung hình tới server, tính bằng giây từ lúc mở tệp. Các lệnh ghi được
+    đưa sang thread ghi dùng chung nên không chặn event loop; lỗi I/O chỉ tắt
+    việc ghi của phiên, không làm hỏng phiên.
+
+    Khi thread ghi tụt lại từ ``max_pending`` lệnh ghi của phiên trở lên, ảnh bị
+    bỏ (khung hình chỉ còn landmark); từ ``2 * max_pending`` thì bỏ cả bản ghi
+    khung hình. Số lượng bị bỏ được ghi thành sự kiện ``recorder_dropped`` khi đóng.
+    """
+
+    def __init__(self, path, jpeg_side=0, jpeg_quality=70, meta=None, max_pending=256):
+        self.path = path
+        self.jpeg_side = int(jpeg_side)
+        self.jpeg_quality = jpeg_quality
+        self.max_pending = max(1, int(max_pending))
+        self.started = time.monotonic()
+        self.frames = 0
+        self.images_dropped = 0
+        self.frames_dropped = 0
+        self.closed = False
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._mode = None
+        self._file = None
+        header = {
+            'version': VERSION,
+            'created_at': datetime.now().isoformat(),
+            'landmark_dtype': 'float16',
+            'landmark_shape': list(LANDMARK_SHAPE),
+            'jpeg_side': self.jpeg_side,
+            **(meta or {}),
+        }
+        self._submit(self._open, header)
+
+    def frame(self, received, mode, landmarks=None, image=None, flags=0):
+        """Ghi một khung hình nhận lúc ``received`` (``time.monotonic()``)."""
+        if self.closed:
+            return
+        pending = self._pending
+        if pending >= 2 * self.max_pending:
+            self.frames_dropped += 1
+            return
+        self._set_mode(mode, received)
+        if landmarks is not None:
+            landmarks = np.asarray(landmarks).astype(LANDMARK_DTYPE)
+            flags |= HAS_LANDMARKS
+        if not self.jpeg_side:
+            image = None
+        elif image is not None and pending >= self.max_pending:
+            # Thu nhỏ ảnh là phần tốn kém nhất của lệnh ghi
+            self.images_dropped += 1
+            image = None
+        self.frames += 1
+        self._submit(self._write_frame, received - self.started, flags, landmarks, image)
+
+    def event(self, name, data=None, received=None):
+        """Ghi một sự kiện của phiên (vd. ``start_session`` kèm cấu hình cửa sổ)."""
+        if self.closed:
+            return
+        received = time.monotonic() if received is None else received
+        self._submit(self._write_event, received - self.started, {'event': name, 'data': data})
+
+    def close(self, wait=False):
+        """Đóng tệp sau khi ghi hết các bản ghi đang chờ; ``wait=True`` chờ tới khi xong."""
+        if not self.closed:
+            if self.images_dropped or self.frames_dropped:
+                self.event('recorder_dropped', {'images': self.images_dropped, 'frames': self.frames_dropped})
+            self.closed = True
+            done = _writer.submit(self._close)
+            if wait:
+                done.result()
+
+    def _set_mode(self, mode, received):
+        if mode != self._mode:
+            self._mode = mode
+            self._submit(self._write_event, received - self.started, {'event': 'mode', 'data': mode})
+
+    def _submit(self, fn, *args):
+        with self._pending_lock:
+            self._pending += 1
+        _writer.submit(self._guarded, fn, *args)
+
+    def _guarded(self, fn, *args):
+        try:
+            if self._file is None and fn != self._open:
+                return
+            fn(*args)
+        except (OSError, ValueError) as e:
+            logger.error(f"Lỗi ghi phiên {self.path}: {e}")
+            self.closed = True
+            self._close()
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def _open(self, header):
+        meta = json.dumps(header).encode('utf-8')
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(meta)) + meta)
+
+    def _write_frame(self, t, flags, landmarks, image):
+        jpeg = b''
+        if image is not None:
+            jpeg = downscale_jpeg(frame_bytes(image), self.jpeg_side, self.jpeg_quality) or b''
+        self._file.write(RECORD.pack(FRAME, flags, t, len(jpeg)))
+        if landmarks is not None:
+            self._file.write(landmarks.tobytes())
+        self._file.write(jpeg)
+
+    def _write_event(self, t, event):
+        payload = json.dumps(event).encode('utf-8')
+        self._file.write(RECORD.pack(EVENT, 0, t, len(payload)) + payload)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_session(path):
+    """Đọc tệp ghi phiên; trả về ``(meta, records)`` với các bản ghi sắp theo thời điểm nhận.
+
+    Bản ghi khung hình là ``{'t', 'flags', 'mode', 'landmarks', 'image'}`` (landmark
+    ``(42, 3)`` float32 hoặc None, ảnh JPEG hoặc None); sự kiện là
+    ``{'t', 'event', 'data'}``. Bản ghi cuối bị cắt dở (server dừng đột ngột) bị bỏ qua.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: không phải tệp ghi phiên")
+    magic, version, meta_len = HEADER.unpack_from(data)
+    if magic != MAGIC or version > VERSION:
+        raise ValueError(f"{path}: không phải tệp ghi phiên (phiên bản {VERSION})")
+    offset = HEADER.size + meta_len
+    meta = json.loads(data[HEADER.size:offset])
+
+    records, mode = [], None
+    while offset + RECORD.size <= len(data):
+        kind, flags, t, length = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        n_landmarks = LANDMARK_BYTES if kind == FRAME and flags & HAS_LANDMARKS else 0
+        end = start + n_landmarks + length
+        if end > len(data):
+            break
+        offset = end
+        if kind == EVENT:
+            event = json.loads(data[start:end])
+            if event['event'] == 'mode':
+                mode = event['data']
+            else:
+                records.append({'t': t, 'event': event['event'], 'data': event.get('data')})
+            continue
+        landmarks = None
+        if n_landmarks:
+            landmarks = np.frombuffer(data, LANDMARK_DTYPE, LANDMARK_BYTES // 2, start).reshape(LANDMARK_SHAPE)
+            landmarks = landmarks.astype(np.float32)
+        records.append({
+            't': t,
+            'flags': flags,
+            'mode': mode,
+            'landmarks': landmarks,
+            'image': bytes(data[start + n_landmarks:end]) or None,
+        })
+    # Khung hình bị bỏ được ghi lúc bị đẩy khỏi hộp thư nên có thể lệch thứ tự
+    records.sort(key=lambda record: record['t'])
+    return meta, records
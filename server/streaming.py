@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LandmarkRingBuffer:
+    """Bộ đệm vòng kích thước cố định cho landmark ``(42, 3)`` float32 của một phiên."""
+
+    def __init__(self, capacity, shape=(42, 3)):
+        self.capacity = int(capacity)
+        self._data = np.zeros((self.capacity,) + tuple(shape), dtype=np.float32)
+        self._next = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def append(self, landmarks):
+        self._data[self._next] = landmarks
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, length=None):
+        """Trả về bản sao ``length`` landmark gần nhất theo thứ tự thời gian."""
+        length = self.count if length is None else min(int(length), self.count)
+        start = (self._next - length) % self.capacity
+        if start + length <= self.capacity:
+            return self._data[start:start + length].copy()
+        return np.concatenate((self._data[start:], self._data[:self._next]))
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+
+
+class ResultDebouncer:
+    """Gộp kết quả từ các cửa sổ chồng lấp để một ký hiệu chỉ được gửi một lần.
+
+    Kết quả trùng với lần gửi trước bị bỏ qua; nó chỉ được gửi lại sau khi có
+    ``release_after`` cửa sổ liên tiếp có độ tin cậy dưới ``min_confidence``.
+    """
+
+    def __init__(self, min_confidence=0.5, release_after=2):
+        self.min_confidence = min_confidence
+        self.release_after = max(1, int(release_after))
+        self._last_text = None
+        self._misses = 0
+
+    def update(self, text, confidence):
+        """Trả về True nếu kết quả này nên được gửi cho client."""
+        if confidence < self.min_confidence:
+            self._misses += 1
+            if self._misses >= self.release_after:
+                self._last_text = None
+            return False
+
+        self._misses = 0
+        if text == self._last_text:
+            return False
+        self._last_text = text
+        return True
+
+    def reset(self):
+        self._last_text = None
+        self._misses = 0
+
+
+class HandPresenceGate:
+    """Chuyển phiên sang trạng thái nghỉ khi không thấy bàn tay trong nhiều khung hình.
+
+    Sau ``idle_after`` khung hình liên tiếp không có tay, chỉ 1 trên
+    ``idle_sample_every`` khung hình được xử lý (để phát hiện tay xuất hiện lại)
+    và không có suy luận nào được lên lịch.
+    """
+
+    IDLE = 'idle'
+    RESUMED = 'resumed'
+
+    def __init__(self, idle_after=15, idle_sample_every=5):
+        self.idle_after = max(1, int(idle_after))
+        self.idle_sample_every = max(1, int(idle_sample_every))
+        self.idle = False
+        self.frames_skipped = 0
+        self._empty_frames = 0
+        self._since_sample = 0
+
+    def should_process(self):
+        """Khung hình tiếp theo có cần giải mã và trích xuất landmark hay không."""
+        if not self.idle:
+            return True
+        self._since_sample += 1
+        if self._since_sample >= self.idle_sample_every:
+            self._since_sample = 0
+            return True
+        self.frames_skipped += 1
+        return False
+
+    def update(self, has_hands):
+        """Cập nhật theo khung hình vừa xử lý; trả về IDLE/RESUMED khi trạng thái đổi."""
+        if has_hands:
+            self._empty_frames = 0
+            if self.idle:
+                self.idle = False
+                return self.RESUMED
+            return None
+
+        self._empty_frames += 1
+        if not self.idle and self._empty_frames >= self.idle_after:
+            self.idle = True
+            self._since_sample = 0
+            return self.IDLE
+        return None
+
+
+class FrameInbox:
+    """Hộp thư giới hạn cho khung hình của một phiên, khung hình mới nhất được ưu tiên.
+
+    Khi đầy, khung hình cũ nhất bị bỏ để độ trễ không tăng vô hạn khi client
+    gửi nhanh hơn tốc độ xử lý. Ghi lại số khung hình bị bỏ và thời gian chờ
+    trong hàng đợi của mỗi khung hình được xử lý. ``on_drop(item)`` (nếu có)
+    được gọi với khung hình bị bỏ.
+    """
+
+    def __init__(self, capacity=4, throttle_at=None, on_drop=None):
+        self.capacity = max(1, int(capacity))
+        self.throttle_at = self.capacity if throttle_at is None else max(1, int(throttle_at))
+        self.on_drop = on_drop
+        self._items = deque()
+        self._ready = asyncio.Event()
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+        self.throttled = False
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        """Thêm một khung hình; trả về True nếu hàng đợi vừa vượt ngưỡng throttle."""
+        self.frames_received += 1
+        if len(self._items) >= self.capacity:
+            dropped, _ = self._items.popleft()
+            self.frames_dropped += 1
+            if self.on_drop is not None:
+                self.on_drop(dropped)
+        self._items.append((item, time.monotonic()))
+        self._ready.set()
+        if not self.throttled and len(self._items) >= self.throttle_at:
+            self.throttled = True
+            return True
+        return False
+
+    async def get(self):
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        item, queued_at = self._items.popleft()
+        if len(self._items) < self.throttle_at:
+            self.throttled = False
+        latency = time.monotonic() - queued_at
+        self.frames_processed += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+        return item
+
+    def stats(self):
+        return {
+            'queue_depth': len(self._items),
+            'frames_received': self.frames_received,
+            'frames_dropped': self.frames_dropped,
+            'frames_processed': self.frames_processed,
+            'last_queue_latency_ms': self.last_latency * 1000.0,
+            'max_queue_latency_ms': self.max_latency * 1000.0,
+            'avg_queue_latency_ms': (self._total_latency / self.frames_processed * 1000.0
+                                     if self.frames_processed else 0.0),
+        }
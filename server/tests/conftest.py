@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Các module của server được import trực tiếp (như khi chạy ``uvicorn main:app`` trong server/)
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
@@ -0,0 +1,74 @@
+import pytest
+
+from dictionary_search import DictionarySearchIndex, fold
+
+WORDS = [
+    ('Xin chào', 'Chào hỏi', ['Chào', 'Hi']),
+    ('Cảm ơn', 'Giao tiếp', ['Cám ơn']),
+    ('A', 'Chữ cái', []),
+    ('Ă', 'Chữ cái', []),
+    ('Anh', 'Gia đình', ['Anh trai']),
+    ('Bánh mì', 'Đồ ăn', []),
+    ('Con cá', 'Động vật', ['Cá']),
+    ('Đi học', 'Hoạt động', []),
+    ('Hào hứng', 'Cảm xúc', []),
+]
+
+
+@pytest.fixture(scope='module')
+def index():
+    items = [{'id': i + 1, 'word': word, 'category': category, 'variations': variations}
+             for i, (word, category, variations) in enumerate(WORDS)]
+    return DictionarySearchIndex(items)
+
+
+def words(result):
+    return [item['word'] for item in result[0]]
+
+
+def brute_force(index, query):
+    """Mọi mục có từ hoặc biến thể chứa truy vấn (không phân biệt dấu)."""
+    folded = fold(query)
+    return {item['word'] for item in index.items
+            if any(folded in fold(text) for text in [item['word']] + item['variations'])}
+
+
+@pytest.mark.parametrize('query', ['ào', 'a', 'n', 'on', 'ch', 'cá', 'mì', 'o h', 'anh', 'chào', 'hung', 'xyz'])
+def test_matches_every_substring_like_the_original_search(index, query):
+    result = index.search(query)
+    assert set(words(result)) == brute_force(index, query)
+    assert result[1] == len(result[0])
+
+
+def test_short_query_matches_inside_a_syllable(index):
+    # "ào" chỉ nằm giữa tiếng "chào"/"hào", không phải tiền tố của tiếng nào
+    assert set(words(index.search('ào'))) == {'Xin chào', 'Hào hứng'}
+
+
+def test_exact_word_ranks_first(index):
+    assert words(index.search('a'))[0] == 'A'
+    assert words(index.search('anh'))[0] == 'Anh'
+
+
+def test_accented_match_ranks_before_unaccented(index):
+    assert words(index.search('ă'))[:2] == ['Ă', 'A']
+    assert words(index.search('a'))[:2] == ['A', 'Ă']
+
+
+def test_prefix_ranks_before_substring(index):
+    ranked = words(index.search('an'))
+    assert ranked[0] == 'Anh'
+    assert ranked.index('Anh') < ranked.index('Bánh mì')
+
+
+def test_category_filter_and_all_categories(index):
+    assert set(words(index.search('a', category='Chữ cái'))) == {'A', 'Ă'}
+    assert index.search(category='Tất cả')[1] == len(WORDS)
+    assert index.search(category='chu cai')[1] == 2
+
+
+def test_pagination_keeps_total(index):
+    everything, total = index.search('a')
+    page, page_total = index.search('a', limit=2, offset=1)
+    assert page_total == total
+    assert page == everything[1:3]
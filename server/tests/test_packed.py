@@ -0,0 +1,65 @@
+import os
+
+import pytest
+import torch
+
+from inference import InferenceScheduler
+from model.bi_lstm_att_14 import FusedBiLSTMAttention14
+from model.export import load_checkpoint
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model')
+ATOL = 1e-4
+SEQ_LEN = 150
+MIXED_LENGTHS = [SEQ_LEN, 120, 75, 40, 10, 1]
+
+
+@pytest.fixture(scope='module', params=['word_model', 'char_model'])
+def model(request):
+    torch.manual_seed(0)
+    return load_checkpoint(os.path.join(MODEL_DIR, f'{request.param}.pth'))
+
+
+def mixed_batch(lengths):
+    batch = torch.zeros((len(lengths), SEQ_LEN, 42, 3))
+    for i, n in enumerate(lengths):
+        batch[i, :n] = torch.rand((n, 42, 3))
+    return batch, torch.tensor(lengths)
+
+
+def unpadded_singles(model, batch, lengths):
+    return torch.cat([model(batch[i:i + 1, :n]) for i, n in enumerate(lengths.tolist())])
+
+
+@torch.no_grad()
+def test_full_length_lengths_match_padded(model):
+    full = torch.rand((8, SEQ_LEN, 42, 3))
+    lengths = torch.full((8,), SEQ_LEN)
+    assert torch.allclose(model(full), model(full, lengths), atol=ATOL)
+
+
+@torch.no_grad()
+def test_equal_lengths_drop_padding(model):
+    batch, _ = mixed_batch([30, 30, 30])
+    lengths = torch.full((3,), 30)
+    assert torch.allclose(model(batch, lengths), model(batch[:, :30]), atol=ATOL)
+
+
+@torch.no_grad()
+def test_packed_mixed_lengths_match_unpadded_singles(model):
+    batch, lengths = mixed_batch(MIXED_LENGTHS)
+    assert torch.allclose(model(batch, lengths), unpadded_singles(model, batch, lengths), atol=ATOL)
+
+
+@torch.no_grad()
+def test_fused_mixed_lengths_match_unpadded_singles(model):
+    fused = FusedBiLSTMAttention14([model]).eval()
+    batch, lengths = mixed_batch(MIXED_LENGTHS)
+    assert torch.allclose(fused(batch, lengths), unpadded_singles(model, batch, lengths), atol=ATOL)
+
+
+def test_scheduler_batches_match_singles(model):
+    scheduler = InferenceScheduler(model, ragged_model=FusedBiLSTMAttention14([model]).eval())
+    sequences = [torch.rand((n, 42, 3)) for n in MIXED_LENGTHS]
+    batched, _, _ = scheduler._run_model(sequences)
+    singles = torch.cat([scheduler._run_model([s])[0] for s in sequences])
+    assert torch.allclose(batched, singles, atol=ATOL)
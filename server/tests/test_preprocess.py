@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pytest
+
+from model.preprocess import HandLandmarkExtractor, get_hand_landmarks, iter_frames, landmark_array
+
+import mediapipe as mp
+
+DICTIONARY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'dictionary')
+# Hai tay (camon) và một tay (daucham)
+CLIPS = ['camon.mp4', 'daucham.mp4']
+HAND_LANDMARKER_MODEL = os.getenv('HAND_LANDMARKER_MODEL')
+
+
+def clip_frames(name, max_frames=60):
+    path = os.path.join(DICTIONARY_DIR, name)
+    if not os.path.exists(path):
+        pytest.skip(f'thiếu clip từ điển {name}')
+    return list(iter_frames(path, max_frames=max_frames))
+
+
+def extract(frames, model_path=None, **kwargs):
+    extractor = HandLandmarkExtractor(model_path, **kwargs)
+    out = np.zeros((len(frames), 42, 3), dtype=np.float32)
+    try:
+        extractor.process_batch(frames, out)
+    finally:
+        extractor.close()
+    return out
+
+
+def hand_slots(landmarks):
+    """``(T, 2)``: tay trái (ô 0..20) và tay phải (ô 21..41) có được phát hiện hay không."""
+    return np.stack([landmarks[:, :21].any(axis=(1, 2)), landmarks[:, 21:].any(axis=(1, 2))], axis=1)
+
+
+class Point:
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+def test_landmark_array_keeps_point_order():
+    expected = np.random.default_rng(0).random((21, 3), dtype=np.float32)
+    array = landmark_array([Point(*row) for row in expected])
+    assert array.dtype == np.float32 and array.shape == (21, 3)
+    np.testing.assert_array_equal(array, expected)
+
+
+@pytest.mark.parametrize('clip', CLIPS)
+def test_extractor_matches_reference_solutions_path(clip):
+    frames = clip_frames(clip)
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2)
+    try:
+        reference = np.stack([get_hand_landmarks(frame, np.arange(21), detector=hands) for frame in frames])
+    finally:
+        hands.close()
+    np.testing.assert_allclose(extract(frames), reference, atol=1e-6)
+
+
+def test_filtered_indices_select_points():
+    frames = clip_frames('camon.mp4', max_frames=20)
+    indices = np.array([0, 4, 8, 12, 16, 20])
+    full = extract(frames)
+    filtered = extract(frames, filtered_hand_indices=indices)
+    np.testing.assert_array_equal(filtered[:, :6], full[:, indices])
+    np.testing.assert_array_equal(filtered[:, 6:12], full[:, 21 + indices])
+
+
+@pytest.mark.skipif(not (HAND_LANDMARKER_MODEL and os.path.exists(HAND_LANDMARKER_MODEL)),
+                    reason='cần HAND_LANDMARKER_MODEL (hand_landmarker.task)')
+@pytest.mark.parametrize('clip', CLIPS)
+def test_tasks_matches_solutions_including_hand_slots(clip):
+    frames = clip_frames(clip)
+    solutions = extract(frames)
+    tasks = extract(frames, HAND_LANDMARKER_MODEL)
+
+    # Cùng tay phải nằm cùng ô: Tasks báo handedness ngược với mp.solutions
+    solutions_slots, tasks_slots = hand_slots(solutions), hand_slots(tasks)
+    assert solutions_slots.any()
+    assert (solutions_slots == tasks_slots).mean() >= 0.95
+
+    both = np.repeat(solutions_slots & tasks_slots, 21, axis=1)
+    xy_diff = np.abs(solutions - tasks)[..., :2][both]
+    assert np.median(xy_diff) < 0.01
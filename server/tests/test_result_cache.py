@@ -0,0 +1,58 @@
+import asyncio
+import os
+
+import numpy as np
+
+from result_cache import ResultCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_memory_lru_evicts_oldest():
+    cache = ResultCache(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        run(cache.put(key, None, {'text': key}))
+    assert run(cache.get('a')) is None
+    assert run(cache.get('c')) == (None, {'text': 'c'})
+    assert cache.stats()['entries'] == 2
+
+
+def test_zero_entries_disables_memory():
+    cache = ResultCache(max_entries=0)
+    run(cache.put('a', None, {'text': 'a'}))
+    assert run(cache.get('a')) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_disk_roundtrip_with_and_without_array(tmp_path):
+    landmarks = np.random.default_rng(0).random((30, 42, 3), dtype=np.float32)
+    cache = ResultCache(max_entries=0, disk_dir=str(tmp_path))
+    run(cache.put('digest:landmarks', landmarks, {'fps': 30.0, 'complete': True}))
+    run(cache.put('digest:word', None, {'text': 'xin chào'}))
+
+    reopened = ResultCache(max_entries=4, disk_dir=str(tmp_path))
+    array, info = run(reopened.get('digest:landmarks'))
+    np.testing.assert_array_equal(array, landmarks)
+    assert info == {'fps': 30.0, 'complete': True}
+    assert run(reopened.get('digest:word')) == (None, {'text': 'xin chào'})
+    assert reopened.stats()['disk_hits'] == 2
+
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    array = np.zeros((100, 42, 3), dtype=np.float32)
+    cache = ResultCache(max_entries=0, disk_dir=str(tmp_path), max_disk_bytes=int(array.nbytes * 2.5))
+    for i, key in enumerate(('a', 'b', 'c')):
+        run(cache.put(key, array, {}))
+        # mtime quyết định thứ tự dọn dẹp
+        os.utime(cache._path(key), (i, i))
+    run(cache.put('d', array, {}))
+    assert sorted(os.listdir(tmp_path)) == ['c.npz', 'd.npz']
+
+
+def test_corrupt_disk_entry_is_a_miss(tmp_path):
+    cache = ResultCache(max_entries=0, disk_dir=str(tmp_path))
+    with open(cache._path('broken'), 'wb') as f:
+        f.write(b'not an npz')
+    assert run(cache.get('broken')) is None
@@ -0,0 +1,67 @@
+import numpy as np
+
+from segmentation import MOTION_THRESHOLD, MotionSegmenter, find_segments, motion_energy
+
+FPS = 30.0
+
+
+def signing(n_frames, moving, speed=0.5, seed=0):
+    """Một tay luôn có mặt, di chuyển ``speed`` bề rộng khung/giây trong các khoảng ``moving``."""
+    rng = np.random.default_rng(seed)
+    landmarks = np.zeros((n_frames, 42, 3), dtype=np.float32)
+    hand = rng.random((21, 3), dtype=np.float32) * 0.1 + 0.4
+    position = 0.0
+    for t in range(n_frames):
+        if any(start <= t < end for start, end in moving):
+            # Đổi hướng liên tục để tay vẫn nằm trong khung hình
+            position += speed / FPS * (1 if (t // 10) % 2 == 0 else -1)
+        landmarks[t, 21:] = hand + np.array([position, 0.0, 0.0], dtype=np.float32)
+    return landmarks
+
+
+def test_motion_energy_is_zero_at_rest_and_without_hands():
+    landmarks = signing(60, [(20, 40)])
+    energy, hands = motion_energy(landmarks, FPS)
+    assert hands.all()
+    assert energy[:20].max() == 0
+    assert energy[25:40].min() > MOTION_THRESHOLD
+
+    energy, hands = motion_energy(np.zeros((30, 42, 3), dtype=np.float32), FPS)
+    assert not hands.any() and not energy.any()
+
+
+def test_find_segments_splits_at_rests():
+    landmarks = signing(150, [(30, 60), (90, 120)])
+    segments = find_segments(landmarks, FPS, max_frames=150)
+    assert len(segments) == 2
+    (start1, end1), (start2, end2) = segments
+    assert start1 <= 30 < 60 <= end1 <= start2 <= 90 < 120 <= end2
+
+
+def test_find_segments_ignores_still_hands_and_blips():
+    assert find_segments(signing(90, []), FPS, max_frames=150) == []
+    # Chuyển động ngắn hơn min_segment_s bị bỏ
+    assert find_segments(signing(90, [(40, 42)]), FPS, max_frames=150) == []
+
+
+def test_long_segments_are_cut_to_max_frames():
+    segments = find_segments(signing(260, [(10, 250)]), FPS, max_frames=75)
+    assert len(segments) > 1
+    assert all(end - start <= 75 for start, end in segments)
+    # Các phần liền nhau, không chồng lên nhau
+    assert all(a[1] == b[0] for a, b in zip(segments, segments[1:]))
+
+
+def test_streaming_segmenter_matches_whole_clip():
+    landmarks = signing(400, [(30, 70), (120, 160), (250, 330)])
+    expected = find_segments(landmarks, FPS, max_frames=150)
+
+    segmenter = MotionSegmenter(FPS, 150)
+    segments = []
+    for start in range(0, len(landmarks), 64):
+        segments.extend(segmenter.push(landmarks[start:start + 64]))
+    segments.extend(segmenter.flush())
+
+    assert [(start, end) for start, end, _ in segments] == expected
+    for start, end, frames in segments:
+        np.testing.assert_array_equal(frames, landmarks[start:end])
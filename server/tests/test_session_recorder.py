@@ -0,0 +1,97 @@
+import base64
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from session_recorder import (CLIENT_LANDMARKS, DROPPED, HAS_LANDMARKS, SKIPPED, SessionRecorder, _writer,
+                              frame_bytes, read_session)
+
+
+def jpeg(width=640, height=480):
+    image = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def test_frame_bytes_accepts_binary_and_data_urls():
+    data = b'\xff\xd8jpeg'
+    encoded = base64.b64encode(data).decode()
+    assert frame_bytes(data) == data
+    assert frame_bytes(encoded) == data
+    assert frame_bytes(f'data:image/jpeg;base64,{encoded}') == data
+
+
+def test_roundtrip_frames_events_and_modes(tmp_path):
+    path = tmp_path / 'session.slrs'
+    landmarks = np.random.default_rng(1).random((42, 3), dtype=np.float32)
+    recorder = SessionRecorder(str(path), jpeg_side=160, meta={'sid': 'abc'})
+    t0 = recorder.started
+    recorder.event('start_session', {'window': 60}, received=t0)
+    recorder.frame(t0 + 0.1, 'word', landmarks, jpeg())
+    recorder.frame(t0 + 0.2, 'word', flags=SKIPPED)
+    recorder.frame(t0 + 0.3, 'character', landmarks, flags=CLIENT_LANDMARKS)
+    # Khung hình bị bỏ được ghi muộn hơn thời điểm nhận
+    recorder.frame(t0 + 0.15, 'character', image=jpeg(), flags=DROPPED)
+    recorder.close(wait=True)
+
+    meta, records = read_session(str(path))
+    assert meta['sid'] == 'abc' and meta['jpeg_side'] == 160
+    assert [record['t'] for record in records] == sorted(record['t'] for record in records)
+    event, first, dropped, skipped, client = records
+    assert event == {'t': 0.0, 'event': 'start_session', 'data': {'window': 60}}
+
+    assert first['mode'] == 'word' and first['flags'] == HAS_LANDMARKS
+    np.testing.assert_allclose(first['landmarks'], landmarks, atol=1e-3)
+    image = cv2.imdecode(np.frombuffer(first['image'], np.uint8), cv2.IMREAD_COLOR)
+    assert max(image.shape[:2]) == 160
+
+    assert dropped['flags'] == DROPPED and dropped['landmarks'] is None and dropped['image']
+    assert skipped['flags'] == SKIPPED and skipped['landmarks'] is None and skipped['image'] is None
+    assert client['mode'] == 'character' and client['flags'] == CLIENT_LANDMARKS | HAS_LANDMARKS
+
+
+def test_images_are_not_stored_without_jpeg_side(tmp_path):
+    path = tmp_path / 'session.slrs'
+    recorder = SessionRecorder(str(path))
+    recorder.frame(recorder.started, 'word', np.zeros((42, 3)), jpeg())
+    recorder.close(wait=True)
+    _, records = read_session(str(path))
+    assert records[0]['image'] is None
+
+
+def test_truncated_last_record_is_skipped(tmp_path):
+    path = tmp_path / 'session.slrs'
+    recorder = SessionRecorder(str(path))
+    for i in range(3):
+        recorder.frame(recorder.started + i, 'word', np.zeros((42, 3)))
+    recorder.close(wait=True)
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])
+    _, records = read_session(str(path))
+    assert len(records) == 2
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.slrs'
+    path.write_bytes(b'not a session recording')
+    with pytest.raises(ValueError):
+        read_session(str(path))
+
+
+def test_drops_images_then_frames_when_the_writer_falls_behind(tmp_path):
+    path = tmp_path / 'session.slrs'
+    # Giữ thread ghi dùng chung bận để các lệnh ghi dồn lại
+    release = threading.Event()
+    _writer.submit(release.wait)
+    recorder = SessionRecorder(str(path), jpeg_side=64, max_pending=2)
+    for _ in range(3):
+        recorder.frame(recorder.started, 'word', np.zeros((42, 3)), jpeg())
+    release.set()
+    recorder.close(wait=True)
+
+    assert (recorder.images_dropped, recorder.frames_dropped) == (1, 1)
+    _, records = read_session(str(path))
+    first, second, dropped = records
+    assert first['image'] and second['image'] is None and second['flags'] == HAS_LANDMARKS
+    assert dropped['event'] == 'recorder_dropped' and dropped['data'] == {'images': 1, 'frames': 1}
@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+
+from streaming import FrameInbox, HandPresenceGate, LandmarkRingBuffer, ResultDebouncer
+
+
+def frame(value):
+    return np.full((42, 3), value, dtype=np.float32)
+
+
+def test_ring_buffer_window_is_in_time_order_after_wrapping():
+    buffer = LandmarkRingBuffer(4)
+    for value in range(6):
+        buffer.append(frame(value))
+    assert buffer.full and len(buffer) == 4
+    assert buffer.window()[:, 0, 0].tolist() == [2, 3, 4, 5]
+    assert buffer.window(2)[:, 0, 0].tolist() == [4, 5]
+
+    window = buffer.window()
+    window[:] = -1
+    assert buffer.window()[:, 0, 0].tolist() == [2, 3, 4, 5]
+
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.window().shape == (0, 42, 3)
+
+
+def test_debouncer_sends_each_sign_once_until_released():
+    debouncer = ResultDebouncer(min_confidence=0.5, release_after=2)
+    assert debouncer.update('a', 0.9)
+    assert not debouncer.update('a', 0.9)
+    assert not debouncer.update('a', 0.2)
+    # Một cửa sổ thấp chưa đủ để gửi lại
+    assert not debouncer.update('a', 0.9)
+    assert debouncer.update('b', 0.9)
+    assert not debouncer.update('b', 0.1)
+    assert not debouncer.update('b', 0.1)
+    assert debouncer.update('b', 0.9)
+
+
+def test_presence_gate_idles_samples_and_resumes():
+    gate = HandPresenceGate(idle_after=3, idle_sample_every=4)
+    assert [gate.update(False) for _ in range(3)] == [None, None, HandPresenceGate.IDLE]
+    assert gate.idle
+
+    processed = [gate.should_process() for _ in range(8)]
+    assert processed == [False, False, False, True] * 2
+    assert gate.frames_skipped == 6
+
+    assert gate.update(True) == HandPresenceGate.RESUMED
+    assert not gate.idle and gate.should_process()
+
+
+def test_inbox_drops_oldest_and_throttles():
+    dropped = []
+    inbox = FrameInbox(capacity=3, throttle_at=2, on_drop=dropped.append)
+    assert not inbox.put('a')
+    assert inbox.put('b')
+    assert not inbox.put('c')
+    assert not inbox.put('d')
+    assert dropped == ['a']
+
+    async def drain():
+        return [await inbox.get() for _ in range(3)]
+
+    assert asyncio.run(drain()) == ['b', 'c', 'd']
+    assert not inbox.throttled
+    stats = inbox.stats()
+    assert (stats['frames_received'], stats['frames_dropped'], stats['frames_processed']) == (4, 1, 3)
+
+
+def test_inbox_get_waits_for_the_next_frame():
+    async def scenario():
+        inbox = FrameInbox(capacity=2)
+        waiter = asyncio.create_task(inbox.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        inbox.put('frame')
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) == 'frame'
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class VideoBuffer:
+    """Bộ đệm video trong RAM có đường dẫn để cv2 (kể cả ở tiến trình worker) mở được.
+
+    Trên Linux dùng ``memfd_create``: dữ liệu không chạm tới đĩa và đường dẫn
+    ``/proc/<pid>/fd/<fd>`` là duy nhất cho mỗi yêu cầu. Nơi khác dùng một tệp
+    tạm có tên duy nhất và xóa nó khi đóng.
+    """
+
+    def __init__(self, suffix='.mp4'):
+        if hasattr(os, 'memfd_create'):
+            fd = os.memfd_create('video-upload')
+            self._file = os.fdopen(fd, 'wb')
+            self.path = f'/proc/{os.getpid()}/fd/{fd}'
+            self._temp_path = None
+        else:
+            self._file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+            self.path = self._file.name
+            self._temp_path = self._file.name
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    @property
+    def digest(self):
+        """SHA-256 của toàn bộ dữ liệu đã ghi, dùng làm khóa cache theo nội dung."""
+        return self._sha256.hexdigest()
+
+    @classmethod
+    def from_bytes(cls, data, suffix='.mp4'):
+        buffer = cls(suffix)
+        buffer.write(data)
+        buffer.flush()
+        return buffer
+
+    @classmethod
+    def from_stream(cls, stream, suffix='.mp4', chunk_size=UPLOAD_CHUNK_SIZE):
+        """Chép một luồng nhị phân (tệp tạm của upload, thành viên zip) theo từng khối rồi đóng luồng."""
+        buffer = cls(suffix)
+        try:
+            with stream:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    buffer.write(chunk)
+            buffer.flush()
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer
+
+    @classmethod
+    async def from_upload(cls, file, chunk_size=UPLOAD_CHUNK_SIZE):
+        """Đọc ``UploadFile`` theo từng khối thay vì đọc toàn bộ vào bộ nhớ."""
+        buffer = cls(os.path.splitext(file.filename or '')[1] or '.mp4')
+        try:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                buffer.write(chunk)
+            buffer.flush()
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer
+
+    def write(self, data):
+        self._file.write(data)
+        self._sha256.update(data)
+        self.size += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        if self._temp_path and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()